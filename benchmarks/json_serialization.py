@@ -0,0 +1,103 @@
+"""
+Compares the cost per document of building a JSON response by
+validating every document into a model and dumping it, against
+serializing the documents straight from the cursor.
+
+Usage:
+    python -m benchmarks.json_serialization [documents]
+"""
+
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable
+
+from bson import ObjectId
+
+from moapi.models.core.custom_pydantic_fields import MongoObjectId
+from moapi.models.core.entity import Entity
+from moapi.odm.entity_service import document_to_model
+from moapi.odm.serialization import documents_to_json, documents_to_ndjson
+
+DEFAULT_DOCUMENTS: int = 10_000
+REPEAT: int = 5
+
+
+# =========================================================
+# BENCHMARK MODELS
+# =========================================================
+class Event(Entity):
+    name: str
+    owner_id: MongoObjectId
+    created: datetime
+    tags: list[str]
+    score: float
+
+
+# ---------------------------------------------------------
+# FUNCTION CURSOR
+# ---------------------------------------------------------
+def cursor(count: int) -> list[dict]:
+    created: datetime = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "_id": ObjectId(),
+            "id": str(index),
+            "name": f"event {index}",
+            "owner_id": ObjectId(),
+            "created": created,
+            "tags": ["a", "b"],
+            "score": index / 3,
+        }
+        for index in range(count)
+    ]
+
+
+# ---------------------------------------------------------
+# FUNCTION THROUGH MODELS
+# ---------------------------------------------------------
+def through_models(documents: list[dict]) -> bytes:
+    return (
+        b"["
+        + b",".join(
+            document_to_model(Event, document).model_dump_json().encode()
+            for document in documents
+        )
+        + b"]"
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION MEASURE
+# ---------------------------------------------------------
+def measure(function: Callable, count: int) -> float:
+    # The serialization renames _id in place, so every run gets
+    # fresh documents, as a new cursor would; building them is
+    # excluded from the measure
+    timings: list[float] = []
+    for _ in range(REPEAT):
+        documents: list[dict] = cursor(count)
+        timings.append(
+            timeit.timeit(lambda: function(documents), number=1)
+        )
+    return min(timings) / count * 1e6
+
+
+# ---------------------------------------------------------
+# FUNCTION MAIN
+# ---------------------------------------------------------
+def main(count: int = DEFAULT_DOCUMENTS):
+    cases: dict[str, Callable] = {
+        "through models": through_models,
+        "json array": documents_to_json,
+        "ndjson": lambda documents: b"".join(
+            documents_to_ndjson(documents)
+        ),
+    }
+    print(f"documents: {count}")
+    for name, function in cases.items():
+        print(f"{name:>15}: {measure(function, count):.2f} us/document")
+
+
+if __name__ == "__main__":
+    main(*(int(argument) for argument in sys.argv[1:2]))
@@ -0,0 +1,182 @@
+"""
+Compares the cost per document of converting Mongo documents into
+models one by one with document_to_model, validating the whole batch
+with the cached list TypeAdapter and reading them as trusted
+documents with trusted_document_to_model (which only skips validation
+where building the model is faster).
+
+Two models are measured: one made of plain types, which pydantic-core
+validates without calling back into Python, and one with ObjectId
+references and e-mail fields, whose validators run in Python.
+
+Usage:
+    python -m benchmarks.model_validation [documents] [repeat]
+"""
+
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from bson import ObjectId
+from pydantic import EmailStr
+
+from moapi.models.core.custom_pydantic_fields import MongoObjectId
+from moapi.models.core.entity import Entity
+from moapi.odm.entity_service import (
+    document_list_to_model_list,
+    document_to_model,
+    trusted_document_to_model,
+)
+
+DEFAULT_DOCUMENTS: int = 10_000
+DEFAULT_REPEAT: int = 5
+
+
+# =========================================================
+# BENCHMARK MODELS
+# =========================================================
+class Address(Entity):
+    street: str
+    city: str
+    zip_code: Optional[str] = None
+
+
+class Customer(Entity):
+    name: str
+    age: int
+    active: bool
+    created: datetime
+    tags: list[str]
+    address: Address
+
+
+class Order(Entity):
+    customer_id: MongoObjectId
+    product_ids: list[MongoObjectId]
+    contact: EmailStr
+    total: float
+
+
+# ---------------------------------------------------------
+# FUNCTION GENERATE CUSTOMERS
+# ---------------------------------------------------------
+def generate_customers(count: int) -> list[dict]:
+    created: datetime = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "_id": ObjectId(),
+            "id": str(index),
+            "name": f"customer {index}",
+            "age": 20 + index % 50,
+            "active": bool(index % 2),
+            "created": created,
+            "tags": ["a", "b", "c"],
+            "address": {"street": "Main St", "city": "San José"},
+        }
+        for index in range(count)
+    ]
+
+
+# ---------------------------------------------------------
+# FUNCTION GENERATE ORDERS
+# ---------------------------------------------------------
+def generate_orders(count: int) -> list[dict]:
+    # Documents written by model_to_document hold ids as strings
+    return [
+        {
+            "_id": str(ObjectId()),
+            "id": str(index),
+            "customer_id": str(ObjectId()),
+            "product_ids": [str(ObjectId()) for _ in range(3)],
+            "contact": f"customer{index}@example.com",
+            "total": 10.5 * index,
+        }
+        for index in range(count)
+    ]
+
+
+# ---------------------------------------------------------
+# FUNCTION CONVERT ONE BY ONE
+# ---------------------------------------------------------
+def convert_one_by_one(
+    model_type: type[Entity], documents: list[dict]
+) -> list[Entity]:
+    # Baseline: every document is validated on its own, with the
+    # same conversion (and no loaded state) used by the other paths
+    return [
+        document_to_model(model_type, document) for document in documents
+    ]
+
+
+# ---------------------------------------------------------
+# FUNCTION CONVERT BATCH
+# ---------------------------------------------------------
+def convert_batch(
+    model_type: type[Entity], documents: list[dict]
+) -> list[Entity]:
+    return document_list_to_model_list(model_type, documents)
+
+
+# ---------------------------------------------------------
+# FUNCTION CONVERT TRUSTED
+# ---------------------------------------------------------
+def convert_trusted(
+    model_type: type[Entity], documents: list[dict]
+) -> list[Entity]:
+    return [
+        trusted_document_to_model(model_type, document)
+        for document in documents
+    ]
+
+
+# ---------------------------------------------------------
+# FUNCTION MEASURE
+# ---------------------------------------------------------
+def measure(
+    function: Callable,
+    model_type: type[Entity],
+    documents: list[dict],
+    repeat: int,
+) -> float:
+    best: float = min(
+        timeit.repeat(
+            lambda: function(model_type, documents),
+            number=1,
+            repeat=repeat,
+        )
+    )
+    return best / len(documents) * 1e6
+
+
+# ---------------------------------------------------------
+# FUNCTION REPORT
+# ---------------------------------------------------------
+def report(model_type: type[Entity], documents: list[dict], repeat: int):
+    # Warm up the per-model caches so their construction is not
+    # measured
+    convert_batch(model_type, documents[:1])
+    convert_trusted(model_type, documents[:1])
+    one_by_one: float = measure(
+        convert_one_by_one, model_type, documents, repeat
+    )
+    batch: float = measure(convert_batch, model_type, documents, repeat)
+    trusted: float = measure(
+        convert_trusted, model_type, documents, repeat
+    )
+    print(f"{model_type.__name__} ({len(documents)} documents)")
+    print(f"  one by one: {one_by_one:.2f} us/document")
+    print(f"  batch:      {batch:.2f} us/document")
+    print(f"  trusted:    {trusted:.2f} us/document")
+
+
+# ---------------------------------------------------------
+# FUNCTION MAIN
+# ---------------------------------------------------------
+def main(count: int = DEFAULT_DOCUMENTS, repeat: int = DEFAULT_REPEAT):
+    report(Customer, generate_customers(count), repeat)
+    report(Order, generate_orders(count), repeat)
+
+
+if __name__ == "__main__":
+    main(*(int(argument) for argument in sys.argv[1:3]))
@@ -0,0 +1,80 @@
+"""
+Compares the cost per document of decoding wide BSON documents into
+dictionaries against keeping them as RawBSONDocument, both when a
+single field is read and when the documents are passed through as
+BSON without being touched.
+
+Usage:
+    python -m benchmarks.raw_bson [documents] [fields]
+"""
+
+import sys
+import timeit
+from typing import Callable
+
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from moapi.odm.entity_service import raw_bson_bytes
+
+DEFAULT_DOCUMENTS: int = 10_000
+DEFAULT_FIELDS: int = 200
+REPEAT: int = 5
+
+
+# ---------------------------------------------------------
+# FUNCTION GENERATE PAYLOADS
+# ---------------------------------------------------------
+def generate_payloads(count: int, fields: int) -> list[bytes]:
+    return [
+        bson.encode(
+            {
+                "_id": ObjectId(),
+                "id": str(index),
+                **{
+                    f"field_{field}": f"value {field}"
+                    for field in range(fields)
+                },
+            }
+        )
+        for index in range(count)
+    ]
+
+
+# ---------------------------------------------------------
+# FUNCTION MEASURE
+# ---------------------------------------------------------
+def measure(function: Callable, payloads: list[bytes]) -> float:
+    best: float = min(
+        timeit.repeat(lambda: function(payloads), number=1, repeat=REPEAT)
+    )
+    return best / len(payloads) * 1e6
+
+
+# ---------------------------------------------------------
+# FUNCTION MAIN
+# ---------------------------------------------------------
+def main(count: int = DEFAULT_DOCUMENTS, fields: int = DEFAULT_FIELDS):
+    payloads: list[bytes] = generate_payloads(count, fields)
+    cases: dict[str, Callable] = {
+        "dict, one field": lambda items: [
+            bson.decode(item)["id"] for item in items
+        ],
+        "raw, one field": lambda items: [
+            RawBSONDocument(item)["id"] for item in items
+        ],
+        "dict, re-encoded": lambda items: [
+            bson.encode(bson.decode(item)) for item in items
+        ],
+        "raw, pass-through": lambda items: list(
+            raw_bson_bytes(RawBSONDocument(item) for item in items)
+        ),
+    }
+    print(f"documents: {count}, fields: {fields}")
+    for name, function in cases.items():
+        print(f"{name:>18}: {measure(function, payloads):.2f} us/document")
+
+
+if __name__ == "__main__":
+    main(*(int(argument) for argument in sys.argv[1:3]))
@@ -0,0 +1,177 @@
+"""
+Measures the memory allocated and the time spent while reading a
+large result set into models, comparing the read path that copied
+every document twice (once while traversing the cursor and once
+before validation) against the current one, which uses the documents
+decoded by the driver as they are. Neither path tracks the models
+(see track on the typed reads).
+
+For each path it reports the peak of the memory traced while reading
+the whole result set and the memory still held by the models once the
+read returns. The dropped copies were short-lived, so they barely show
+in those figures: the transient memory is also measured per document,
+reading one document at a time and taking the peak above the memory
+retained by each read.
+
+The cursor is simulated with a generator that builds a new dictionary
+per document, as pymongo does, so only the read path is measured.
+
+Usage:
+    python -m benchmarks.read_memory [documents]
+"""
+
+import sys
+import time
+import tracemalloc
+from typing import Callable, Iterator
+
+from bson import ObjectId
+
+from moapi.models.core.entity import Entity
+from moapi.odm.entity_service import (
+    MONGO_INTERNAL_ID_KEY,
+    MONGO_MODEL_ID_KEY,
+    document_list_to_model_list,
+    traverse_cursor_and_copy,
+)
+
+DEFAULT_DOCUMENTS: int = 50_000
+TRANSIENT_SAMPLES: int = 5_000
+TIMED_REPEATS: int = 3
+BYTES_PER_MEGABYTE: int = 1024 * 1024
+
+
+# =========================================================
+# BENCHMARK MODELS
+# =========================================================
+class Measurement(Entity):
+    sensor: str
+    unit: str
+    values: list[float]
+    labels: dict[str, str]
+
+
+# ---------------------------------------------------------
+# FUNCTION CURSOR
+# ---------------------------------------------------------
+def cursor(count: int) -> Iterator[dict]:
+    for index in range(count):
+        yield {
+            "_id": ObjectId(),
+            "id": str(index),
+            "sensor": f"sensor-{index % 100}",
+            "unit": "celsius",
+            "values": [20.0, 21.5, 22.25, 19.75],
+            "labels": {"site": "north", "floor": str(index % 10)},
+        }
+
+
+# ---------------------------------------------------------
+# FUNCTION READ WITH COPIES
+# ---------------------------------------------------------
+def read_with_copies(count: int) -> list[Measurement]:
+    # Read path as it was: the cursor results are copied and every
+    # document is copied again before being validated
+    documents: list[dict] = [result.copy() for result in cursor(count)]
+    models: list[Measurement] = []
+    for document in documents:
+        document_data: dict = document.copy()
+        document_data[MONGO_MODEL_ID_KEY] = document_data.pop(
+            MONGO_INTERNAL_ID_KEY
+        )
+        model: Measurement = Measurement.model_validate(
+            document_data, strict=True
+        )
+        models.append(model)
+    return models
+
+
+# ---------------------------------------------------------
+# FUNCTION READ WITHOUT COPIES
+# ---------------------------------------------------------
+def read_without_copies(count: int) -> list[Measurement]:
+    return document_list_to_model_list(
+        Measurement, traverse_cursor_and_copy(cursor(count))
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION TRACED
+# ---------------------------------------------------------
+def traced(
+    function: Callable[[int], list], count: int
+) -> tuple[float, float]:
+    """
+    :return: Peak and retained memory, in MiB
+    """
+    tracemalloc.start()
+    try:
+        result: list = function(count)
+        retained_size, peak_size = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return (
+        peak_size / BYTES_PER_MEGABYTE,
+        retained_size / BYTES_PER_MEGABYTE,
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION TRANSIENT
+# ---------------------------------------------------------
+def transient(function: Callable[[int], list], count: int) -> float:
+    """
+    :return: Mean transient memory per document, in bytes
+    """
+    results: list[list] = []
+    total: int = 0
+    tracemalloc.start()
+    try:
+        for _ in range(count):
+            tracemalloc.reset_peak()
+            results.append(function(1))
+            retained_size, peak_size = tracemalloc.get_traced_memory()
+            total += peak_size - retained_size
+    finally:
+        tracemalloc.stop()
+    return total / count
+
+
+# ---------------------------------------------------------
+# FUNCTION ELAPSED
+# ---------------------------------------------------------
+def elapsed(function: Callable[[int], list], count: int) -> float:
+    """
+    :return: Best time of a few reads, in seconds
+    """
+    times: list[float] = []
+    for _ in range(TIMED_REPEATS):
+        start: float = time.perf_counter()
+        function(count)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# ---------------------------------------------------------
+# FUNCTION MAIN
+# ---------------------------------------------------------
+def main(count: int = DEFAULT_DOCUMENTS):
+    # Warm up the adapter cache so its construction is not measured
+    read_without_copies(1)
+    print(f"documents: {count}")
+    for name, function in (
+        ("with copies", read_with_copies),
+        ("without copies", read_without_copies),
+    ):
+        peak_size, retained_size = traced(function, count)
+        print(
+            f"{name:>15}: {peak_size:.1f} MiB peak, "
+            f"{retained_size:.1f} MiB retained, "
+            f"{transient(function, TRANSIENT_SAMPLES):.0f} B transient "
+            f"per document, {elapsed(function, count):.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(argument) for argument in sys.argv[1:2]))
@@ -0,0 +1,139 @@
+import importlib
+import json
+from typing import Any, List, Optional
+
+import typer
+
+from moapi.odm.entity_service import EntityService
+from moapi.odm.indexes import IndexConflictError
+from moapi.odm.query_statistics import (
+    DEFAULT_SORT_KEY,
+    INVALID_SORT_KEY_ERROR,
+    format_dump,
+)
+
+SERVICE_REFERENCE_SEPARATOR: str = ":"
+INVALID_REFERENCE_ERROR: str = (
+    "{reference} is not a valid service reference. Use module:attribute"
+)
+INVALID_SERVICE_ERROR: str = "{reference} is not an EntityService"
+# Columns shown by query-stats, when present in the dump (query
+# statistics are keyed by shape, command statistics by command)
+QUERY_STATS_COLUMNS: tuple[str, ...] = (
+    "calls",
+    "total_time",
+    "mean_time",
+    "p95_time",
+    "rows",
+    "mean_pool_wait_time",
+    "bytes_out",
+    "bytes_in",
+    "last_seen",
+    "collection",
+    "command",
+    "query_shape",
+)
+
+app: typer.Typer = typer.Typer(help="MoAPI command line tools")
+
+
+# ---------------------------------------------------------
+# CALLBACK MAIN
+# ---------------------------------------------------------
+@app.callback()
+def main():
+    # Having a callback keeps the commands as sub-commands (moapi
+    # ensure-indexes ...) even while there is only one of them
+    pass
+
+
+# ---------------------------------------------------------
+# FUNCTION LOAD SERVICE
+# ---------------------------------------------------------
+def load_service(reference: str) -> EntityService:
+    """
+    Resolves a service given as module:attribute. The attribute can
+    be an EntityService instance or a subclass that can be built
+    without arguments (e.g. myapp.services:UserService).
+    :param reference: Reference to the service
+    :return: Service instance
+    """
+    module_name, _, attribute = reference.partition(
+        SERVICE_REFERENCE_SEPARATOR
+    )
+    if not module_name or not attribute:
+        raise typer.BadParameter(
+            INVALID_REFERENCE_ERROR.format(reference=reference)
+        )
+    target: Any = getattr(importlib.import_module(module_name), attribute)
+    if isinstance(target, type) and issubclass(target, EntityService):
+        target = target()
+    if not isinstance(target, EntityService):
+        raise typer.BadParameter(
+            INVALID_SERVICE_ERROR.format(reference=reference)
+        )
+    return target
+
+
+# ---------------------------------------------------------
+# COMMAND ENSURE INDEXES
+# ---------------------------------------------------------
+@app.command("ensure-indexes")
+def ensure_indexes_command(
+    services: List[str] = typer.Argument(
+        ..., help="Services given as module:attribute"
+    ),
+):
+    """
+    Creates the missing indexes declared on the given services.
+    """
+    for reference in services:
+        service: EntityService = load_service(reference)
+        try:
+            created: list[str] = service.ensure_indexes()
+        except IndexConflictError as error:
+            typer.echo(f"{service.collection_name}: {error}", err=True)
+            raise typer.Exit(code=1)
+        typer.echo(
+            f"{service.collection_name}: "
+            + (", ".join(created) if created else "up to date")
+        )
+
+
+# ---------------------------------------------------------
+# COMMAND QUERY STATS
+# ---------------------------------------------------------
+@app.command("query-stats")
+def query_stats_command(
+    path: str = typer.Argument(
+        ..., help="File written by a statistics registry (write)"
+    ),
+    sort_by: str = typer.Option(
+        DEFAULT_SORT_KEY, help="Statistic used to rank the queries"
+    ),
+    limit: Optional[int] = typer.Option(
+        None, help="Maximum amount of queries shown"
+    ),
+):
+    """
+    Shows the statistics dumped by a QueryStatistics or
+    CommandStatistics registry, times in milliseconds.
+    """
+    with open(path) as file:
+        rows: list[dict] = json.load(file)
+    if rows and sort_by not in rows[0]:
+        raise typer.BadParameter(
+            INVALID_SORT_KEY_ERROR.format(sort_by=sort_by)
+        )
+    rows.sort(key=lambda row: row[sort_by], reverse=True)
+    columns: list[str] = [
+        column
+        for column in QUERY_STATS_COLUMNS
+        if rows and column in rows[0]
+    ]
+    for line in format_dump(rows[:limit], columns):
+        typer.echo(line)
+
+
+if __name__ == "__main__":
+    app()
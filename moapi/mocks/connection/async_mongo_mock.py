@@ -0,0 +1,108 @@
+from typing import Any, Optional
+
+import mongomock
+
+# Collection methods that return a cursor in motor. Every other
+# callable is exposed as a coroutine function.
+CURSOR_METHODS: tuple[str, ...] = ("find", "aggregate", "list_indexes")
+
+
+# =========================================================
+# CLASS ASYNC MONGO MOCK CURSOR
+# =========================================================
+class AsyncMongoMockCursor:
+    """
+    Exposes a mongomock cursor through the subset of the motor
+    cursor API used by moapi (chaining and async iteration).
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.iterator = None
+
+    def skip(self, skip: int):
+        self.cursor.skip(skip)
+        return self
+
+    def limit(self, limit: int):
+        self.cursor.limit(limit)
+        return self
+
+    def sort(self, *args, **kwargs):
+        self.cursor.sort(*args, **kwargs)
+        return self
+
+    def batch_size(self, batch_size: int):
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> list:
+        documents: list = []
+        async for document in self:
+            documents.append(document)
+            if length and len(documents) >= length:
+                break
+        return documents
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.iterator is None:
+            self.iterator = iter(self.cursor)
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+# =========================================================
+# CLASS ASYNC MONGO MOCK COLLECTION
+# =========================================================
+class AsyncMongoMockCollection:
+    """
+    Wraps a mongomock collection so it behaves like a motor
+    collection: cursor methods return async cursors and every
+    other method becomes awaitable.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.collection, name)
+        if name in CURSOR_METHODS:
+            return lambda *args, **kwargs: AsyncMongoMockCursor(
+                attribute(*args, **kwargs)
+            )
+        if callable(attribute):
+
+            async def coroutine(*args, **kwargs):
+                return attribute(*args, **kwargs)
+
+            return coroutine
+        return attribute
+
+
+# =========================================================
+# CLASS ASYNC MONGO MOCK DATABASE
+# =========================================================
+class AsyncMongoMockDatabase:
+    """
+    In-memory stand-in for a motor database backed by mongomock.
+    """
+
+    def __init__(self, database=None):
+        self.database = (
+            database
+            if database is not None
+            else mongomock.MongoClient().db
+        )
+
+    @property
+    def name(self) -> str:
+        return self.database.name
+
+    def __getitem__(
+        self, collection_name: str
+    ) -> AsyncMongoMockCollection:
+        return AsyncMongoMockCollection(self.database[collection_name])
@@ -1,6 +1,9 @@
+from typing import Optional
+
 import mongomock
 from pymongo import database
 
+from moapi.mocks.connection.async_mongo_mock import AsyncMongoMockDatabase
 from moapi.odm.connection import MongoDBParameters
 
 MOCKED_USER: str = "mocked_user"
@@ -22,6 +25,7 @@ class MongoDBParametersMock(MongoDBParameters):
         self.mocked_requires_tls: bool = requires_tls
         self.mocked_is_cluster: bool = is_cluster
         self.mocked_requires_srv: bool = requires_srv_lookup
+        self.mocked_async_database: Optional[database.Database] = None
 
     @property
     def mongo_user(self) -> str:
@@ -72,3 +76,17 @@ class MongoDBParametersMock(MongoDBParameters):
         :return:
         """
         return mongomock.MongoClient().db
+
+    @property
+    def async_db(self) -> AsyncMongoMockDatabase:
+        """
+        Returns an awaitable wrapper around MongoMock that mimics
+        the motor API, so async services can be tested without an
+        actual MongoDB instance. Like the client of a real
+        connection, the in-memory database is shared by every
+        access made through these parameters.
+        :return:
+        """
+        if self.mocked_async_database is None:
+            self.mocked_async_database = mongomock.MongoClient().db
+        return AsyncMongoMockDatabase(self.mocked_async_database)
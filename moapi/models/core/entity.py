@@ -1,8 +1,61 @@
-from pydantic import BaseModel
+import weakref
+from typing import Optional
+
+from pydantic import AliasChoices, BaseModel, Field
 
 from moapi.models.core.custom_pydantic_fields import MongoObjectId
 
+# Documents entities were loaded from, by id of the entity. They are
+# kept outside of the model so they take no part in its equality,
+# serialization or copies. The weak reference removes the entry when
+# the entity is garbage collected.
+_LOADED_STATES: dict[int, tuple[weakref.ref, dict]] = {}
+
+
+# ---------------------------------------------------------
+# FUNCTION FORGET LOADED STATE
+# ---------------------------------------------------------
+def _forget_loaded_state(key: int):
+    _LOADED_STATES.pop(key, None)
+
 
 class Entity(BaseModel):
-    mongo_id: MongoObjectId = None
+    # Documents store the identifier as _id. Accepting it as an alias
+    # lets documents be validated as they come from the database.
+    mongo_id: MongoObjectId = Field(
+        default=None, validation_alias=AliasChoices("mongo_id", "_id")
+    )
     id: str = None
+
+    def mark_loaded(self, document: Optional[dict]):
+        """
+        Records the document the entity was loaded from. It is used
+        to compute the minimal update when the entity is saved back,
+        so it must be a snapshot that shares no mutable value with
+        the entity (e.g. the result of model_to_document).
+        """
+        key: int = id(self)
+        if document is None:
+            _LOADED_STATES.pop(key, None)
+            return
+        entry: Optional[tuple[weakref.ref, dict]] = _LOADED_STATES.get(key)
+        if entry is not None and entry[0]() is self:
+            _LOADED_STATES[key] = (entry[0], document)
+            return
+        _LOADED_STATES[key] = (
+            weakref.ref(self, lambda _: _forget_loaded_state(key)),
+            document,
+        )
+
+    @property
+    def loaded_state(self) -> Optional[dict]:
+        entry: Optional[tuple[weakref.ref, dict]] = _LOADED_STATES.get(
+            id(self)
+        )
+        if entry is None or entry[0]() is not self:
+            return None
+        return entry[1]
+
+    @property
+    def is_tracked(self) -> bool:
+        return self.loaded_state is not None
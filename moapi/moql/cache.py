@@ -0,0 +1,204 @@
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Hashable, Mapping, Optional, Union
+
+from moapi.moql.core import MoQL
+
+DEFAULT_CACHE_SIZE: int = 1024
+
+
+# =========================================================
+# CLASS FROZEN LIST
+# =========================================================
+class FrozenList(tuple):
+    """
+    Immutable replacement of the lists found in a compiled query.
+    It is a distinct type so it can be told apart from the tuples
+    the query already contains (e.g. sort pairs) when thawing.
+    """
+
+
+# ---------------------------------------------------------
+# FUNCTION FREEZE
+# ---------------------------------------------------------
+def freeze(value: Any) -> Any:
+    # Already frozen values (MappingProxyType, FrozenList) are kept,
+    # so a query can share parts of another compiled query
+    if isinstance(value, FrozenList):
+        return value
+    if isinstance(value, dict):
+        return MappingProxyType(
+            {key: freeze(item) for key, item in value.items()}
+        )
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+# ---------------------------------------------------------
+# FUNCTION THAW
+# ---------------------------------------------------------
+def thaw(value: Any) -> Any:
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, FrozenList):
+        return [thaw(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(thaw(item) for item in value)
+    return value
+
+
+# =========================================================
+# CLASS COMPILED MOQL
+# =========================================================
+class CompiledMoQL:
+    """
+    Immutable result of compiling a MoQL string. Instances are
+    safe to share across threads: the compiled query is stored
+    frozen and every access to mongo_query returns a fresh,
+    mutable copy that callers can alter freely.
+    """
+
+    __slots__ = ("moql", "query")
+
+    def __init__(self, moql: str, mongo_query: dict[str, Any]):
+        object.__setattr__(self, "moql", moql)
+        object.__setattr__(self, "query", freeze(mongo_query))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("CompiledMoQL instances are immutable")
+
+    @property
+    def mongo_query(self) -> dict[str, Any]:
+        return thaw(self.query)
+
+    def __repr__(self) -> str:
+        return f"CompiledMoQL({self.moql!r})"
+
+
+# MoQL string, or query compiled beforehand (e.g. bound from a
+# prepared template, see moql.prepared.PreparedMoQL)
+MoQLQuery = Union[str, CompiledMoQL]
+
+
+# =========================================================
+# CLASS MOQL CACHE
+# =========================================================
+class MoQLCache:
+    """
+    Bounded LRU cache of compiled MoQL queries keyed by the query
+    string, the blacklist and the set of casters. Casters are
+    expected to be deterministic, since their output is cached.
+    """
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Hashable, CompiledMoQL] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # METHOD COMPILE
+    # -----------------------------------------------------
+    def compile(
+        self,
+        moql: str,
+        blacklist: Optional[tuple[str, ...]] = None,
+        casters: Optional[Mapping[str, Callable]] = None,
+    ) -> CompiledMoQL:
+        """
+        Returns the compiled version of the given MoQL query,
+        parsing it only when it is not cached yet.
+        :param moql: MoQL query string
+        :param blacklist: Parameters that must be ignored
+        :param casters: Custom casters used by the filters
+        :return: Immutable compiled query
+        """
+        key: Hashable = build_cache_key(moql, blacklist, casters)
+        with self._lock:
+            compiled: Optional[CompiledMoQL] = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        # Parsing happens outside the lock. Concurrent misses on the
+        # same key compile twice, which is harmless.
+        compiled = CompiledMoQL(
+            moql=moql,
+            mongo_query=MoQL(
+                moql=moql,
+                blacklist=blacklist,
+                casters=dict(casters) if casters else None,
+            ).mongo_query,
+        )
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return compiled
+
+    # -----------------------------------------------------
+    # METHOD CLEAR
+    # -----------------------------------------------------
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    # -----------------------------------------------------
+    # PROPERTY INFO
+    # -----------------------------------------------------
+    @property
+    def info(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._entries),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ---------------------------------------------------------
+# FUNCTION BUILD CACHE KEY
+# ---------------------------------------------------------
+def build_cache_key(
+    moql: str,
+    blacklist: Optional[tuple[str, ...]],
+    casters: Optional[Mapping[str, Callable]],
+) -> Hashable:
+    # Casters are matched in insertion order, so the order is part
+    # of the key.
+    return (
+        moql,
+        tuple(blacklist) if blacklist else None,
+        tuple(casters.items()) if casters else None,
+    )
+
+
+MOQL_CACHE: MoQLCache = MoQLCache()
+
+
+# ---------------------------------------------------------
+# FUNCTION COMPILE MOQL
+# ---------------------------------------------------------
+def compile_moql(
+    moql: str,
+    blacklist: Optional[tuple[str, ...]] = None,
+    casters: Optional[Mapping[str, Callable]] = None,
+    cache: Optional[MoQLCache] = None,
+) -> CompiledMoQL:
+    cache = cache if cache is not None else MOQL_CACHE
+    return cache.compile(moql=moql, blacklist=blacklist, casters=casters)
@@ -1,5 +1,4 @@
-from typing import Optional, Callable
-from urllib import parse
+from typing import TYPE_CHECKING, Optional, Callable
 
 from moapi.moql.constants import (
     FILTERS_KEY,
@@ -7,17 +6,24 @@ from moapi.moql.constants import (
     SKIP_KEY,
     LIMIT_KEY,
     PROJECTION_KEY,
-    QUERY_STRING_PARAM_SEPARATOR,
     FIELDS_KEY,
     TEXT_KEY,
     FILTER,
 )
-from moapi.moql.filter_handler import MoQLFilter
+from moapi.moql.filter_handler import build_filter
+from moapi.moql.lexer import (
+    MoQLToken,
+    split_parameters,
+    tokenize,
+    tokenize_parameter,
+)
 from moapi.moql.limit_skip_handler import MoQLLimitHandler, MoQLSkipHandler
 from moapi.moql.projection_handler import MoQLProjection
 from moapi.moql.sort_handler import MoQLSortHandler
 from moapi.moql.text_search_handler import MoQLTextSearch
 
+if TYPE_CHECKING:
+    from moapi.moql.prepared import PreparedMoQL
 
 MONGO_QUERY_TEMPLATE: dict[str, any] = {
     FILTERS_KEY: {},
@@ -27,15 +33,14 @@ MONGO_QUERY_TEMPLATE: dict[str, any] = {
     PROJECTION_KEY: None,
 }
 EMPTY_STRING: str = ""
+EQUALS_OPERATOR: str = "="
 
 
 # ---------------------------------------------------------
 # PARSE QUERY AS KEY VALUE
 # ---------------------------------------------------------
 def extract_parameter_list(hql_query: str) -> list[str]:
-    return list(
-        parse.unquote(hql_query).split(QUERY_STRING_PARAM_SEPARATOR)
-    )
+    return split_parameters(hql_query)
 
 
 # ---------------------------------------------------------
@@ -52,6 +57,21 @@ def remove_blacklisted(hql_query: str, blacklist: tuple[str, ...] | None):
     return raw_parameters
 
 
+# ---------------------------------------------------------
+# REMOVE BLACKLISTED TOKENS
+# ---------------------------------------------------------
+def remove_blacklisted_tokens(
+    tokens: list[MoQLToken], blacklist: tuple[str, ...] | None
+) -> list[MoQLToken]:
+    if blacklist:
+        return [
+            token
+            for token in tokens
+            if not token.parameter.startswith(blacklist)
+        ]
+    return tokens
+
+
 def is_text_search_argument(parameter):
     return parameter.startswith(f"{TEXT_KEY}=")
 
@@ -72,6 +92,64 @@ def is_sort_argument(parameter):
     return parameter.startswith(f"{SORT_KEY}=")
 
 
+# ---------------------------------------------------------
+# RESERVED PARAMETER HANDLERS
+# ---------------------------------------------------------
+def apply_text_search(output_query: dict, parameter: str):
+    output_query[FILTER].update(
+        MoQLTextSearch(text_search_parameter=parameter).filter
+    )
+
+
+def apply_projection(output_query: dict, parameter: str):
+    output_query[PROJECTION_KEY] = MoQLProjection(
+        projection_parameter=parameter
+    ).projection
+
+
+def apply_skip(output_query: dict, parameter: str):
+    output_query[SKIP_KEY] = MoQLSkipHandler(skip_parameter=parameter).skip
+
+
+def apply_limit(output_query: dict, parameter: str):
+    output_query[LIMIT_KEY] = MoQLLimitHandler(
+        limit_parameter=parameter
+    ).limit
+
+
+def apply_sort(output_query: dict, parameter: str):
+    output_query[SORT_KEY] = MoQLSortHandler(
+        sort_parameter=parameter
+    ).query_element
+
+
+# Reserved parameters, given as key=value, and the handler that
+# applies them to an output query
+RESERVED_HANDLERS: dict[str, Callable[[dict, str], None]] = {
+    SORT_KEY: apply_sort,
+    LIMIT_KEY: apply_limit,
+    SKIP_KEY: apply_skip,
+    FIELDS_KEY: apply_projection,
+    TEXT_KEY: apply_text_search,
+}
+
+
+# ---------------------------------------------------------
+# FUNCTION MERGE FILTER
+# ---------------------------------------------------------
+def merge_filter(output_filter: dict, new_filter: dict):
+    """
+    Adds the conditions of new_filter to output_filter. Conditions
+    on a field that is already filtered are combined (e.g. a>1 and
+    a<5 become {"a": {"$gt": 1, "$lt": 5}}).
+    """
+    for key, sub_filter in new_filter.items():
+        if key in output_filter:
+            output_filter[key] = {**output_filter[key], **sub_filter}
+        else:
+            output_filter[key] = sub_filter
+
+
 class MoQL:
     # -----------------------------------------------------
     # CLASS CONSTRUCTOR
@@ -84,9 +162,12 @@ class MoQL:
     ):
         self.moql: str = moql
         self.blacklist = blacklist
-        self.raw_parameters: list[str] = remove_blacklisted(
-            hql_query=self.moql, blacklist=self.blacklist
+        self.tokens: list[MoQLToken] = remove_blacklisted_tokens(
+            tokens=tokenize(self.moql), blacklist=self.blacklist
         )
+        self.raw_parameters: list[str] = [
+            token.parameter for token in self.tokens
+        ]
         self.casters: Optional[dict[str, Callable]] = casters
         self.output_query: dict[str, any] = {
             FILTER: {},
@@ -101,74 +182,96 @@ class MoQL:
     # METHOD PROCESS PARAMETERS
     # -----------------------------------------------------
     def process_parameters(self):
-        for parameter in self.raw_parameters:
-            if is_sort_argument(parameter):
-                self.sort(parameter)
-            elif is_limit_argument(parameter):
-                self.limit(parameter)
-            elif is_skip_argument(parameter):
-                self.skip(parameter)
-            elif is_projection_argument(parameter):
-                self.project(parameter)
-            elif is_text_search_argument(parameter):
-                self.search_text(parameter)
-            elif parameter != EMPTY_STRING:
-                self.filter(parameter)
+        # Reserved parameters are dispatched by key, so every token
+        # is classified with a single dictionary lookup.
+        handlers: dict[str, Callable[[str], None]] = {
+            SORT_KEY: self.sort,
+            LIMIT_KEY: self.limit,
+            SKIP_KEY: self.skip,
+            FIELDS_KEY: self.project,
+            TEXT_KEY: self.search_text,
+        }
+        for token in self.tokens:
+            handler = (
+                handlers.get(token.key)
+                if token.operator == EQUALS_OPERATOR
+                else None
+            )
+            if handler:
+                handler(token.parameter)
+            else:
+                self.filter_token(token)
 
     # -----------------------------------------------------
     # FILTER
     # -----------------------------------------------------
     def filter(self, parameter):
-        for key, sub_filter in MoQLFilter(
-            filter_parameter=parameter, custom_casters=self.casters
-        ).filter.items():
-            if key in self.output_query[FILTER]:
-                self.output_query[FILTER][key] = {
-                    **self.output_query[FILTER][key],
-                    **sub_filter,
-                }
-            else:
-                self.output_query[FILTER][key] = sub_filter
+        self.filter_token(tokenize_parameter(parameter))
+
+    # -----------------------------------------------------
+    # FILTER TOKEN
+    # -----------------------------------------------------
+    def filter_token(self, token: MoQLToken):
+        merge_filter(
+            self.output_query[FILTER],
+            build_filter(
+                key=token.key,
+                operator=token.operator,
+                value=token.value,
+                casters=self.casters,
+                repeated_operator=token.repeated_operator,
+            ),
+        )
 
     # -----------------------------------------------------
     # SEARCH TEXT
     # -----------------------------------------------------
     def search_text(self, parameter):
-        self.output_query[FILTER].update(
-            MoQLTextSearch(text_search_parameter=parameter).filter
-        )
+        apply_text_search(self.output_query, parameter)
 
     # -----------------------------------------------------
     # PROJECT
     # -----------------------------------------------------
     def project(self, parameter):
-        self.output_query[PROJECTION_KEY] = MoQLProjection(
-            projection_parameter=parameter
-        ).projection
+        apply_projection(self.output_query, parameter)
 
     # -----------------------------------------------------
     # SKIP
     # -----------------------------------------------------
     def skip(self, parameter):
-        self.output_query[SKIP_KEY] = MoQLSkipHandler(
-            skip_parameter=parameter
-        ).skip
+        apply_skip(self.output_query, parameter)
 
     # -----------------------------------------------------
     # LIMIT
     # -----------------------------------------------------
     def limit(self, parameter):
-        self.output_query[LIMIT_KEY] = MoQLLimitHandler(
-            limit_parameter=parameter
-        ).limit
+        apply_limit(self.output_query, parameter)
 
     # -----------------------------------------------------
     # SORT
     # -----------------------------------------------------
     def sort(self, parameter):
-        self.output_query[SORT_KEY] = MoQLSortHandler(
-            sort_parameter=parameter
-        ).query_element
+        apply_sort(self.output_query, parameter)
+
+    # -----------------------------------------------------
+    # METHOD PREPARE
+    # -----------------------------------------------------
+    @staticmethod
+    def prepare(
+        template: str,
+        blacklist: Optional[tuple[str, ...]] = None,
+        casters: Optional[dict[str, Callable]] = None,
+    ) -> "PreparedMoQL":
+        """
+        Compiles a MoQL template with {name} placeholders in its
+        values, to be bound on each call (see PreparedMoQL).
+        Example: MoQL.prepare("status={status}&limit=50")
+        """
+        from moapi.moql.prepared import PreparedMoQL
+
+        return PreparedMoQL(
+            moql=template, blacklist=blacklist, casters=casters
+        )
 
     # -----------------------------------------------------
     # PROPERTY MONGO QUERY
@@ -1,10 +1,85 @@
-from datetime import datetime
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
 
 from dateparser import parse
 
+DATE_CACHE_SIZE: int = 4096
+ISO_DATE_REGEX: re.Pattern[str] = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d+))?)?"
+    r"(Z|[+-]\d{2}:\d{2})?)?$"
+)
+UTC_DESIGNATOR: str = "Z"
+MAX_FRACTION_DIGITS: int = 6
 
+
+# ---------------------------------------------------------
+# FUNCTION PARSE TIMEZONE
+# ---------------------------------------------------------
+def parse_timezone(designator: Optional[str]) -> Optional[timezone]:
+    if not designator:
+        return None
+    if designator == UTC_DESIGNATOR:
+        return timezone.utc
+    sign: int = -1 if designator[0] == "-" else 1
+    hours, minutes = designator[1:].split(":")
+    return timezone(
+        sign * timedelta(hours=int(hours), minutes=int(minutes))
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION PARSE ISO DATE
+# ---------------------------------------------------------
+def parse_iso_date(date: str) -> Optional[datetime]:
+    """Strictly parse a complete ISO-8601 date or date-time.
+
+    Only unambiguous formats are accepted (a full date, optionally
+    followed by a time and an offset). Anything else, including
+    impossible dates, returns None so the caller can fall back to
+    a lenient parser.
+
+    Args:
+        date (str): Date as string format.
+
+     Returns:
+        Optional[datetime]: Parsed value or None.
+    """
+    match = ISO_DATE_REGEX.match(date)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, fraction, designator = (
+        match.groups()
+    )
+    microsecond: int = (
+        int(fraction[:MAX_FRACTION_DIGITS].ljust(MAX_FRACTION_DIGITS, "0"))
+        if fraction
+        else 0
+    )
+    try:
+        return datetime(
+            int(year),
+            int(month),
+            int(day),
+            int(hour or 0),
+            int(minute or 0),
+            int(second or 0),
+            microsecond,
+            tzinfo=parse_timezone(designator),
+        )
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
 def parse_date(date: str) -> datetime | str:
-    """Cast string date into datetime using dateparse library.
+    """Cast string date into datetime.
+
+    Complete ISO-8601 values are parsed directly. Ambiguous input
+    is handed over to the dateparser library. Results are memoized
+    since the same literals tend to be repeated across queries.
 
     Args:
         date (str): Date as string format.
@@ -13,4 +88,4 @@ def parse_date(date: str) -> datetime | str:
         Optional[datetime]: Cast value.
     """
 
-    return parse(date, languages=["en"]) or date
+    return parse_iso_date(date) or parse(date, languages=["en"]) or date
@@ -36,3 +36,11 @@ class LogicalPopulationError(MoQLBaseError):
 
 class LogicalSubPopulationError(MoQLBaseError):
     """Raised when method fail to find logical sub population item."""
+
+
+class PaginationError(MoQLBaseError):
+    """Raised when a continuation token is invalid for the query."""
+
+
+class PreparedMoQLError(MoQLBaseError):
+    """Raised when a MoQL template is invalid or badly bound."""
@@ -1,4 +1,5 @@
-from typing import Callable, Pattern
+from re import Pattern
+from typing import Callable
 
 from moapi.moql.type_mapping import DEFAULT_CASTING_RULES
 from moapi.moql.errors import (
@@ -144,11 +145,36 @@ def build_query(
     return {key: {MONGO_OPERATOR_MAPPING[operator]: value}}
 
 
+# ---------------------------------------------------------
+# FUNCTION BUILD FILTER
+# ---------------------------------------------------------
+def build_filter(
+    key: str,
+    operator: str,
+    value: str,
+    casters: dict[str, Callable[[any], any]] | None,
+    repeated_operator: bool = False,
+) -> dict:
+    """
+    Builds a mongo filter from an already tokenized parameter,
+    so the parameter does not need to be scanned again. Parameters
+    whose value holds the operator again (see MoQLToken) are
+    rejected.
+    """
+    if repeated_operator:
+        raise FilterError(FILTER_ERROR)
+    return build_query(
+        operator=operator,
+        key=key,
+        value=cast(value, casters),
+        casters=casters,
+    )
+
+
 # =========================================================
 # CLASS HQL FILTER
 # =========================================================
 class MoQLFilter:
-
     """
     Builds mongo filters based on the filter parameters
     provided.
@@ -174,9 +200,9 @@ class MoQLFilter:
         self.key: str = EMPTY_STRING
         self.value: any = None
         self.extract_key_value()
-        self.casters: dict[
-            str, Callable[[any], any]
-        ] | None = custom_casters
+        self.casters: dict[str, Callable[[any], any]] | None = (
+            custom_casters
+        )
         self.casted_value: any = self.cast_value()
 
     # -----------------------------------------------------
@@ -0,0 +1,130 @@
+import re
+from typing import NamedTuple, Optional
+from urllib import parse
+
+from moapi.moql.constants import (
+    EMPTY_STRING,
+    QUERY_STRING_PARAM_SEPARATOR,
+)
+
+PERCENT_SIGN: str = "%"
+# Alternatives are ordered so that two-character operators win over
+# their one-character prefixes at the same position.
+OPERATOR_REGEX: re.Pattern[str] = re.compile(r"<=|>=|!=|=|<|>|!")
+# Same operators as found in a raw (still percent-encoded) segment,
+# where each of their characters may be given encoded
+ENCODED_OPERATOR_REGEX: re.Pattern[str] = re.compile(
+    r"(?:<|%3C|>|%3E|!|%21)(?:=|%3D)|=|%3D|<|%3C|>|%3E|!|%21",
+    re.IGNORECASE,
+)
+
+
+# =========================================================
+# CLASS MOQL TOKEN
+# =========================================================
+class MoQLToken(NamedTuple):
+    """
+    Lexical unit of a MoQL query.
+
+    Example input: score>=5
+
+    parameter: "score>=5", key: "score", operator: ">=", value: "5"
+
+    Parameters without operator (e.g. "active") produce an empty
+    key and operator, and the whole parameter as value.
+
+    repeated_operator is set when the value holds the operator
+    again, unencoded (e.g. "tags==CR"), which filters reject.
+    """
+
+    parameter: str
+    key: str
+    operator: str
+    value: str
+    repeated_operator: bool = False
+
+
+# ---------------------------------------------------------
+# FUNCTION DECODE
+# ---------------------------------------------------------
+def decode(segment: str) -> str:
+    if PERCENT_SIGN in segment:
+        return parse.unquote(segment)
+    return segment
+
+
+# ---------------------------------------------------------
+# FUNCTION TOKENIZE PARAMETER
+# ---------------------------------------------------------
+def tokenize_parameter(parameter: str) -> MoQLToken:
+    """
+    Splits an already decoded parameter on the first operator
+    found, scanning the parameter only once.
+    """
+    match: Optional[re.Match] = OPERATOR_REGEX.search(parameter)
+    if match is None:
+        return MoQLToken(parameter, EMPTY_STRING, EMPTY_STRING, parameter)
+    start, end = match.span()
+    operator: str = match.group()
+    value: str = parameter[end:]
+    return MoQLToken(
+        parameter, parameter[:start], operator, value, operator in value
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION TOKENIZE SEGMENT
+# ---------------------------------------------------------
+def tokenize_segment(segment: str) -> MoQLToken:
+    """
+    Same as tokenize_parameter for a raw segment of a MoQL string.
+    The operator is found before decoding, so encoded operator
+    characters in the value (e.g. "name=a%3Db") are kept as part
+    of it. Key and value are then decoded separately.
+    """
+    if PERCENT_SIGN not in segment:
+        return tokenize_parameter(segment)
+    match: Optional[re.Match] = ENCODED_OPERATOR_REGEX.search(segment)
+    if match is None:
+        parameter: str = decode(segment)
+        return MoQLToken(parameter, EMPTY_STRING, EMPTY_STRING, parameter)
+    start, end = match.span()
+    operator: str = decode(match.group())
+    raw_value: str = segment[end:]
+    return MoQLToken(
+        decode(segment),
+        decode(segment[:start]),
+        operator,
+        decode(raw_value),
+        operator in raw_value,
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION SPLIT PARAMETERS
+# ---------------------------------------------------------
+def split_parameters(moql: str) -> list[str]:
+    """
+    Splits a MoQL string into decoded parameters. Parameters are
+    split on the raw separator before being percent-decoded, so an
+    encoded "&" (%26) is preserved inside values.
+    """
+    return [
+        decode(segment)
+        for segment in moql.split(QUERY_STRING_PARAM_SEPARATOR)
+    ]
+
+
+# ---------------------------------------------------------
+# FUNCTION TOKENIZE
+# ---------------------------------------------------------
+def tokenize(moql: str) -> list[MoQLToken]:
+    """
+    Converts a MoQL string into a list of (key, operator, value)
+    tokens. Empty parameters are skipped.
+    """
+    return [
+        tokenize_segment(segment)
+        for segment in moql.split(QUERY_STRING_PARAM_SEPARATOR)
+        if segment != EMPTY_STRING
+    ]
@@ -0,0 +1,294 @@
+import re
+from typing import Any, Callable, Mapping, NamedTuple, Optional
+
+from moapi.moql.cache import CompiledMoQL, compile_moql
+from moapi.moql.constants import (
+    EMPTY_STRING,
+    FILTER,
+    QUERY_STRING_PARAM_SEPARATOR,
+)
+from moapi.moql.core import (
+    EQUALS_OPERATOR,
+    RESERVED_HANDLERS,
+    merge_filter,
+)
+from moapi.moql.errors import ListOperatorError, PreparedMoQLError
+from moapi.moql.filter_handler import (
+    LIST_OPERATOR_ERROR_TEMPLATE,
+    build_filter,
+    build_query,
+    default_cast,
+)
+from moapi.moql.lexer import MoQLToken, decode, tokenize_segment
+
+PLACEHOLDER_REGEX: re.Pattern[str] = re.compile(
+    r"\{([A-Za-z_][A-Za-z0-9_]*)\}"
+)
+LIST_SEPARATOR: str = ","
+LIST_OPERATORS: dict[str, str] = {"=": "$in", "!=": "$nin"}
+TEMPLATED_KEY_ERROR: str = (
+    "Placeholders are only allowed in values: {parameter}"
+)
+MISSING_VALUES_ERROR: str = "Missing values for {names}"
+UNKNOWN_VALUES_ERROR: str = "Unknown placeholders {names}"
+MAPPING_VALUES_ERROR: str = (
+    "Mappings cannot be bound, their keys would be read as "
+    "operators: {names}"
+)
+
+
+# =========================================================
+# CLASS TEMPLATE PARAMETER
+# =========================================================
+class TemplateParameter(NamedTuple):
+    """
+    Parameter of a MoQL template holding placeholders in its value.
+
+    Example input: created>={since}
+
+    token: created>={since}, names: ("since",), name: "since"
+    """
+
+    token: MoQLToken
+    # Placeholders found in the value
+    names: tuple[str, ...]
+    # Placeholder the value consists of, None when the value mixes
+    # placeholders and text (e.g. name=str({name}))
+    name: Optional[str]
+
+
+# ---------------------------------------------------------
+# FUNCTION FORMAT VALUE
+# ---------------------------------------------------------
+def format_value(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return LIST_SEPARATOR.join(str(item) for item in value)
+    return str(value)
+
+
+# ---------------------------------------------------------
+# FUNCTION FILL TEMPLATE
+# ---------------------------------------------------------
+def fill_template(template: str, values: Mapping[str, Any]) -> str:
+    return PLACEHOLDER_REGEX.sub(
+        lambda match: format_value(values[match.group(1)]), template
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION LITERAL CAST
+# ---------------------------------------------------------
+def literal_cast(name: str, value: Any) -> Any:
+    """
+    Casts a bound value as a literal. Strings only get the MoQL type
+    casts (e.g. "5" becomes 5 and "2024-01-01" a datetime). The casts
+    that build operators ("a,b" as $in, "/a/" as $regex) and the
+    custom casters are not applied, so a bound string never changes
+    the shape of the filter. Mappings are rejected, since their keys
+    would be read as operators.
+    """
+    if isinstance(value, Mapping):
+        raise PreparedMoQLError(MAPPING_VALUES_ERROR.format(names=[name]))
+    if not isinstance(value, str):
+        return value
+    casted_value: Any = default_cast(value)
+    return (
+        value if isinstance(casted_value, (list, dict)) else casted_value
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION BIND FILTER
+# ---------------------------------------------------------
+def bind_filter(key: str, operator: str, name: str, value: Any) -> dict:
+    """
+    Builds the filter of a parameter whose value is a single
+    placeholder. Values are literals (see literal_cast). Lists,
+    tuples and sets become $in / $nin filters of literals.
+    """
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if operator not in LIST_OPERATORS:
+            raise ListOperatorError(
+                LIST_OPERATOR_ERROR_TEMPLATE.format(operator=operator)
+            )
+        return {
+            key: {
+                LIST_OPERATORS[operator]: [
+                    literal_cast(name, item) for item in value
+                ]
+            }
+        }
+    return build_query(
+        operator=operator,
+        key=key,
+        value=literal_cast(name, value),
+        casters=None,
+    )
+
+
+# =========================================================
+# CLASS PREPARED MOQL
+# =========================================================
+class PreparedMoQL:
+    """
+    MoQL template whose values are bound on each call, e.g.
+    "status={status}&created>={since}&sort=-created&limit=50".
+
+    The parameters without placeholders are compiled once, when
+    the template is prepared. Binding only casts the bound values
+    and builds their filters, so it skips the parsing of the rest
+    of the query. Bound values are never split on "&" nor
+    percent-decoded, so they cannot add parameters to the query.
+    Values bound to a whole placeholder are literals: they cannot
+    add operators to the filter either (see literal_cast).
+
+    Placeholders within a value (e.g. name=object_id({id})) are
+    formatted into the MoQL value, which is then cast as usual
+    (custom casters included), so they are meant for values the
+    caster validates.
+
+    Placeholders are only allowed in values. They may be used by
+    reserved parameters too (e.g. limit={limit}), whose values are
+    formatted and parsed on each call.
+
+    Instances are immutable and can be shared across threads.
+
+    Example:
+        prepared = MoQL.prepare("status={status}&created>={since}")
+        service.get_by_moql(prepared.bind(status="ACTIVE", since=day))
+    """
+
+    __slots__ = ("moql", "casters", "compiled", "parameters", "names")
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(
+        self,
+        moql: str,
+        blacklist: Optional[tuple[str, ...]] = None,
+        casters: Optional[Mapping[str, Callable]] = None,
+    ):
+        static_segments: list[str] = []
+        parameters: list[TemplateParameter] = []
+        for segment in moql.split(QUERY_STRING_PARAM_SEPARATOR):
+            parameter: str = decode(segment)
+            if blacklist and parameter.startswith(blacklist):
+                continue
+            if PLACEHOLDER_REGEX.search(parameter) is None:
+                static_segments.append(segment)
+                continue
+            parameters.append(template_parameter(segment))
+        self.moql: str = moql
+        self.casters: Optional[dict[str, Callable]] = (
+            dict(casters) if casters else None
+        )
+        self.compiled: CompiledMoQL = compile_moql(
+            moql=QUERY_STRING_PARAM_SEPARATOR.join(static_segments),
+            casters=casters,
+        )
+        self.parameters: tuple[TemplateParameter, ...] = tuple(parameters)
+        self.names: frozenset[str] = frozenset(
+            name for parameter in parameters for name in parameter.names
+        )
+
+    # -----------------------------------------------------
+    # METHOD BIND
+    # -----------------------------------------------------
+    def bind(self, **values: Any) -> CompiledMoQL:
+        """
+        Binds values to the placeholders of the template.
+        :param values: One value per placeholder
+        :return: Compiled query, accepted wherever a MoQL string is
+        (e.g. EntityService.get_by_moql)
+        """
+        missing: set[str] = self.names - values.keys()
+        if missing:
+            raise PreparedMoQLError(
+                MISSING_VALUES_ERROR.format(names=sorted(missing))
+            )
+        unknown: set[str] = values.keys() - self.names
+        if unknown:
+            raise PreparedMoQLError(
+                UNKNOWN_VALUES_ERROR.format(names=sorted(unknown))
+            )
+        mappings: list[str] = sorted(
+            name
+            for name, value in values.items()
+            if isinstance(value, Mapping)
+        )
+        if mappings:
+            raise PreparedMoQLError(
+                MAPPING_VALUES_ERROR.format(names=mappings)
+            )
+        # Only the filter is altered in place. The other values stay
+        # frozen and are shared with the compiled template.
+        query: dict[str, Any] = dict(self.compiled.query)
+        query[FILTER] = dict(query[FILTER])
+        for parameter in self.parameters:
+            self.bind_parameter(query, parameter, values)
+        return CompiledMoQL(moql=self.moql, mongo_query=query)
+
+    # -----------------------------------------------------
+    # METHOD BIND PARAMETER
+    # -----------------------------------------------------
+    def bind_parameter(
+        self,
+        query: dict[str, Any],
+        parameter: TemplateParameter,
+        values: Mapping[str, Any],
+    ):
+        token: MoQLToken = parameter.token
+        handler: Optional[Callable[[dict, str], None]] = (
+            RESERVED_HANDLERS.get(token.key)
+            if token.operator == EQUALS_OPERATOR
+            else None
+        )
+        if handler:
+            handler(
+                query,
+                f"{token.key}{token.operator}"
+                f"{fill_template(token.value, values)}",
+            )
+        elif parameter.name is not None:
+            merge_filter(
+                query[FILTER],
+                bind_filter(
+                    key=token.key,
+                    operator=token.operator,
+                    name=parameter.name,
+                    value=values[parameter.name],
+                ),
+            )
+        else:
+            merge_filter(
+                query[FILTER],
+                build_filter(
+                    key=token.key,
+                    operator=token.operator,
+                    value=fill_template(token.value, values),
+                    casters=self.casters,
+                    repeated_operator=token.repeated_operator,
+                ),
+            )
+
+    def __repr__(self) -> str:
+        return f"PreparedMoQL({self.moql!r})"
+
+
+# ---------------------------------------------------------
+# FUNCTION TEMPLATE PARAMETER
+# ---------------------------------------------------------
+def template_parameter(segment: str) -> TemplateParameter:
+    token: MoQLToken = tokenize_segment(segment)
+    # Flags (active, !active) name a field, which must not be bound
+    if token.key == EMPTY_STRING or PLACEHOLDER_REGEX.search(token.key):
+        raise PreparedMoQLError(
+            TEMPLATED_KEY_ERROR.format(parameter=token.parameter)
+        )
+    whole: Optional[re.Match] = PLACEHOLDER_REGEX.fullmatch(token.value)
+    return TemplateParameter(
+        token=token,
+        names=tuple(PLACEHOLDER_REGEX.findall(token.value)),
+        name=whole.group(1) if whole else None,
+    )
@@ -0,0 +1,46 @@
+from functools import lru_cache
+
+from moapi.moql.constants import (
+    FIELDS_KEY,
+    QUERY_STRING_PARAM_SEPARATOR,
+    SORT_KEY,
+)
+from moapi.moql.lexer import MoQLToken, tokenize
+
+PLACEHOLDER: str = "?"
+DEFAULT_SHAPE_CACHE_SIZE: int = 1024
+# Parameters whose value is part of the structure of the query
+STRUCTURAL_KEYS: frozenset[str] = frozenset({SORT_KEY, FIELDS_KEY})
+
+
+# ---------------------------------------------------------
+# FUNCTION TOKEN SHAPE
+# ---------------------------------------------------------
+def token_shape(token: MoQLToken) -> str:
+    if not token.key or token.key in STRUCTURAL_KEYS:
+        # Flags (active, !active) name a field instead of holding a
+        # value, so they are kept as given along with sort and fields
+        return token.parameter
+    return f"{token.key}{token.operator}{PLACEHOLDER}"
+
+
+# ---------------------------------------------------------
+# FUNCTION MOQL SHAPE
+# ---------------------------------------------------------
+@lru_cache(maxsize=DEFAULT_SHAPE_CACHE_SIZE)
+def moql_shape(moql: str) -> str:
+    """
+    Normalizes a MoQL query by replacing the literal values with a
+    placeholder, so queries that only differ in their values share
+    the same shape. Sort and fields are kept since they change the
+    query plan, while skip, limit and $text values are replaced.
+    Parameters are sorted, making the shape independent of the
+    order they were given in.
+
+    Example: "b>5&a=x&sort=-b&limit=10" -> "a=?&b>?&limit=?&sort=-b"
+    :param moql: MoQL query string
+    :return: Shape of the query
+    """
+    return QUERY_STRING_PARAM_SEPARATOR.join(
+        sorted(token_shape(token) for token in tokenize(moql))
+    )
@@ -0,0 +1,456 @@
+from typing import AsyncIterator, Generic, Iterable, Optional
+
+from pymongo.results import InsertOneResult, UpdateResult
+
+from moapi.moql.cache import MoQLQuery
+from moapi.odm.connection import (
+    MongoDBParameters,
+)
+from moapi.odm.entity_service import (
+    document_to_model,
+    document_list_to_model_list,
+    model_to_document,
+    model_to_write_document,
+    model_to_update,
+    moql_to_query,
+)
+from moapi.odm.types import (
+    MONGO_INTERNAL_ID_KEY,
+    MoAPIType,
+)
+
+
+# =========================================================
+# ITERATE ASYNC CURSOR
+# =========================================================
+async def iterate_async_cursor(cursor, batch_size: Optional[int] = None):
+    """
+    Async counterpart of iterate_cursor. Lazily yields the
+    documents pointed by a motor cursor as the batches arrive.
+    :param cursor: Async cursor that points to the results
+    :param batch_size: Number of documents requested to the
+    server per batch.
+    :return: Async generator of documents (dictionaries).
+    """
+    if batch_size:
+        cursor.batch_size(batch_size)
+    async for document in cursor:
+        yield document
+
+
+# =========================================================
+# CLASS ASYNC ENTITY SERVICE
+# =========================================================
+class AsyncEntityService(Generic[MoAPIType]):
+    """
+    Asynchronous version of EntityService built on top of motor.
+    It exposes the same surface as EntityService, but every
+    database operation is a coroutine and result iterators are
+    async generators.
+    """
+
+    class Meta:
+        collection_name: str
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(
+        self,
+        collection_name: str,
+        db_connection_parameters: MongoDBParameters,
+    ):
+        self.collection_name = collection_name
+        self.connection_parameters: MongoDBParameters = (
+            db_connection_parameters
+        )
+        self.__document_class = self.get_document_class()
+
+    # -----------------------------------------------------
+    # GET DOCUMENT CLASS
+    # -----------------------------------------------------
+    def get_document_class(self):
+        return (
+            getattr(self.Meta, "document_class")
+            if hasattr(self.Meta, "document_class")
+            else self.__orig_bases__[0].__args__[0]  # type: ignore
+        )
+
+    # -----------------------------------------------------
+    # PROPERTY COLLECTION
+    # -----------------------------------------------------
+    @property
+    def collection(self):
+        return self.connection_parameters.async_db[self.collection_name]
+
+    # -----------------------------------------------------
+    # PROPERTY ENTITIES
+    # -----------------------------------------------------
+    @property
+    def entities(self):
+        # Motor clients are bound to the event loop they run on, so
+        # the collection is resolved on every call: the client
+        # registry hands out the client of the running loop
+        return self.collection
+
+    # -----------------------------------------------------
+    # FIND
+    # -----------------------------------------------------
+    def _find(
+        self,
+        query: dict,
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+    ):
+        cursor = self.entities.find(query)
+        if skip:
+            cursor.skip(skip)
+        if limit:
+            cursor.limit(limit)
+        return cursor
+
+    # -----------------------------------------------------
+    # GET
+    # -----------------------------------------------------
+    async def get(
+        self,
+        query: dict,
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Get a list of documents on the given collection based
+        on a filter (represented in Python as a dictionary).
+        :param limit: sets the maximum amount of results the query
+        will return
+        :param skip: sets the amount of documents to be skipped
+        :param query: A dictionary containing a valid MongoDB
+        filter
+        :return: List of documents
+        """
+        return await self._find(
+            query=query, skip=skip, limit=limit
+        ).to_list(None)
+
+    # -----------------------------------------------------
+    # GET TYPED
+    # -----------------------------------------------------
+    async def get_typed(
+        self,
+        query: dict,
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+        track: bool = False,
+    ) -> Iterable[MoAPIType]:
+        """
+        Same as get but documents are returned as instances of
+        models instead of plain dictionaries.
+        :param limit: sets the maximum amount of results the query
+        will return
+        :param skip: sets the amount of documents to be skipped
+        :param query: Dictionary containing the mongo query
+        :param track: record the loaded state of the models, so
+        update_one_typed only sends the paths that changed
+        :return: List of instances of Entity derived classes
+        """
+        return document_list_to_model_list(
+            model_type=self.__document_class,
+            documents=await self.get(query=query, skip=skip, limit=limit),
+            track=track,
+        )
+
+    # -----------------------------------------------------
+    # ITER
+    # -----------------------------------------------------
+    def iter(
+        self,
+        query: dict,
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Lazily iterates over the documents that match a filter.
+        :param limit: sets the maximum amount of results the query
+        will return
+        :param skip: sets the amount of documents to be skipped
+        :param batch_size: number of documents fetched per round trip
+        :param query: A dictionary containing a valid MongoDB
+        filter
+        :return: Async generator of documents
+        """
+        return iterate_async_cursor(
+            self._find(query=query, skip=skip, limit=limit),
+            batch_size=batch_size,
+        )
+
+    # -----------------------------------------------------
+    # ITER TYPED
+    # -----------------------------------------------------
+    async def iter_typed(
+        self,
+        query: dict,
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        track: bool = False,
+    ) -> AsyncIterator[MoAPIType]:
+        """
+        Same as iter but documents are yielded as instances of
+        models instead of plain dictionaries.
+        :param limit: sets the maximum amount of results the query
+        will return
+        :param skip: sets the amount of documents to be skipped
+        :param batch_size: number of documents fetched per round trip
+        :param query: Dictionary containing the mongo query
+        :param track: record the loaded state of the models (see
+        get_typed)
+        :return: Async generator of instances of Entity derived classes
+        """
+        async for document in self.iter(
+            query=query, skip=skip, limit=limit, batch_size=batch_size
+        ):
+            yield document_to_model(
+                self.__document_class, document, track=track
+            )
+
+    # -----------------------------------------------------
+    # GET ONE
+    # -----------------------------------------------------
+    async def get_one(
+        self, identifier_key: str, identifier_value: any
+    ) -> Optional[dict]:
+        """
+
+        Args:
+            identifier_key:
+            identifier_value:
+
+        Returns:
+
+        """
+        result = await self.entities.find_one(
+            {identifier_key: identifier_value}
+        )
+        return result if result else None
+
+    # -----------------------------------------------------
+    # GET ONE TYPED
+    # -----------------------------------------------------
+    async def get_one_typed(
+        self,
+        identifier_key: str,
+        identifier_value: any,
+        track: bool = False,
+    ) -> Optional[MoAPIType]:
+        """
+
+        Args:
+            identifier_key:
+            identifier_value:
+            track: record the loaded state of the model, so
+            update_one_typed only sends the paths that changed
+
+        Returns:
+
+        """
+        result = await self.entities.find_one(
+            {identifier_key: identifier_value}
+        )
+        return (
+            document_to_model(self.__document_class, result, track=track)
+            if result
+            else None
+        )
+
+    # -----------------------------------------------------
+    # ADD ONE
+    # -----------------------------------------------------
+    async def add_one(self, model_data: dict) -> InsertOneResult:
+        """
+
+        Args:
+            model_data:
+
+        Returns:
+
+        """
+        return (await self.entities.insert_one(model_data)).inserted_id
+
+    # -----------------------------------------------------
+    # ADD ONE TYPED
+    # -----------------------------------------------------
+    async def add_one_typed(self, model: MoAPIType) -> str:
+        """
+        Saves entity to database
+        :param model: An instance of a class that extends Entity
+        :return:
+        """
+        return (
+            await self.entities.insert_one(model_to_document(model))
+        ).inserted_id
+
+    # -----------------------------------------------------
+    # ADD MANY
+    # -----------------------------------------------------
+    async def add_many(self, documents: Iterable[dict]):
+        """
+
+        Args:
+            documents:
+
+        Returns:
+
+        """
+        return await self.entities.insert_many(documents=documents)
+
+    # -----------------------------------------------------
+    # ADD MANY TYPED
+    # -----------------------------------------------------
+    async def add_many_typed(self, models: Iterable[MoAPIType]):
+        """
+
+        Args:
+            models:
+
+        Returns:
+
+        """
+        return await self.add_many(
+            [model_to_write_document(model) for model in models]
+        )
+
+    # -----------------------------------------------------
+    # UPDATE ONE
+    # -----------------------------------------------------
+    async def update_one(
+        self, filter_data: dict, document: dict
+    ) -> UpdateResult:
+        """
+
+        Args:
+            filter_data:
+            document:
+
+        Returns:
+
+        """
+        return await self.entities.update_one(
+            filter=filter_data, update={"$set": document}
+        )
+
+    # -----------------------------------------------------
+    # UPDATE ONE TYPED
+    # -----------------------------------------------------
+    async def update_one_typed(self, model: MoAPIType) -> UpdateResult:
+        """
+        Saves the changes of a model. Tracked models (read with
+        track=True) only send the paths that changed since they were
+        loaded; other models set every field.
+
+        Args:
+            model:
+
+        Returns:
+            Result of the update
+        """
+        document: dict = model_to_document(model=model)
+        update: dict = model_to_update(model=model, document=document)
+        filter_data = {MONGO_INTERNAL_ID_KEY: str(model.mongo_id)}
+        result: UpdateResult = await self.entities.update_one(
+            filter=filter_data, update=update
+        )
+        if model.is_tracked:
+            model.mark_loaded(document)
+        return result
+
+    # -----------------------------------------------------
+    # DELETE ONE
+    # -----------------------------------------------------
+    async def delete_one(self, filter_data: dict):
+        """
+
+        Args:
+            filter_data:
+
+        Returns:
+
+        """
+        return await self.entities.delete_one(filter=filter_data)
+
+    # -----------------------------------------------------
+    # DELETE MANY
+    # -----------------------------------------------------
+    async def delete_many(self, filter_data: dict):
+        """
+
+        Args:
+            filter_data:
+
+        Returns:
+
+        """
+        return await self.entities.delete_many(filter=filter_data)
+
+    # -----------------------------------------------------
+    # PUSH ONE
+    # -----------------------------------------------------
+    async def push_one(
+        self,
+        match_key: str,
+        match_key_value: str,
+        match_array: str,
+        new_value: any,
+    ) -> UpdateResult:
+        """
+
+        Args:
+            match_key:
+            match_key_value:
+            match_array:
+            new_value:
+
+        Returns:
+
+        """
+        filter_data: dict = {match_key: match_key_value}
+        return await self.entities.update_one(
+            filter=filter_data, update={"$push": {match_array: new_value}}
+        )
+
+    # -----------------------------------------------------
+    # GET BY MOQL
+    # -----------------------------------------------------
+    async def get_by_moql(self, moql: MoQLQuery) -> list[dict]:
+        """
+
+        Args:
+            moql:
+
+        Returns:
+
+        """
+        return await self.entities.find(**moql_to_query(moql)).to_list(
+            None
+        )
+
+    # -----------------------------------------------------
+    # ITER BY MOQL
+    # -----------------------------------------------------
+    def iter_by_moql(
+        self, moql: MoQLQuery, batch_size: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Lazily iterates over the documents that match the given
+        MoQL query.
+        Args:
+            moql: MoQL query string or compiled query
+            batch_size: number of documents fetched per round trip
+
+        Returns:
+            Async generator of documents
+        """
+        return iterate_async_cursor(
+            self.entities.find(**moql_to_query(moql)),
+            batch_size=batch_size,
+        )
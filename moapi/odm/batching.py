@@ -0,0 +1,76 @@
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Mapping, TypeVar
+
+import bson
+
+ItemType = TypeVar("ItemType")
+# Only one item out of DEFAULT_SIZE_SAMPLE_INTERVAL is measured when
+# bounding chunks by size, the others are assumed to be as large as
+# the last measured one. Measuring a document means encoding it,
+# which would otherwise double the encoding cost of a write.
+DEFAULT_SIZE_SAMPLE_INTERVAL: int = 50
+
+
+# ---------------------------------------------------------
+# FUNCTION CHUNKED
+# ---------------------------------------------------------
+def chunked(
+    items: Iterable[ItemType], size: int
+) -> Iterator[list[ItemType]]:
+    """
+    Lazily splits an iterable into lists of at most size items.
+    """
+    iterator: Iterator[ItemType] = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# ---------------------------------------------------------
+# FUNCTION CHUNKED BY SIZE
+# ---------------------------------------------------------
+def chunked_by_size(
+    items: Iterable[ItemType],
+    max_count: int,
+    max_bytes: int,
+    size_of: Callable[[ItemType], int],
+    sample_interval: int = 1,
+) -> Iterator[list[ItemType]]:
+    """
+    Lazily splits an iterable into lists bounded both by the amount
+    of items and by their estimated size in bytes. An item larger
+    than max_bytes is yielded on its own.
+
+    With sample_interval > 1, only one item out of sample_interval
+    (starting with the first one) is measured, and the items in
+    between are estimated with the last measured size.
+    """
+    chunk: list[ItemType] = []
+    chunk_bytes: int = 0
+    item_bytes: int = 0
+    for index, item in enumerate(items):
+        if index % sample_interval == 0:
+            item_bytes = size_of(item)
+        if chunk and chunk_bytes + item_bytes > max_bytes:
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(item)
+        chunk_bytes += item_bytes
+        # Full chunks are yielded right away so the iterable is never
+        # consumed ahead of what is needed
+        if len(chunk) >= max_count:
+            yield chunk
+            chunk, chunk_bytes = [], 0
+    if chunk:
+        yield chunk
+
+
+# ---------------------------------------------------------
+# FUNCTION BSON SIZE
+# ---------------------------------------------------------
+def bson_size(document: Any) -> int:
+    if isinstance(document, Mapping):
+        return len(bson.encode(document))
+    if isinstance(document, list):
+        # Update pipelines are sent as an array of stages
+        return sum(bson_size(stage) for stage in document)
+    return 0
@@ -0,0 +1,261 @@
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from pymongo import DeleteOne, InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.results import BulkWriteResult, InsertManyResult
+
+from moapi.odm.batching import (
+    DEFAULT_SIZE_SAMPLE_INTERVAL,
+    bson_size,
+    chunked_by_size,
+)
+from moapi.odm.types import MONGO_INTERNAL_ID_KEY
+
+DEFAULT_BULK_BATCH_SIZE: int = 1000
+# Stay well below the 48MB maximum message size of the server
+DEFAULT_MAX_BATCH_BYTES: int = 16 * 1024 * 1024
+WRITE_ERRORS_KEY: str = "writeErrors"
+UPSERTED_KEY: str = "upserted"
+INDEX_KEY: str = "index"
+INSERTED_IDS_KEY: str = "insertedIds"
+MISSING_IDENTIFIER_ERROR: str = (
+    "Cannot replace a document without {key} when upsert is disabled"
+)
+
+WriteOperation = Union[InsertOne, UpdateOne, ReplaceOne, DeleteOne]
+
+
+# ---------------------------------------------------------
+# FUNCTION SIZED BATCHES
+# ---------------------------------------------------------
+def sized_batches(
+    operations: Iterable[tuple[WriteOperation, dict]],
+    max_count: int,
+    max_bytes: int,
+) -> Iterator[list[WriteOperation]]:
+    """
+    Lazily groups write operations in batches bounded by amount and
+    by the estimated BSON size of the documents they were built
+    from, given along with each operation. Only a sample of the
+    documents is encoded to estimate the size.
+    """
+    for batch in chunked_by_size(
+        operations,
+        max_count=max_count,
+        max_bytes=max_bytes,
+        size_of=lambda operation: bson_size(operation[1]),
+        sample_interval=DEFAULT_SIZE_SAMPLE_INTERVAL,
+    ):
+        yield [operation for operation, _ in batch]
+
+
+# ---------------------------------------------------------
+# FUNCTION INSERT OPERATION
+# ---------------------------------------------------------
+def insert_operation(document: dict) -> InsertOne:
+    # A null _id (e.g. from a model without mongo_id) is left out so
+    # an identifier is generated instead of inserting _id: null
+    if MONGO_INTERNAL_ID_KEY in document and (
+        document[MONGO_INTERNAL_ID_KEY] is None
+    ):
+        document = dict(document)
+        del document[MONGO_INTERNAL_ID_KEY]
+    return InsertOne(document)
+
+
+# ---------------------------------------------------------
+# FUNCTION REPLACE OPERATION
+# ---------------------------------------------------------
+def replace_operation(
+    document: dict,
+    identifier_key: str = MONGO_INTERNAL_ID_KEY,
+    upsert: bool = True,
+) -> Union[ReplaceOne, InsertOne]:
+    """
+    Builds a ReplaceOne matching the document by its identifier.
+    Documents without identifier can't match an existing one, so
+    they are inserted when upsert is set (matching {key: null}
+    would make every new document replace the same one).
+    """
+    if document.get(identifier_key) is None:
+        if not upsert:
+            raise ValueError(
+                MISSING_IDENTIFIER_ERROR.format(key=identifier_key)
+            )
+        return insert_operation(document)
+    replacement: dict = dict(document)
+    if identifier_key == MONGO_INTERNAL_ID_KEY:
+        replacement.pop(MONGO_INTERNAL_ID_KEY, None)
+    return ReplaceOne(
+        {identifier_key: document.get(identifier_key)},
+        replacement,
+        upsert=upsert,
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION UPSERT OPERATION
+# ---------------------------------------------------------
+def upsert_operation(
+    document: dict, identifier_key: str = MONGO_INTERNAL_ID_KEY
+) -> Union[UpdateOne, InsertOne]:
+    """
+    Builds an UpdateOne that sets every field of the document and
+    inserts it when no document matches the identifier. The _id
+    can't be modified, so it is only written on insert. Documents
+    without identifier are new, so they are plainly inserted.
+    """
+    if document.get(identifier_key) is None:
+        return insert_operation(document)
+    values: dict = dict(document)
+    mongo_id: Any = values.pop(MONGO_INTERNAL_ID_KEY, None)
+    update: dict = {"$set": values}
+    if identifier_key != MONGO_INTERNAL_ID_KEY and mongo_id is not None:
+        update["$setOnInsert"] = {MONGO_INTERNAL_ID_KEY: mongo_id}
+    return UpdateOne(
+        {identifier_key: document.get(identifier_key)}, update, upsert=True
+    )
+
+
+# =========================================================
+# CLASS BULK WRITE SUMMARY
+# =========================================================
+class BulkWriteSummary:
+    """
+    Combined result of a bulk write executed in several batches.
+    Upserted ids and errors are reported with the index of the
+    operation in the whole input, not in its batch.
+    """
+
+    def __init__(self):
+        self.inserted_count: int = 0
+        self.matched_count: int = 0
+        self.modified_count: int = 0
+        self.deleted_count: int = 0
+        self.upserted_count: int = 0
+        self.upserted_ids: dict[int, Any] = {}
+        self.errors: list[dict] = []
+        self.batches: int = 0
+
+    # -----------------------------------------------------
+    # METHOD ADD RESULT
+    # -----------------------------------------------------
+    def add_result(self, result: BulkWriteResult, offset: int):
+        self.add_details(result.bulk_api_result, offset)
+
+    # -----------------------------------------------------
+    # METHOD ADD DETAILS
+    # -----------------------------------------------------
+    def add_details(self, details: dict, offset: int):
+        """
+        Accumulates the raw bulk API result of a batch, either
+        from a successful write or from a BulkWriteError.
+        """
+        self.batches += 1
+        self.inserted_count += details.get("nInserted", 0)
+        self.matched_count += details.get("nMatched", 0)
+        self.modified_count += details.get("nModified", 0)
+        self.deleted_count += details.get("nRemoved", 0)
+        self.upserted_count += details.get("nUpserted", 0)
+        for upserted in details.get(UPSERTED_KEY, []):
+            self.upserted_ids[upserted[INDEX_KEY] + offset] = upserted[
+                MONGO_INTERNAL_ID_KEY
+            ]
+        for error in details.get(WRITE_ERRORS_KEY, []):
+            self.errors.append(
+                {**error, INDEX_KEY: error[INDEX_KEY] + offset}
+            )
+
+    # -----------------------------------------------------
+    # PROPERTY HAS ERRORS
+    # -----------------------------------------------------
+    @property
+    def has_errors(self) -> bool:
+        return bool(self.errors)
+
+    # -----------------------------------------------------
+    # METHOD ERROR FOR
+    # -----------------------------------------------------
+    def error_for(self, index: int) -> Optional[dict]:
+        for error in self.errors:
+            if error[INDEX_KEY] == index:
+                return error
+        return None
+
+
+# =========================================================
+# CLASS INSERT MANY SUMMARY
+# =========================================================
+class InsertManySummary:
+    """
+    Combined result of an insert split in several insert_many calls
+    (see EntityService.add_many_typed). Write errors are kept with
+    the index of the document in the whole input.
+    """
+
+    def __init__(self):
+        self.inserted_ids: list = []
+        self.errors: list[dict] = []
+        self.acknowledged: bool = True
+        self.offset: int = 0
+
+    # -----------------------------------------------------
+    # METHOD ADD RESULT
+    # -----------------------------------------------------
+    def add_result(self, result: InsertManyResult, chunk: list[dict]):
+        self.inserted_ids.extend(result.inserted_ids)
+        self.acknowledged = self.acknowledged and result.acknowledged
+        self.offset += len(chunk)
+
+    # -----------------------------------------------------
+    # METHOD ADD ERROR
+    # -----------------------------------------------------
+    def add_error(
+        self, error: BulkWriteError, chunk: list[dict], ordered: bool
+    ):
+        """
+        Accumulates a failed insert_many. The documents of the chunk
+        are given their _id by pymongo before being sent, so the
+        inserted ones are those that did not fail and, in an ordered
+        insert, come before the first failure.
+        """
+        write_errors: list[dict] = error.details.get(WRITE_ERRORS_KEY, [])
+        failed: set[int] = {item[INDEX_KEY] for item in write_errors}
+        attempted: int = (
+            min(failed, default=len(chunk)) if ordered else len(chunk)
+        )
+        self.inserted_ids.extend(
+            document.get(MONGO_INTERNAL_ID_KEY)
+            for index, document in enumerate(chunk[:attempted])
+            if index not in failed
+        )
+        self.errors.extend(
+            {**item, INDEX_KEY: item[INDEX_KEY] + self.offset}
+            for item in write_errors
+        )
+        self.offset += len(chunk)
+
+    # -----------------------------------------------------
+    # METHOD RESULT
+    # -----------------------------------------------------
+    def result(self) -> InsertManyResult:
+        """
+        Returns the combined result, or raises a BulkWriteError
+        holding every write error and the ids that were inserted
+        (under insertedIds) when some documents failed.
+        """
+        if self.errors:
+            raise BulkWriteError(
+                {
+                    WRITE_ERRORS_KEY: self.errors,
+                    "writeConcernErrors": [],
+                    "nInserted": len(self.inserted_ids),
+                    "nUpserted": 0,
+                    "nMatched": 0,
+                    "nModified": 0,
+                    "nRemoved": 0,
+                    UPSERTED_KEY: [],
+                    INSERTED_IDS_KEY: self.inserted_ids,
+                }
+            )
+        return InsertManyResult(self.inserted_ids, self.acknowledged)
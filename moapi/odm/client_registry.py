@@ -0,0 +1,260 @@
+import asyncio
+import os
+import threading
+import weakref
+from collections.abc import Mapping
+from typing import Any, Callable, Optional
+
+from pymongo import MongoClient
+
+# Registries alive in this process. They are tracked weakly so that
+# the fork handler can reset them without keeping them alive.
+_REGISTRIES: "weakref.WeakSet[MongoClientRegistry]" = weakref.WeakSet()
+
+
+# ---------------------------------------------------------
+# FUNCTION OPTIONS KEY
+# ---------------------------------------------------------
+def options_key(value: Any) -> Any:
+    """
+    Returns client options in a hashable form, so that they can be
+    part of the key of a client. Mappings and sequences are turned
+    into tuples, other values (e.g. event listeners) are kept as
+    they are and compared by identity unless they define equality.
+
+    Example input: {"event_listeners": [listener], "appname": "api"}
+
+    Example output: (("appname", "api"), ("event_listeners", (listener,)))
+    """
+    if isinstance(value, Mapping):
+        return tuple(
+            sorted((key, options_key(item)) for key, item in value.items())
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(options_key(item) for item in value)
+    return value
+
+
+# =========================================================
+# CLASS MONGO CLIENT REGISTRY
+# =========================================================
+class MongoClientRegistry:
+    """
+    Process-wide registry of Mongo clients keyed by the resolved
+    connection string and the client options.
+
+    Clients are expensive: each one owns a connection pool, monitor
+    threads and (when required) TLS sessions. The registry hands out
+    a single shared, thread-safe client per connection string and
+    options so every service in the process reuses the same pool.
+    Options are given to the client when it is created, so services
+    asking for different options (e.g. other event listeners) get
+    their own client.
+
+    Clients must not be shared across a fork. When the registry is
+    used from a child process, the clients inherited from the parent
+    are discarded (never closed, since the sockets belong to the
+    parent) and new ones are created on demand.
+
+    Async (motor) clients are bound to the event loop they first run
+    on. With per_event_loop=True, clients are also keyed by the
+    running event loop, and the clients of closed loops are closed
+    and forgotten when a new client is created.
+    """
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(
+        self,
+        client_factory: Callable[..., Any] = MongoClient,
+        per_event_loop: bool = False,
+    ):
+        self.client_factory: Callable[..., Any] = client_factory
+        self.per_event_loop: bool = per_event_loop
+        # Clients by (connection string, options, event loop). The
+        # loop is None when clients are not bound to event loops.
+        self._clients: dict[tuple, Any] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._pid: int = os.getpid()
+        _REGISTRIES.add(self)
+
+    # -----------------------------------------------------
+    # METHOD GET
+    # -----------------------------------------------------
+    def get(self, connection_string: str, **client_options) -> Any:
+        """
+        Returns the client bound to the given connection string and
+        options, creating it on first use.
+        :param connection_string: Resolved Mongo connection string
+        :param client_options: Keyword arguments for the client
+        factory. Their values must be hashable once lists and
+        mappings are turned into tuples (see options_key).
+        :return: Shared client instance
+        """
+        self._check_pid()
+        key: tuple = (
+            connection_string,
+            options_key(client_options),
+            self._event_loop(),
+        )
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                self._discard_closed_loops()
+                client = self.client_factory(
+                    connection_string, **client_options
+                )
+                self._clients[key] = client
+            return client
+
+    # -----------------------------------------------------
+    # METHOD EVENT LOOP
+    # -----------------------------------------------------
+    def _event_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        if not self.per_event_loop:
+            return None
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+    # -----------------------------------------------------
+    # METHOD DISCARD CLOSED LOOPS
+    # -----------------------------------------------------
+    def _discard_closed_loops(self):
+        # Called with the lock held
+        closed: list[tuple] = [
+            key
+            for key in self._clients
+            if key[2] is not None and key[2].is_closed()
+        ]
+        for key in closed:
+            self._clients.pop(key).close()
+
+    # -----------------------------------------------------
+    # METHOD CLOSE
+    # -----------------------------------------------------
+    def close(self, connection_string: str) -> bool:
+        """
+        Closes and forgets the clients bound to the connection
+        string, whatever their options and event loops.
+        :param connection_string: Resolved Mongo connection string
+        :return: True if a client was closed
+        """
+        with self._lock:
+            clients: list[Any] = [
+                self._clients.pop(key)
+                for key in list(self._clients)
+                if key[0] == connection_string
+            ]
+        for client in clients:
+            client.close()
+        return bool(clients)
+
+    # -----------------------------------------------------
+    # METHOD CLOSE ALL
+    # -----------------------------------------------------
+    def close_all(self):
+        """
+        Closes every client held by the registry. Intended to be
+        called on application shutdown.
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    # -----------------------------------------------------
+    # METHOD RESET AFTER FORK
+    # -----------------------------------------------------
+    def reset_after_fork(self):
+        # The lock may have been held by another thread at fork time,
+        # so it is replaced instead of being acquired.
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._pid = os.getpid()
+
+    # -----------------------------------------------------
+    # METHOD CHECK PID
+    # -----------------------------------------------------
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self.reset_after_fork()
+
+    # -----------------------------------------------------
+    # DUNDER METHODS
+    # -----------------------------------------------------
+    def __contains__(self, connection_string: str) -> bool:
+        return any(key[0] == connection_string for key in self._clients)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+# ---------------------------------------------------------
+# FUNCTION RESET REGISTRIES AFTER FORK
+# ---------------------------------------------------------
+def _reset_registries_after_fork():
+    for registry in list(_REGISTRIES):
+        registry.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_registries_after_fork)
+
+
+# ---------------------------------------------------------
+# FUNCTION MOTOR CLIENT FACTORY
+# ---------------------------------------------------------
+def _motor_client_factory(connection_string: str, **client_options):
+    # Imported lazily so the blocking API does not pay for motor
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    return AsyncIOMotorClient(connection_string, **client_options)
+
+
+CLIENT_REGISTRY: MongoClientRegistry = MongoClientRegistry()
+ASYNC_CLIENT_REGISTRY: MongoClientRegistry = MongoClientRegistry(
+    client_factory=_motor_client_factory, per_event_loop=True
+)
+
+
+# ---------------------------------------------------------
+# FUNCTION GET CLIENT
+# ---------------------------------------------------------
+def get_client(
+    connection_string: str,
+    registry: Optional[MongoClientRegistry] = None,
+    **client_options,
+) -> Any:
+    registry = registry if registry is not None else CLIENT_REGISTRY
+    return registry.get(connection_string, **client_options)
+
+
+# ---------------------------------------------------------
+# FUNCTION GET ASYNC CLIENT
+# ---------------------------------------------------------
+def get_async_client(connection_string: str, **client_options) -> Any:
+    return ASYNC_CLIENT_REGISTRY.get(connection_string, **client_options)
+
+
+# ---------------------------------------------------------
+# FUNCTION CLOSE CLIENTS
+# ---------------------------------------------------------
+def close_clients(registry: Optional[MongoClientRegistry] = None):
+    """
+    Closes the clients of the given registry or, when no registry is
+    provided, the clients of both the blocking and async registries.
+    """
+    registries = (
+        (registry,)
+        if registry is not None
+        else (CLIENT_REGISTRY, ASYNC_CLIENT_REGISTRY)
+    )
+    for target in registries:
+        target.close_all()
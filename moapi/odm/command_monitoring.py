@@ -0,0 +1,297 @@
+import threading
+from time import perf_counter
+from typing import Any, Mapping, Optional
+
+import bson
+from pymongo import monitoring
+
+from moapi.odm.query_statistics import (
+    DEFAULT_MAX_ENTRIES,
+    StatementStatistics,
+    StatisticsRegistry,
+)
+from moapi.odm.instrumentation import DEFAULT_LATENCY_BUCKETS
+
+# Key used for commands that do not target a collection (ping,
+# endSessions, hello...)
+DATABASE_COMMAND: str = "$cmd"
+GET_MORE_COMMAND: str = "getMore"
+COLLECTION_FIELD: str = "collection"
+CURSOR_FIELD: str = "cursor"
+BATCH_FIELDS: tuple[str, ...] = ("firstBatch", "nextBatch")
+AFFECTED_FIELD: str = "n"
+MICROSECONDS: float = 1_000_000.0
+
+
+# =========================================================
+# CLASS COMMAND STATEMENT STATISTICS
+# =========================================================
+class CommandStatementStatistics(StatementStatistics):
+    """
+    Counters of a command on a collection. Besides the server
+    latency, it keeps the bytes sent and received and the time
+    spent waiting for a connection of the pool.
+    """
+
+    __slots__ = (
+        "bytes_out",
+        "bytes_in",
+        "pool_wait_time",
+        "max_pool_wait_time",
+    )
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(self, buckets: tuple[float, ...]):
+        super().__init__(buckets)
+        self.bytes_out: int = 0
+        self.bytes_in: int = 0
+        self.pool_wait_time: float = 0.0
+        self.max_pool_wait_time: float = 0.0
+
+    # -----------------------------------------------------
+    # METHOD OBSERVE
+    # -----------------------------------------------------
+    def observe(
+        self,
+        duration: float,
+        rows: Optional[int],
+        error: bool = False,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+        pool_wait_time: float = 0.0,
+    ):
+        super().observe(duration, rows, error)
+        self.bytes_out += bytes_out
+        self.bytes_in += bytes_in
+        self.pool_wait_time += pool_wait_time
+        self.max_pool_wait_time = max(
+            self.max_pool_wait_time, pool_wait_time
+        )
+
+    # -----------------------------------------------------
+    # METHOD AS DICT
+    # -----------------------------------------------------
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            **super().as_dict(),
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "pool_wait_time": self.pool_wait_time,
+            "mean_pool_wait_time": (
+                self.pool_wait_time / self.calls if self.calls else 0.0
+            ),
+            "max_pool_wait_time": self.max_pool_wait_time,
+        }
+
+
+# ---------------------------------------------------------
+# FUNCTION COMMAND COLLECTION
+# ---------------------------------------------------------
+def command_collection(command_name: str, command: Mapping) -> str:
+    """
+    Returns the collection targeted by a command (the value of its
+    first key for find, insert, aggregate..., or the collection
+    field of a getMore).
+    """
+    if command_name == GET_MORE_COMMAND:
+        return command.get(COLLECTION_FIELD, DATABASE_COMMAND)
+    target: Any = command.get(command_name)
+    return target if isinstance(target, str) else DATABASE_COMMAND
+
+
+# ---------------------------------------------------------
+# FUNCTION REPLY ROWS
+# ---------------------------------------------------------
+def reply_rows(reply: Mapping) -> Optional[int]:
+    """
+    Returns the documents returned (cursor batches) or affected
+    (n) by a command, if the reply tells.
+    """
+    cursor: Optional[Mapping] = reply.get(CURSOR_FIELD)
+    if isinstance(cursor, Mapping):
+        for field in BATCH_FIELDS:
+            if field in cursor:
+                return len(cursor[field])
+    return reply.get(AFFECTED_FIELD)
+
+
+# ---------------------------------------------------------
+# FUNCTION ENCODED SIZE
+# ---------------------------------------------------------
+def encoded_size(document: Mapping) -> int:
+    try:
+        return len(bson.encode(document))
+    except Exception:
+        return 0
+
+
+# =========================================================
+# CLASS COMMAND STATISTICS
+# =========================================================
+class CommandStatistics(
+    StatisticsRegistry,
+    monitoring.CommandListener,
+    monitoring.ConnectionPoolListener,
+):
+    """
+    Wire level statistics per collection and command, gathered
+    from the pymongo monitoring events: server latency, bytes sent
+    and received, and the time spent waiting for a connection of
+    the pool before running the command. A growing pool wait with
+    a steady server latency points at pool exhaustion instead of
+    slow queries.
+
+    Exposed through the same API as QueryStatistics (dump, write,
+    moapi query-stats).
+
+    The pool wait of a command is the wait of the last connection
+    checked out on the same thread, which is where pymongo checks
+    out the connection that runs the command.
+
+    Bytes are only measured with measure_bytes=True. pymongo does
+    not report the size of the messages, so the commands and replies
+    are encoded again, which costs about as much as sending them.
+
+    Example:
+        statistics = CommandStatistics()
+        parameters.add_event_listener(statistics)
+        ...
+        statistics.dump(sort_by="pool_wait_time")
+    """
+
+    key_names: tuple[str, ...] = ("collection", "command")
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+        measure_bytes: bool = False,
+    ):
+        super().__init__(max_entries=max_entries, buckets=buckets)
+        self.measure_bytes: bool = measure_bytes
+        self.checkout_failures: int = 0
+        # Started commands by (connection, request id): key of the
+        # entry, bytes sent and pool wait
+        self._started: dict[tuple, tuple] = {}
+        self._thread: threading.local = threading.local()
+
+    # -----------------------------------------------------
+    # METHOD CREATE ENTRY
+    # -----------------------------------------------------
+    def create_entry(self) -> CommandStatementStatistics:
+        return CommandStatementStatistics(self.buckets)
+
+    # -----------------------------------------------------
+    # METHOD TAKE POOL WAIT
+    # -----------------------------------------------------
+    def _take_pool_wait(self) -> float:
+        wait: float = getattr(self._thread, "pool_wait", 0.0)
+        self._thread.pool_wait = 0.0
+        return wait
+
+    # -----------------------------------------------------
+    # COMMAND LISTENER
+    # -----------------------------------------------------
+    def started(self, event: monitoring.CommandStartedEvent):
+        self._started[(event.connection_id, event.request_id)] = (
+            (
+                command_collection(event.command_name, event.command),
+                event.command_name,
+            ),
+            encoded_size(event.command) if self.measure_bytes else 0,
+            self._take_pool_wait(),
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        started: Optional[tuple] = self._started.pop(
+            (event.connection_id, event.request_id), None
+        )
+        if started is None:
+            return
+        key, bytes_out, pool_wait_time = started
+        self.record(
+            key,
+            duration=event.duration_micros / MICROSECONDS,
+            rows=reply_rows(event.reply),
+            bytes_out=bytes_out,
+            bytes_in=(
+                encoded_size(event.reply) if self.measure_bytes else 0
+            ),
+            pool_wait_time=pool_wait_time,
+        )
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        started: Optional[tuple] = self._started.pop(
+            (event.connection_id, event.request_id), None
+        )
+        if started is None:
+            return
+        key, bytes_out, pool_wait_time = started
+        self.record(
+            key,
+            duration=event.duration_micros / MICROSECONDS,
+            error=True,
+            bytes_out=bytes_out,
+            pool_wait_time=pool_wait_time,
+        )
+
+    # -----------------------------------------------------
+    # CONNECTION POOL LISTENER
+    # -----------------------------------------------------
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ):
+        self._thread.check_out_started = perf_counter()
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ):
+        # The duration is reported since pymongo 4.7
+        duration: Optional[float] = getattr(event, "duration", None)
+        if duration is None:
+            duration = perf_counter() - getattr(
+                self._thread, "check_out_started", perf_counter()
+            )
+        self._thread.pool_wait = duration
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ):
+        with self._lock:
+            self.checkout_failures += 1
+
+    # -----------------------------------------------------
+    # METHOD CLEAR
+    # -----------------------------------------------------
+    def clear(self):
+        super().clear()
+        self.checkout_failures = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
@@ -1,5 +1,9 @@
 from abc import ABCMeta, abstractmethod
-from pymongo import MongoClient, database
+from typing import Any
+
+from pymongo import database
+
+from moapi.odm.client_registry import get_client, get_async_client
 
 MONGO_CONN_SINGLE_HOST_PREFIX: str = "mongodb://"
 MONGO_CONN_SRV_LOOKUP_PREFIX: str = "mongodb+srv://"
@@ -118,9 +122,46 @@ class MongoDBParameters:
         return self.single_host_connection_str
 
     @property
-    def db(self) -> database.Database:
+    def event_listeners(self) -> list[Any]:
+        # pymongo monitoring listeners (command, pool, server...)
+        # registered with add_event_listener
+        return getattr(self, "_event_listeners", [])
+
+    def add_event_listener(self, listener: Any):
+        """
+        Registers a pymongo monitoring listener (e.g.
+        command_monitoring.CommandStatistics) on the clients of
+        these parameters. Clients are shared per connection string
+        and options, so later accesses to db or async_db use a
+        client created with the new listeners. Databases obtained
+        before keep the client they were bound to, so listeners
+        are best registered before the first access.
+        """
+        self._event_listeners: list[Any] = self.event_listeners + [
+            listener
+        ]
+
+    @property
+    def client_options(self) -> dict[str, Any]:
+        if self.event_listeners:
+            return {"event_listeners": self.event_listeners}
+        return {}
+
+    @property
+    def db(self) -> database.Database:  # pragma: no cover
+        # We don't unit-test this line because requires an
+        # actual DB connection. Clients are shared process-wide
+        # through the client registry, so every access reuses
+        # the same connection pool.
+        return get_client(
+            self.connection_with_prefix, **self.client_options
+        )[self.db_name]
+
+    @property
+    def async_db(self):  # pragma: no cover
         # We don't unit-test this line because requires an
-        # actual DB connection.
-        return MongoClient(self.connection_with_prefix)[
-            self.db_name
-        ]  # pragma: no cover
+        # actual DB connection. Returns a motor database that
+        # shares its client through the async client registry.
+        return get_async_client(
+            self.connection_with_prefix, **self.client_options
+        )[self.db_name]
@@ -1,18 +1,90 @@
-from typing import Generic, Optional, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, Generic, Optional, Iterable, Iterator
 
+from bson.raw_bson import RawBSONDocument
+from pydantic import TypeAdapter
+from pymongo import IndexModel
 from pymongo.collection import Collection
-from pymongo.results import InsertOneResult, UpdateResult
-from moapi.moql.core import MoQL
+from pymongo.errors import BulkWriteError
+from pymongo.results import (
+    InsertManyResult,
+    InsertOneResult,
+    UpdateResult,
+)
+from moapi.moql.cache import CompiledMoQL, MoQLQuery, compile_moql
+from moapi.moql.prepared import PreparedMoQL
 from moapi.odm.connection import (
     MongoDBParameters,
 )
+from moapi.odm.batching import (
+    DEFAULT_SIZE_SAMPLE_INTERVAL,
+    bson_size,
+    chunked,
+    chunked_by_size,
+)
+from moapi.odm.bulk import (
+    BulkWriteSummary,
+    InsertManySummary,
+    WriteOperation,
+    DEFAULT_BULK_BATCH_SIZE,
+    DEFAULT_MAX_BATCH_BYTES,
+    insert_operation,
+    replace_operation,
+    sized_batches,
+    upsert_operation,
+)
+from moapi.odm.index_advisor import IndexAdvisor, IndexSuggestion
+from moapi.odm.indexes import declared_indexes, ensure_indexes
+from moapi.odm.hydration import (
+    ValidationSampler,
+    construct_model,
+    prefers_construction,
+)
+from moapi.odm.instrumentation import (
+    Conversion,
+    Instrumentation,
+    OperationListener,
+    instrumented,
+    record_documents,
+    record_query,
+)
+from moapi.odm.projection import infer_projection, merge_projections
+from moapi.odm.serialization import (
+    DEFAULT_NDJSON_CHUNK_SIZE,
+    documents_to_json,
+    documents_to_ndjson,
+    ndjson_lines,
+)
+from moapi.odm.tracking import diff_documents
+from moapi.odm.pagination import (
+    encode_token,
+    get_path_value,
+    keyset_query,
+    facet_pipeline,
+    facet_total,
+    ITEMS_FACET,
+)
 from moapi.odm.types import (
     MONGO_MODEL_ID_KEY,
     MONGO_INTERNAL_ID_KEY,
     DEFAULT_HQL_CASTERS,
     MoAPIType,
+    OutputMoAPIType,
 )
 
+DEFAULT_PAGE_SIZE: int = 100
+ITEMS_KEY: str = "items"
+NEXT_TOKEN_KEY: str = "next_token"
+TOTAL_KEY: str = "total"
+TOTAL_CAPPED_KEY: str = "total_capped"
+DEFAULT_IN_CHUNK_SIZE: int = 500
+DEFAULT_MAX_WORKERS: int = 4
+BULK_INSERT: str = "insert"
+BULK_REPLACE: str = "replace"
+BULK_UPSERT: str = "upsert"
+INVALID_BULK_MODE_ERROR: str = "{mode} is not a valid bulk write mode"
+
 
 # =========================================================
 # HANDE MONGO INTERNAL ID
@@ -24,26 +96,98 @@ def handle_mongo_internal_id(model_data: dict) -> dict:
     return model_data
 
 
+# =========================================================
+# MOQL TO QUERY
+# =========================================================
+def moql_to_query(moql: MoQLQuery) -> dict:
+    """
+    Compiles a MoQL string into the keyword arguments expected by
+    the find method of a (sync or async) Mongo collection. Compiled
+    queries are cached, so repeated query strings are parsed once.
+    :param moql: MoQL query string, or already compiled query (e.g.
+    bound from a prepared template)
+    :return: Dictionary with filter, sort, skip, limit and projection
+    """
+    if isinstance(moql, CompiledMoQL):
+        return moql.mongo_query
+    return compile_moql(moql=moql, casters=DEFAULT_HQL_CASTERS).mongo_query
+
+
+# =========================================================
+# PREPARE MOQL
+# =========================================================
+def prepare_moql(
+    template: str, blacklist: Optional[tuple[str, ...]] = None
+) -> PreparedMoQL:
+    """
+    Prepares a MoQL template with the casters used by the services,
+    so the casters named in the template (e.g. _id=object_id({id}))
+    are those of a MoQL string.
+    Example:
+        RECENT = prepare_moql("status={status}&created>={since}")
+        service.get_by_moql(RECENT.bind(status="ACTIVE", since=day))
+    :param template: MoQL query with {name} placeholders in values
+    :param blacklist: Parameters that must be ignored
+    :return: Prepared query, to be bound on each call
+    """
+    return PreparedMoQL(
+        moql=template, blacklist=blacklist, casters=DEFAULT_HQL_CASTERS
+    )
+
+
 # =========================================================
 # TRAVERSE CURSOR AND COPY
 # =========================================================
 def traverse_cursor_and_copy(cursor):
     """
-    Helper function that creates a local copy in-memory
-    of the results obtained after traversing a cursor
-    that is created as a result of a query with high
-    projection. This enables data transformations on the
-    results without losing the state of the returned
-    documents.
+    Helper function that materializes the results obtained
+    after traversing a cursor. The driver decodes every
+    document into a new dictionary that is not referenced by
+    the cursor, so the results can be transformed freely
+    without copying them again.
     :param cursor: Iterable cursor that points to the
     results from the query.
-    :return: A local copy (stored in Heap memory segment)
-    of results (List of dictionaries).
+    :return: Results (List of dictionaries).
     """
-    result_set: list = []
-    for result in cursor:
-        result_set.append(result.copy())
-    return result_set
+    return list(cursor)
+
+
+# =========================================================
+# ITERATE CURSOR
+# =========================================================
+def iterate_cursor(cursor, batch_size: Optional[int] = None):
+    """
+    Helper function that lazily yields the documents pointed
+    by a cursor as the batches arrive from the server, instead
+    of materializing the whole result set in memory.
+    :param cursor: Iterable cursor that points to the
+    results from the query.
+    :param batch_size: Number of documents requested to the
+    server per batch. If not provided, the driver default is
+    used.
+    :return: Generator of documents (dictionaries).
+    """
+    if batch_size:
+        cursor.batch_size(batch_size)
+    yield from cursor
+
+
+# =========================================================
+# RAW BSON BYTES
+# =========================================================
+def raw_bson_bytes(
+    documents: Iterable[RawBSONDocument],
+) -> Iterator[bytes]:
+    """
+    Helper function that yields the encoded BSON of raw documents.
+    Concatenated, the chunks form a valid BSON stream (the same
+    format used by mongodump) that can be written to a response
+    or a file without decoding the documents.
+    :param documents: Iterable of RawBSONDocument
+    :return: Generator of BSON encoded documents
+    """
+    for document in documents:
+        yield document.raw
 
 
 # =========================================================
@@ -52,6 +196,10 @@ def traverse_cursor_and_copy(cursor):
 class EntityService(Generic[MoAPIType]):
     class Meta:
         collection_name: str
+        # Indexes (list of pymongo IndexModel) to be created by
+        # ensure_indexes. They can be declared on the Meta class of
+        # the document class as well.
+        indexes: list[IndexModel] = []
 
     # -----------------------------------------------------
     # CONSTRUCTOR
@@ -60,13 +208,21 @@ class EntityService(Generic[MoAPIType]):
         self,
         collection_name: str,
         db_connection_parameters: MongoDBParameters,
+        index_advisor: Optional[IndexAdvisor] = None,
+        listeners: Optional[Iterable[OperationListener]] = None,
     ):
         self.collection_name = collection_name
+        # Optional advisor that records the shape of the MoQL
+        # queries run through the service
+        self.index_advisor: Optional[IndexAdvisor] = index_advisor
+        # Listeners notified of every operation (see instrumentation)
+        self.instrumentation: Instrumentation = Instrumentation(listeners)
         self.connection_parameters: MongoDBParameters = (
             db_connection_parameters
         )
         self.entities: Collection = self.collection
         self.__document_class = self.get_document_class()
+        self.validation_sampler: ValidationSampler = ValidationSampler()
 
     # -----------------------------------------------------
     # GET DOCUMENT CLASS
@@ -85,14 +241,101 @@ class EntityService(Generic[MoAPIType]):
     def collection(self) -> Collection:
         return self.connection_parameters.db[self.collection_name]
 
+    # -----------------------------------------------------
+    # GET INDEXES
+    # -----------------------------------------------------
+    def get_indexes(self) -> list[IndexModel]:
+        """
+        Returns the indexes declared for the collection, on the
+        Meta class of the service and of the document class.
+        """
+        return declared_indexes(self, self.__document_class)
+
+    # -----------------------------------------------------
+    # ENSURE INDEXES
+    # -----------------------------------------------------
+    @instrumented("ensure_indexes")
+    def ensure_indexes(self) -> list[str]:
+        """
+        Creates the declared indexes that do not exist on the
+        collection yet, in a single batch. Meant to be run at
+        startup or from the command line (moapi ensure-indexes).
+        :return: Names of the created indexes
+        :raises IndexConflictError: If a declared index exists with
+        different options (see indexes.index_conflicts)
+        """
+        return ensure_indexes(self.entities, self.get_indexes())
+
+    # -----------------------------------------------------
+    # ADVISE INDEXES
+    # -----------------------------------------------------
+    def advise_indexes(self) -> list[IndexSuggestion]:
+        """
+        Proposes indexes for the MoQL queries recorded by the index
+        advisor, flagging the ones already covered by the indexes
+        of the collection.
+        :return: List of suggestions, empty if there is no advisor
+        """
+        if self.index_advisor is None:
+            return []
+        return self.index_advisor.propose(self.entities.list_indexes())
+
+    # -----------------------------------------------------
+    # COMPILE QUERY
+    # -----------------------------------------------------
+    def compile_query(self, moql: MoQLQuery) -> dict:
+        """
+        Translates a MoQL query for this collection, recording its
+        shape when an index advisor is set.
+        :param moql: MoQL query string or compiled query
+        :return: Dictionary with filter, sort, skip, limit and
+        projection
+        """
+        query: dict = moql_to_query(moql)
+        if self.index_advisor is not None:
+            self.index_advisor.record(query)
+        # Bound templates are recorded under the shape of the
+        # template, which is the shape of any of its bindings
+        record_query(
+            query,
+            moql=moql.moql if isinstance(moql, CompiledMoQL) else moql,
+        )
+        return query
+
+    # -----------------------------------------------------
+    # PROPERTY RAW ENTITIES
+    # -----------------------------------------------------
+    @property
+    def raw_entities(self) -> Collection:
+        """
+        The collection configured to return RawBSONDocument. The
+        documents are kept as the bytes sent by the server and are
+        only decoded when a field is first accessed. Meant for
+        results that are passed through untouched: reading fields
+        of a raw document is slower than reading a dictionary.
+        """
+        return self.entities.with_options(
+            codec_options=self.entities.codec_options.with_options(
+                document_class=RawBSONDocument
+            )
+        )
+
+    # -----------------------------------------------------
+    # METHOD READ COLLECTION
+    # -----------------------------------------------------
+    def read_collection(self, raw: bool = False) -> Collection:
+        return self.raw_entities if raw else self.entities
+
     # -----------------------------------------------------
     # GET
     # -----------------------------------------------------
+    @instrumented("get")
     def get(
         self,
         query: dict,
         skip: Optional[int] = None,
         limit: Optional[int] = None,
+        raw: bool = False,
     ):
         """
         Get a list of documents on the given collection based
@@ -101,12 +344,11 @@ class EntityService(Generic[MoAPIType]):
         :param skip:
         :param query: A dictionary containing a valid MongoDB
         filter
+        :param raw: return RawBSONDocument instead of dictionaries
         :return: Local copy of results
         """
-        # We use deep copy to create local copies that do not
-        # reference instances referenced by the cursor and thereby
-        # ephemeral
-        cursor = self.entities.find(query)
+        record_query({"filter": query, "skip": skip, "limit": limit})
+        cursor = self.read_collection(raw).find(query)
         if skip:
             cursor.skip(skip)
         if limit:
@@ -116,11 +358,15 @@ class EntityService(Generic[MoAPIType]):
     # -----------------------------------------------------
     # GET TYPED
     # -----------------------------------------------------
+    @instrumented("get_typed")
     def get_typed(
         self,
         query: dict,
         skip: Optional[int] = None,
         limit: Optional[int] = None,
+        trusted: bool = False,
+        sample_every: Optional[int] = None,
+        track: bool = False,
     ) -> Iterable[MoAPIType]:
         """
         Get a list of documents on a given collection based on a
@@ -130,16 +376,177 @@ class EntityService(Generic[MoAPIType]):
         will return
         :param skip: sets the amount of documents to be skipped
         :param query: Dictionary containing the mongo query
+        :param trusted: build the models without validation. Only
+        for documents written from validated models.
+        :param sample_every: when trusted, still validate one in
+        every sample_every documents
+        :param track: record the loaded state of the models, so
+        update_one_typed only sends the paths that changed
         :return: List of instances of VAPModel derived classes
         """
-        return document_list_to_model_list(
-            model_type=self.__document_class,
+        return self.hydrate(
             documents=self.get(query=query, skip=skip, limit=limit),
+            trusted=trusted,
+            sample_every=sample_every,
+            track=track,
+        )
+
+    # -----------------------------------------------------
+    # GET TYPED AS
+    # -----------------------------------------------------
+    @instrumented("get_typed_as")
+    def get_typed_as(
+        self,
+        output_type: type[OutputMoAPIType],
+        query: dict,
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+        trusted: bool = False,
+    ) -> list[OutputMoAPIType]:
+        """
+        Same as get_typed but documents are returned as instances of
+        the given output model. Only the fields read by the output
+        model are fetched (see projection.infer_projection).
+        :param output_type: Pydantic model the documents are turned
+        into
+        :param limit: sets the maximum amount of results the query
+        will return
+        :param skip: sets the amount of documents to be skipped
+        :param query: Dictionary containing the mongo query
+        :param trusted: build the models without validation
+        :return: List of instances of the output model
+        """
+        projection: dict = infer_projection(output_type)
+        record_query(
+            {
+                "filter": query,
+                "skip": skip,
+                "limit": limit,
+                "projection": projection,
+            }
+        )
+        cursor = self.entities.find(query, projection=projection)
+        if skip:
+            cursor.skip(skip)
+        if limit:
+            cursor.limit(limit)
+        documents: list[dict] = traverse_cursor_and_copy(cursor)
+        with Conversion():
+            return document_list_to_output_list(
+                output_type, documents, trusted=trusted
+            )
+
+    # -----------------------------------------------------
+    # ITER
+    # -----------------------------------------------------
+    @instrumented("iter", iterator=True)
+    def iter(
+        self,
+        query: dict,
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        raw: bool = False,
+    ) -> Iterator[dict]:
+        """
+        Lazily iterates over the documents on the given collection
+        that match a filter. Documents are yielded as the cursor
+        batches arrive, so memory usage does not depend on the size
+        of the result set.
+        :param limit: sets the maximum amount of results the query
+        will return
+        :param skip: sets the amount of documents to be skipped
+        :param batch_size: number of documents fetched per round trip
+        :param query: A dictionary containing a valid MongoDB
+        filter
+        :param raw: yield RawBSONDocument instead of dictionaries
+        :return: Generator of documents
+        """
+        record_query({"filter": query, "skip": skip, "limit": limit})
+        cursor = self.read_collection(raw).find(query)
+        if skip:
+            cursor.skip(skip)
+        if limit:
+            cursor.limit(limit)
+        return iterate_cursor(cursor, batch_size=batch_size)
+
+    # -----------------------------------------------------
+    # ITER BSON
+    # -----------------------------------------------------
+    @instrumented("iter_bson", iterator=True)
+    def iter_bson(
+        self,
+        query: dict,
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """
+        Streams the BSON of the documents that match a filter
+        exactly as sent by the server, without decoding them. See
+        raw_bson_bytes.
+        :param limit: sets the maximum amount of results the query
+        will return
+        :param skip: sets the amount of documents to be skipped
+        :param batch_size: number of documents fetched per round trip
+        :param query: A dictionary containing a valid MongoDB
+        filter
+        :return: Generator of BSON encoded documents
+        """
+        return raw_bson_bytes(
+            self.iter(
+                query=query,
+                skip=skip,
+                limit=limit,
+                batch_size=batch_size,
+                raw=True,
+            )
         )
 
+    # -----------------------------------------------------
+    # ITER TYPED
+    # -----------------------------------------------------
+    @instrumented("iter_typed", iterator=True)
+    def iter_typed(
+        self,
+        query: dict,
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        trusted: bool = False,
+        sample_every: Optional[int] = None,
+        track: bool = False,
+    ) -> Iterator[MoAPIType]:
+        """
+        Same as iter but documents are yielded as instances of
+        models instead of plain dictionaries.
+        :param limit: sets the maximum amount of results the query
+        will return
+        :param skip: sets the amount of documents to be skipped
+        :param batch_size: number of documents fetched per round trip
+        :param query: Dictionary containing the mongo query
+        :param trusted: build the models without validation. Only
+        for documents written from validated models.
+        :param sample_every: when trusted, still validate one in
+        every sample_every documents
+        :param track: record the loaded state of the models (see
+        get_typed)
+        :return: Generator of instances of Entity derived classes
+        """
+        for document in self.iter(
+            query=query, skip=skip, limit=limit, batch_size=batch_size
+        ):
+            yield self.hydrate_one(
+                document,
+                trusted=trusted,
+                sample_every=sample_every,
+                track=track,
+            )
+
     # -----------------------------------------------------
     # GET ONE
     # -----------------------------------------------------
+    @instrumented("get_one")
     def get_one(
         self, identifier_key: str, identifier_value: any
     ) -> Optional[MoAPIType]:
@@ -152,35 +559,193 @@ class EntityService(Generic[MoAPIType]):
         Returns:
 
         """
-        result = self.entities.find_one({identifier_key: identifier_value})
+        query: dict = {identifier_key: identifier_value}
+        record_query({"filter": query})
+        result = self.entities.find_one(query)
         return result if result else None
 
     # -----------------------------------------------------
     # GET ONE TYPED
     # -----------------------------------------------------
+    @instrumented("get_one_typed")
     def get_one_typed(
-        self, identifier_key: str, identifier_value: any
+        self,
+        identifier_key: str,
+        identifier_value: any,
+        trusted: bool = False,
+        sample_every: Optional[int] = None,
+        track: bool = False,
     ) -> Optional[MoAPIType]:
         """
 
         Args:
             identifier_key:
             identifier_value:
+            trusted: build the model without validation. Only for
+            documents written from validated models.
+            sample_every: when trusted, still validate one in every
+            sample_every documents
+            track: record the loaded state of the model, so
+            update_one_typed only sends the paths that changed
 
         Returns:
 
         """
-        result = self.entities.find_one({identifier_key: identifier_value})
+        query: dict = {identifier_key: identifier_value}
+        record_query({"filter": query})
+        result = self.entities.find_one(query)
 
         return (
-            document_to_model(self.__document_class, dict(result))
+            self.hydrate_one(
+                result,
+                trusted=trusted,
+                sample_every=sample_every,
+                track=track,
+            )
             if result
             else None
         )
 
+    # -----------------------------------------------------
+    # GET MANY TYPED
+    # -----------------------------------------------------
+    @instrumented("get_many_typed")
+    def get_many_typed(
+        self,
+        identifier_key: str,
+        values: Iterable[Any],
+        chunk_size: int = DEFAULT_IN_CHUNK_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        track: bool = False,
+    ) -> list[Optional[MoAPIType]]:
+        """
+        Resolves many documents by identifier with a few bounded $in
+        queries instead of one round trip per value. Values are
+        deduplicated and split in chunks that run concurrently.
+
+        Args:
+            identifier_key: field used to match the documents
+            values: identifier values to resolve
+            chunk_size: maximum amount of values per $in query
+            max_workers: maximum amount of concurrent queries
+            track: record the loaded state of the models (see
+            get_typed)
+
+        Returns:
+            List aligned with the input values holding the matching
+            model, or None when there is no match.
+        """
+        values = list(values)
+        chunks: list[list[Any]] = list(
+            chunked(dict.fromkeys(values), chunk_size)
+        )
+
+        def find_chunk(chunk: list[Any]) -> list[dict]:
+            return list(
+                self.entities.find({identifier_key: {"$in": chunk}})
+            )
+
+        if len(chunks) > 1 and max_workers > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(chunks))
+            ) as executor:
+                results: list[list[dict]] = list(
+                    executor.map(find_chunk, chunks)
+                )
+        else:
+            results = [find_chunk(chunk) for chunk in chunks]
+
+        documents: list[dict] = [
+            document
+            for chunk_documents in results
+            for document in chunk_documents
+        ]
+        with Conversion():
+            models: dict[Any, MoAPIType] = {
+                get_path_value(document, identifier_key): model
+                for document, model in zip(
+                    documents,
+                    document_list_to_model_list(
+                        self.__document_class, documents, track=track
+                    ),
+                )
+            }
+        record_documents(len(documents))
+        return [models.get(value) for value in values]
+
+    # -----------------------------------------------------
+    # HYDRATE ONE
+    # -----------------------------------------------------
+    def hydrate_one(
+        self,
+        document: dict,
+        trusted: bool = False,
+        sample_every: Optional[int] = None,
+        track: bool = False,
+    ) -> MoAPIType:
+        """
+        Turns a document read from the collection into a model.
+        Trusted documents are built without validation, except for
+        the ones picked by the validation sampler and the ones of
+        models that validate faster than they are built.
+        Args:
+            document: document read from the collection
+            trusted: build the model without validation
+            sample_every: when trusted, still validate one in every
+            sample_every documents
+            track: record the loaded state of the model
+
+        Returns:
+            Instance of the document class
+        """
+        with Conversion():
+            if trusted and not self.validation_sampler.should_validate(
+                sample_every
+            ):
+                return trusted_document_to_model(
+                    self.__document_class, document, track=track
+                )
+            return document_to_model(
+                self.__document_class, document, track=track
+            )
+
+    # -----------------------------------------------------
+    # HYDRATE
+    # -----------------------------------------------------
+    def hydrate(
+        self,
+        documents: Iterable[dict],
+        trusted: bool = False,
+        sample_every: Optional[int] = None,
+        track: bool = False,
+    ) -> list[MoAPIType]:
+        """
+        Turns documents read from the collection into models. See
+        hydrate_one.
+        """
+        with Conversion():
+            if not (
+                trusted and prefers_construction(self.__document_class)
+            ):
+                return document_list_to_model_list(
+                    model_type=self.__document_class,
+                    documents=documents,
+                    track=track,
+                )
+            return [
+                self.hydrate_one(
+                    document,
+                    trusted=trusted,
+                    sample_every=sample_every,
+                    track=track,
+                )
+                for document in documents
+            ]
+
     # -----------------------------------------------------
     # ADD ONE
     # -----------------------------------------------------
+    @instrumented("add_one")
     def add_one(self, model_data: dict) -> InsertOneResult:
         """
 
@@ -195,19 +760,21 @@ class EntityService(Generic[MoAPIType]):
     # -----------------------------------------------------
     # ADD ONE TYPED
     # -----------------------------------------------------
+    @instrumented("add_one_typed")
     def add_one_typed(self, model: MoAPIType) -> str:
         """
         Saves entity to database
         :param model: An instance of a class that extends VAPModel
         :return:
         """
-        return self.entities.insert_one(
-            model_to_document(model)
-        ).inserted_id
+        with Conversion():
+            document: dict = model_to_document(model)
+        return self.entities.insert_one(document).inserted_id
 
     # -----------------------------------------------------
     # ADD MANY
     # -----------------------------------------------------
+    @instrumented("add_many")
     def add_many(self, documents: Iterable[dict]):
         """
 
@@ -222,20 +789,211 @@ class EntityService(Generic[MoAPIType]):
     # -----------------------------------------------------
     # ADD MANY TYPED
     # -----------------------------------------------------
-    def add_many_typed(self, models: Iterable[MoAPIType]):
+    @instrumented("add_many_typed")
+    def add_many_typed(
+        self,
+        models: Iterable[MoAPIType],
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        ordered: bool = True,
+    ) -> InsertManyResult:
         """
+        Inserts models pulled lazily from any iterable. Models are
+        converted in chunks bounded by amount and estimated BSON
+        size, and each chunk is sent while the next one is being
+        prepared. At most two chunks are held in memory at a time.
+        The size is estimated by encoding a sample of the documents
+        (see DEFAULT_SIZE_SAMPLE_INTERVAL), and insert_many still
+        splits chunks that exceed the maximum message size.
 
         Args:
-            models:
+            models: iterable (or generator) of models
+            batch_size: maximum amount of documents per insert
+            max_batch_bytes: maximum estimated size of an insert
+            ordered: forwarded to insert_many. When True, the insert
+            stops at the first failing chunk. When False, every
+            chunk is inserted.
 
         Returns:
+            Combined result of every insert.
 
+        Raises:
+            BulkWriteError: when documents failed, with the write
+            errors of every chunk (indexes in the whole input) and
+            the ids inserted so far under insertedIds.
         """
-        return self.add_many(model_list_to_document_list(models=models))
+        chunks: Iterator[list[dict]] = chunked_by_size(
+            (model_to_write_document(model) for model in models),
+            max_count=batch_size,
+            max_bytes=max_batch_bytes,
+            size_of=bson_size,
+            sample_interval=DEFAULT_SIZE_SAMPLE_INTERVAL,
+        )
+        summary: InsertManySummary = InsertManySummary()
+
+        def collect(future: Future, chunk: list[dict]) -> bool:
+            try:
+                summary.add_result(future.result(), chunk)
+            except BulkWriteError as error:
+                summary.add_error(error, chunk, ordered)
+                return not ordered
+            return True
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending: Optional[tuple[Future, list[dict]]] = None
+            for chunk in chunks:
+                if pending is not None and not collect(*pending):
+                    pending = None
+                    break
+                pending = (
+                    executor.submit(
+                        self.entities.insert_many, chunk, ordered=ordered
+                    ),
+                    chunk,
+                )
+            if pending is not None:
+                collect(*pending)
+        return summary.result()
+
+    # -----------------------------------------------------
+    # BULK WRITE
+    # -----------------------------------------------------
+    @instrumented("bulk_write")
+    def bulk_write(
+        self,
+        operations: Iterable[WriteOperation],
+        ordered: bool = True,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+    ) -> BulkWriteSummary:
+        """
+        Executes write operations in batches of at most batch_size
+        operations (pymongo further splits batches that exceed the
+        maximum message size). Operations are consumed lazily, so
+        large generators are never fully materialized.
+
+        Args:
+            operations: pymongo write operations
+            ordered: when True, execution stops at the first batch
+            with errors. When False, every batch is executed and
+            the server is free to reorder operations in a batch.
+            batch_size: maximum amount of operations per batch
+
+        Returns:
+            Combined result with per-operation errors.
+        """
+        return self.write_batches(chunked(operations, batch_size), ordered)
+
+    # -----------------------------------------------------
+    # WRITE BATCHES
+    # -----------------------------------------------------
+    def write_batches(
+        self, batches: Iterable[list[WriteOperation]], ordered: bool
+    ) -> BulkWriteSummary:
+        """
+        Sends each batch in its own bulk write and combines the
+        results. See bulk_write.
+        """
+        summary: BulkWriteSummary = BulkWriteSummary()
+        offset: int = 0
+        for batch in batches:
+            try:
+                summary.add_result(
+                    self.entities.bulk_write(batch, ordered=ordered),
+                    offset,
+                )
+            except BulkWriteError as error:
+                summary.add_details(error.details, offset)
+                if ordered:
+                    break
+            offset += len(batch)
+        return summary
+
+    # -----------------------------------------------------
+    # BULK WRITE TYPED
+    # -----------------------------------------------------
+    @instrumented("bulk_write_typed")
+    def bulk_write_typed(
+        self,
+        models: Iterable[MoAPIType],
+        mode: str = BULK_INSERT,
+        identifier_key: str = MONGO_INTERNAL_ID_KEY,
+        ordered: bool = True,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    ) -> BulkWriteSummary:
+        """
+        Converts models to documents and writes them in batches.
+        Models without identifier are always inserted.
+
+        Args:
+            models: models to be written
+            mode: insert (InsertOne), replace (ReplaceOne with
+            upsert) or upsert (UpdateOne setting every field, with
+            upsert)
+            identifier_key: field used to match existing documents
+            when replacing or upserting
+            ordered: see bulk_write
+            batch_size: maximum amount of operations per batch
+            max_batch_bytes: maximum estimated size of a batch
+
+        Returns:
+            Combined result with per-model errors.
+        """
+        if mode == BULK_INSERT:
+            build: Callable[[dict], WriteOperation] = insert_operation
+        elif mode == BULK_REPLACE:
+            build = partial(
+                replace_operation, identifier_key=identifier_key
+            )
+        elif mode == BULK_UPSERT:
+            build = partial(
+                upsert_operation, identifier_key=identifier_key
+            )
+        else:
+            raise ValueError(INVALID_BULK_MODE_ERROR.format(mode=mode))
+        # Batches are sized from the documents, before they are
+        # wrapped in operations
+        documents: Iterator[dict] = (
+            model_to_write_document(model) for model in models
+        )
+        return self.write_batches(
+            sized_batches(
+                ((build(document), document) for document in documents),
+                max_count=batch_size,
+                max_bytes=max_batch_bytes,
+            ),
+            ordered,
+        )
+
+    # -----------------------------------------------------
+    # BULK UPSERT TYPED
+    # -----------------------------------------------------
+    @instrumented("bulk_upsert_typed")
+    def bulk_upsert_typed(
+        self,
+        models: Iterable[MoAPIType],
+        identifier_key: str = MONGO_INTERNAL_ID_KEY,
+        ordered: bool = False,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    ) -> BulkWriteSummary:
+        """
+        Inserts or updates many models in unordered batches.
+        Shortcut for bulk_write_typed in upsert mode.
+        """
+        return self.bulk_write_typed(
+            models,
+            mode=BULK_UPSERT,
+            identifier_key=identifier_key,
+            ordered=ordered,
+            batch_size=batch_size,
+            max_batch_bytes=max_batch_bytes,
+        )
 
     # -----------------------------------------------------
     # UPDATE ONE
     # -----------------------------------------------------
+    @instrumented("update_one")
     def update_one(
         self, filter_data: dict, document: dict
     ) -> UpdateResult:
@@ -255,26 +1013,34 @@ class EntityService(Generic[MoAPIType]):
     # -----------------------------------------------------
     # UPDATE ONE TYPED
     # -----------------------------------------------------
+    @instrumented("update_one_typed")
     def update_one_typed(self, model: MoAPIType) -> UpdateResult:
         """
+        Saves the changes of a model. Tracked models (read with
+        track=True) only send the paths that changed since they were
+        loaded; other models set every field.
 
         Args:
             model:
 
         Returns:
-
+            Result of the update
         """
-        values: dict = model_to_document(model=model)
-        values.pop(MONGO_INTERNAL_ID_KEY)
+        with Conversion():
+            document: dict = model_to_document(model=model)
+            update: dict = model_to_update(model=model, document=document)
         filter_data = {MONGO_INTERNAL_ID_KEY: str(model.mongo_id)}
-        return self.update_one(
-            filter_data=filter_data,
-            document=values,
+        result: UpdateResult = self.entities.update_one(
+            filter=filter_data, update=update
         )
+        if model.is_tracked:
+            model.mark_loaded(document)
+        return result
 
     # -----------------------------------------------------
     # DELETE ONE
     # -----------------------------------------------------
+    @instrumented("delete_one")
     def delete_one(self, filter_data: dict):
         """
         TODO write tests
@@ -289,6 +1055,7 @@ class EntityService(Generic[MoAPIType]):
     # -----------------------------------------------------
     # DELETE MANY
     # -----------------------------------------------------
+    @instrumented("delete_many")
     def delete_many(self, filter_data: dict):
         """
 
@@ -303,6 +1070,7 @@ class EntityService(Generic[MoAPIType]):
     # -----------------------------------------------------
     # PUSH ONE
     # -----------------------------------------------------
+    @instrumented("push_one")
     def push_one(
         self,
         match_key: str,
@@ -329,20 +1097,271 @@ class EntityService(Generic[MoAPIType]):
     # -----------------------------------------------------
     # GET BY MOQL
     # -----------------------------------------------------
-    def get_by_moql(self, moql: str) -> list[dict] | None:
+    @instrumented("get_by_moql")
+    def get_by_moql(
+        self, moql: MoQLQuery, raw: bool = False
+    ) -> list[dict] | None:
         """
 
         Args:
             moql:
+            raw: return RawBSONDocument instead of dictionaries
 
         Returns:
 
         """
         return traverse_cursor_and_copy(
-            self.entities.find(
-                **MoQL(moql=moql, casters=DEFAULT_HQL_CASTERS).mongo_query
+            self.read_collection(raw).find(**self.compile_query(moql))
+        )
+
+    # -----------------------------------------------------
+    # GET BY MOQL JSON
+    # -----------------------------------------------------
+    @instrumented("get_by_moql_json")
+    def get_by_moql_json(self, moql: MoQLQuery) -> bytes:
+        """
+        Returns the documents that match a MoQL query serialized as
+        a JSON array, straight from the cursor and without building
+        models. The _id is written as mongo_id and ObjectIds as
+        strings, matching the JSON output of the models.
+        Args:
+            moql: MoQL query string or compiled query
+
+        Returns:
+            JSON encoded array of documents
+        """
+        return documents_to_json(
+            self.entities.find(**self.compile_query(moql))
+        )
+
+    # -----------------------------------------------------
+    # ITER BY MOQL NDJSON
+    # -----------------------------------------------------
+    @instrumented(
+        "iter_by_moql_ndjson", iterator=True, item_documents=ndjson_lines
+    )
+    def iter_by_moql_ndjson(
+        self,
+        moql: MoQLQuery,
+        batch_size: Optional[int] = None,
+        chunk_size: int = DEFAULT_NDJSON_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Same as get_by_moql_json but the documents are streamed as
+        newline delimited JSON, in chunks of chunk_size lines.
+        Args:
+            moql: MoQL query string or compiled query
+            batch_size: number of documents fetched per round trip
+            chunk_size: amount of documents per yielded chunk
+
+        Returns:
+            Generator of NDJSON chunks
+        """
+        return documents_to_ndjson(
+            self.iter_by_moql(moql, batch_size=batch_size),
+            chunk_size=chunk_size,
+        )
+
+    # -----------------------------------------------------
+    # GET BY MOQL AS
+    # -----------------------------------------------------
+    @instrumented("get_by_moql_as")
+    def get_by_moql_as(
+        self,
+        output_type: type[OutputMoAPIType],
+        moql: MoQLQuery,
+        trusted: bool = False,
+    ) -> list[OutputMoAPIType]:
+        """
+        Returns the documents that match a MoQL query as instances
+        of the given output model. The projection inferred from the
+        output model is merged with the fields parameter of the
+        query, if any (see projection.merge_projections).
+        Args:
+            output_type: Pydantic model the documents are turned into
+            moql: MoQL query string or compiled query
+            trusted: build the models without validation
+
+        Returns:
+            List of instances of the output model
+        """
+        query: dict = self.compile_query(moql)
+        query["projection"] = merge_projections(
+            infer_projection(output_type), query["projection"]
+        )
+        documents: list[dict] = traverse_cursor_and_copy(
+            self.entities.find(**query)
+        )
+        with Conversion():
+            return document_list_to_output_list(
+                output_type, documents, trusted=trusted
+            )
+
+    # -----------------------------------------------------
+    # GET TYPED BY MOQL
+    # -----------------------------------------------------
+    @instrumented("get_typed_by_moql")
+    def get_typed_by_moql(
+        self,
+        moql: MoQLQuery,
+        trusted: bool = False,
+        sample_every: Optional[int] = None,
+        track: bool = False,
+    ) -> list[MoAPIType]:
+        """
+        Same as get_by_moql but documents are returned as instances
+        of models instead of plain dictionaries.
+        Args:
+            moql: MoQL query string or compiled query
+            trusted: build the models without validation. Only for
+            documents written from validated models.
+            sample_every: when trusted, still validate one in every
+            sample_every documents
+            track: record the loaded state of the models (see
+            get_typed)
+
+        Returns:
+            List of instances of Entity derived classes
+        """
+        return self.hydrate(
+            documents=self.get_by_moql(moql),
+            trusted=trusted,
+            sample_every=sample_every,
+            track=track,
+        )
+
+    # -----------------------------------------------------
+    # ITER BY MOQL
+    # -----------------------------------------------------
+    @instrumented("iter_by_moql", iterator=True)
+    def iter_by_moql(
+        self,
+        moql: MoQLQuery,
+        batch_size: Optional[int] = None,
+        raw: bool = False,
+    ) -> Iterator[dict]:
+        """
+        Lazily iterates over the documents that match the given
+        MoQL query.
+        Args:
+            moql: MoQL query string or compiled query
+            batch_size: number of documents fetched per round trip
+            raw: yield RawBSONDocument instead of dictionaries
+
+        Returns:
+            Generator of documents
+        """
+        return iterate_cursor(
+            self.read_collection(raw).find(**self.compile_query(moql)),
+            batch_size=batch_size,
+        )
+
+    # -----------------------------------------------------
+    # ITER BSON BY MOQL
+    # -----------------------------------------------------
+    @instrumented("iter_bson_by_moql", iterator=True)
+    def iter_bson_by_moql(
+        self, moql: MoQLQuery, batch_size: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Same as iter_bson but documents are matched by a MoQL
+        query.
+        Args:
+            moql: MoQL query string or compiled query
+            batch_size: number of documents fetched per round trip
+
+        Returns:
+            Generator of BSON encoded documents
+        """
+        return raw_bson_bytes(
+            self.iter_by_moql(moql, batch_size=batch_size, raw=True)
+        )
+
+    # -----------------------------------------------------
+    # GET PAGE BY MOQL
+    # -----------------------------------------------------
+    @instrumented("get_page_by_moql")
+    def get_page_by_moql(
+        self,
+        moql: MoQLQuery,
+        token: Optional[str] = None,
+        page_size: Optional[int] = None,
+    ) -> dict:
+        """
+        Keyset (seek) pagination over the results of a MoQL query.
+        Instead of skipping documents, each page starts right after
+        the last document of the previous one, so deep pages cost
+        the same as the first one.
+
+        The MoQL sort keys (plus _id as tie-breaker) define the
+        order. skip is not supported in this mode.
+        Args:
+            moql: MoQL query string or compiled query
+            token: continuation token returned with the previous
+            page. If not provided, the first page is returned.
+            page_size: amount of documents per page. Defaults to
+            the MoQL limit or DEFAULT_PAGE_SIZE.
+
+        Returns:
+            Dictionary with the page items and the token of the
+            next page (None when there are no more results).
+        """
+        mongo_query: dict = self.compile_query(moql)
+        page_size = page_size or mongo_query["limit"] or DEFAULT_PAGE_SIZE
+        query: dict = keyset_query(
+            mongo_query=mongo_query, page_size=page_size, token=token
+        )
+        items: list[dict] = list(self.entities.find(**query))
+        next_token: Optional[str] = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            next_token = encode_token(query["sort"], items[-1])
+        record_documents(len(items))
+        return {ITEMS_KEY: items, NEXT_TOKEN_KEY: next_token}
+
+    # -----------------------------------------------------
+    # GET PAGE WITH TOTAL BY MOQL
+    # -----------------------------------------------------
+    @instrumented("get_page_with_total_by_moql")
+    def get_page_with_total_by_moql(
+        self, moql: MoQLQuery, max_count: Optional[int] = None
+    ) -> dict:
+        """
+        Returns the page described by a MoQL query (skip, limit,
+        sort and projection) along with the total amount of
+        matching documents, using a single $facet aggregation
+        instead of a query plus a separate count. Queries without
+        limit return DEFAULT_PAGE_SIZE documents.
+        Args:
+            moql: MoQL query string or compiled query
+            max_count: if provided, documents are only counted up to
+            this number. Larger totals are reported as max_count,
+            with total_capped set.
+
+        Returns:
+            Dictionary with the page items, the total and whether
+            the total was capped by max_count.
+        """
+        mongo_query: dict = self.compile_query(moql)
+        mongo_query = {
+            **mongo_query,
+            "limit": mongo_query["limit"] or DEFAULT_PAGE_SIZE,
+        }
+        results: list[dict] = list(
+            self.entities.aggregate(
+                facet_pipeline(mongo_query, max_count=max_count)
             )
         )
+        facet_result: dict = results[0] if results else {}
+        total: int = facet_total(facet_result)
+        items: list[dict] = facet_result.get(ITEMS_FACET, [])
+        record_documents(len(items))
+        capped: bool = bool(max_count) and total > max_count
+        return {
+            ITEMS_KEY: items,
+            TOTAL_KEY: max_count if capped else total,
+            TOTAL_CAPPED_KEY: capped,
+        }
 
 
 # =========================================================
@@ -360,11 +1379,63 @@ def model_to_document(model: MoAPIType) -> dict:
     return handle_mongo_internal_id(model_data=model_data)
 
 
+# =========================================================
+# MODEL TO WRITE DOCUMENT
+# =========================================================
+def model_to_write_document(model: MoAPIType) -> dict:
+    """
+    Same as model_to_document, but the _id is left out when the
+    model has no mongo_id (it would be serialized as "None"), so
+    writes treat the model as a new document.
+    """
+    document: dict = model_to_document(model=model)
+    if model.mongo_id is None:
+        document.pop(MONGO_INTERNAL_ID_KEY, None)
+    return document
+
+
+# =========================================================
+# MODEL TO UPDATE
+# =========================================================
+def model_to_update(
+    model: MoAPIType, document: Optional[dict] = None
+) -> dict:
+    """
+    Builds the update operators needed to save a model. If the
+    model keeps track of the document it was loaded from, only the
+    changed paths are included ($set and $unset). Otherwise, every
+    field is set.
+
+    :param model: Instance
+    :param document: Document representation of the model, if it
+    was already computed
+    :return: Update document. When nothing changed, it only sets the
+    _id to its own value, which the server applies as a no-op.
+    """
+    if document is None:
+        document = model_to_document(model=model)
+    if not model.is_tracked:
+        values: dict = dict(document)
+        values.pop(MONGO_INTERNAL_ID_KEY, None)
+        return {"$set": values}
+    set_values, unset_paths = diff_documents(model.loaded_state, document)
+    if not set_values and not unset_paths:
+        # Setting the _id the document is matched by changes nothing,
+        # but still reports whether the document exists
+        return {"$set": {MONGO_INTERNAL_ID_KEY: str(model.mongo_id)}}
+    update: dict = {}
+    if set_values:
+        update["$set"] = set_values
+    if unset_paths:
+        update["$unset"] = unset_paths
+    return update
+
+
 # =========================================================
 # DOCUMENT TO MODEL
 # =========================================================
 def document_to_model(
-    model_type: type[MoAPIType], document: dict
+    model_type: type[MoAPIType], document: dict, track: bool = False
 ) -> MoAPIType:
     """
     Converts an instance of a model to a dictionary
@@ -372,33 +1443,110 @@ def document_to_model(
     Args:
         model_type:
         document:
+        track: record the loaded state of the model, so that only
+        the changed paths are sent when it is saved
 
     Returns:
 
     """
-    # Make a local copy in case document is a reference from a cursor
-    document_data: dict = document.copy()
-    if MONGO_INTERNAL_ID_KEY in document_data:
-        document_data[MONGO_MODEL_ID_KEY] = document_data.pop(
-            MONGO_INTERNAL_ID_KEY
-        )
-    return model_type.model_validate(document_data, strict=True)
+    # The _id is mapped to mongo_id by the validation alias of the
+    # model, so the document does not need to be copied or renamed
+    model: MoAPIType = model_type.model_validate(document, strict=True)
+    if track:
+        track_model(model)
+    return model
+
+
+# =========================================================
+# TRACK MODEL
+# =========================================================
+def track_model(model: MoAPIType) -> MoAPIType:
+    """
+    Records the current state of a model as its loaded state, so
+    update_one_typed only sends the paths changed from now on.
+    Models may share containers with the document they were built
+    from (e.g. Any fields), so the state is a snapshot of the model.
+    """
+    model.mark_loaded(model_to_document(model))
+    return model
+
+
+# =========================================================
+# TRUSTED DOCUMENT TO MODEL
+# =========================================================
+def trusted_document_to_model(
+    model_type: type[MoAPIType], document: dict, track: bool = False
+) -> MoAPIType:
+    """
+    Same as document_to_model but the model is built without
+    validation, unless validating it is faster. See
+    hydration.construct_model and hydration.prefers_construction.
+    """
+    if not prefers_construction(model_type):
+        return document_to_model(model_type, document, track=track)
+    model: MoAPIType = construct_model(model_type, document)
+    if track:
+        track_model(model)
+    return model
+
+
+# =========================================================
+# GET LIST ADAPTER
+# =========================================================
+@lru_cache(maxsize=None)
+def get_list_adapter(model_type: type[MoAPIType]) -> TypeAdapter:
+    """
+    Returns the (cached) TypeAdapter that validates a list of
+    documents into a list of models of the given type in a single
+    call to pydantic-core.
+    """
+    return TypeAdapter(list[model_type])
 
 
 # =========================================================
 # DOCUMENT LIST TO MODEL LIST
 # =========================================================
 def document_list_to_model_list(
-    model_type: type[MoAPIType], documents: Iterable[dict]
+    model_type: type[MoAPIType],
+    documents: Iterable[dict],
+    track: bool = False,
 ) -> Iterable[MoAPIType]:
-    model_list: list = []
-    for document in documents:
-        model_list.append(
-            document_to_model(model_type=model_type, document=document)
-        )
+    documents = (
+        documents if isinstance(documents, list) else list(documents)
+    )
+    model_list: list = get_list_adapter(model_type).validate_python(
+        documents, strict=True
+    )
+    if track:
+        for model in model_list:
+            track_model(model)
     return model_list
 
 
+# =========================================================
+# DOCUMENT LIST TO OUTPUT LIST
+# =========================================================
+def document_list_to_output_list(
+    output_type: type[OutputMoAPIType],
+    documents: Iterable[dict],
+    trusted: bool = False,
+) -> list[OutputMoAPIType]:
+    """
+    Turns (usually projected) documents into instances of an
+    output model. Since the documents may be partial, entities are
+    not marked as loaded and their updates are not tracked.
+    """
+    if trusted and prefers_construction(output_type):
+        return [
+            construct_model(output_type, document)
+            for document in documents
+        ]
+    return get_list_adapter(output_type).validate_python(
+        documents if isinstance(documents, list) else list(documents),
+        strict=True,
+    )
+
+
 # =========================================================
 # MODEL LIST TO DOCUMENT LIST
 # =========================================================
@@ -0,0 +1,352 @@
+import itertools
+import threading
+from enum import Enum
+from functools import lru_cache
+from types import UnionType
+from typing import (
+    Any,
+    Callable,
+    NamedTuple,
+    Optional,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from bson import ObjectId
+from pydantic import AliasChoices, BaseModel, TypeAdapter
+from pydantic.fields import FieldInfo
+from pydantic_core import PydanticUndefined
+
+from moapi.models.core.custom_pydantic_fields import MongoObjectId
+
+Converter = Callable[[Any], Any]
+SEQUENCE_TYPES: tuple[type, ...] = (list, set, frozenset, tuple)
+UNION_TYPES: tuple[Any, ...] = (Union, UnionType)
+PLAIN_POST_INITS: frozenset[str] = frozenset(
+    {"BaseModel.model_post_init", "init_private_attributes"}
+)
+IMMUTABLE_TYPES: tuple[type, ...] = (
+    type(None),
+    str,
+    int,
+    float,
+    bool,
+    bytes,
+    tuple,
+    frozenset,
+    Enum,
+)
+FUNCTION_SCHEMA_TYPES: frozenset[str] = frozenset(
+    {
+        "function-before",
+        "function-after",
+        "function-wrap",
+        "function-plain",
+    }
+)
+# Keys of a core schema that are not used to validate Python objects
+NON_VALIDATING_SCHEMA_KEYS: frozenset[str] = frozenset(
+    {"serialization", "json_schema", "metadata"}
+)
+# Marks the fields whose default must be copied (or produced by its
+# factory) on every instance, since it is mutable
+COPIED_DEFAULT: Any = object()
+
+
+# =========================================================
+# CLASS FIELD PLAN
+# =========================================================
+class FieldPlan(NamedTuple):
+    name: str
+    keys: tuple[str, ...]
+    converter: Optional[Converter]
+    field: FieldInfo
+    default: Any
+
+
+# ---------------------------------------------------------
+# FUNCTION TO OBJECT ID
+# ---------------------------------------------------------
+def to_object_id(value: Any) -> Any:
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    return value
+
+
+# ---------------------------------------------------------
+# FUNCTION FIELD KEYS
+# ---------------------------------------------------------
+def field_keys(name: str, field: FieldInfo) -> tuple[str, ...]:
+    """
+    Returns the document keys a field may be read from, in order of
+    precedence, following the same alias rules used on validation.
+    """
+    alias = field.validation_alias
+    if isinstance(alias, AliasChoices):
+        keys: list[str] = [
+            choice for choice in alias.choices if isinstance(choice, str)
+        ]
+    elif isinstance(alias, str):
+        keys = [alias]
+    elif field.alias:
+        keys = [field.alias]
+    else:
+        keys = []
+    if name not in keys:
+        keys.append(name)
+    return tuple(keys)
+
+
+# ---------------------------------------------------------
+# FUNCTION FIELD DEFAULT
+# ---------------------------------------------------------
+def field_default(field: FieldInfo) -> Any:
+    """
+    Returns the default of a field when it can be shared by every
+    instance, PydanticUndefined for required fields and
+    COPIED_DEFAULT when it has to be built for each instance.
+    """
+    if field.default_factory is not None:
+        return COPIED_DEFAULT
+    if field.default is PydanticUndefined or isinstance(
+        field.default, IMMUTABLE_TYPES
+    ):
+        return field.default
+    return COPIED_DEFAULT
+
+
+# ---------------------------------------------------------
+# FUNCTION BUILD CONVERTER
+# ---------------------------------------------------------
+def build_converter(annotation: Any) -> Optional[Converter]:
+    """
+    Builds the function that turns a raw document value into the
+    value expected by a field with the given annotation. Returns
+    None when the raw value can be used as is.
+    """
+    if annotation is MongoObjectId:
+        return to_object_id
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return lambda value: (
+                construct_model(annotation, value)
+                if isinstance(value, dict)
+                else value
+            )
+        if issubclass(annotation, Enum):
+            return annotation
+        return None
+    origin = get_origin(annotation)
+    arguments: tuple = get_args(annotation)
+    if origin in UNION_TYPES:
+        members: list[Any] = [
+            argument
+            for argument in arguments
+            if argument is not type(None)  # noqa: E721
+        ]
+        converters: list[Converter] = [
+            converter
+            for converter in map(build_converter, members)
+            if converter is not None
+        ]
+        if not converters:
+            return None
+        if len(members) == 1:
+            converter: Converter = converters[0]
+            return lambda value: (
+                None if value is None else converter(value)
+            )
+        # Several members: the raw value does not say which one it
+        # belongs to, so this value is left to pydantic to resolve
+        return TypeAdapter(annotation).validate_python
+    if origin in SEQUENCE_TYPES and arguments:
+        item_converter: Optional[Converter] = build_converter(arguments[0])
+        if item_converter is None:
+            return None
+        return lambda values: (
+            origin(item_converter(value) for value in values)
+            if values is not None
+            else None
+        )
+    if origin is dict and len(arguments) == 2:
+        value_converter: Optional[Converter] = build_converter(
+            arguments[1]
+        )
+        if value_converter is None:
+            return None
+        return lambda values: (
+            {key: value_converter(value) for key, value in values.items()}
+            if values is not None
+            else None
+        )
+    return None
+
+
+# ---------------------------------------------------------
+# FUNCTION GET CONSTRUCTION PLAN
+# ---------------------------------------------------------
+@lru_cache(maxsize=None)
+def get_construction_plan(
+    model_type: type[BaseModel],
+) -> tuple[FieldPlan, ...]:
+    """
+    Returns, for every field of the model, its name, the document
+    keys it can be read from, the converter of its raw value, its
+    FieldInfo and its default (see field_default). The plan only
+    depends on the model, so it is computed once.
+    """
+    return tuple(
+        FieldPlan(
+            name=name,
+            keys=field_keys(name, field),
+            converter=build_converter(field.annotation),
+            field=field,
+            default=field_default(field),
+        )
+        for name, field in model_type.model_fields.items()
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION HAS CUSTOM POST INIT
+# ---------------------------------------------------------
+@lru_cache(maxsize=None)
+def has_custom_post_init(model_type: type[BaseModel]) -> bool:
+    # pydantic replaces model_post_init with init_private_attributes
+    # on models that only declare private attributes
+    return model_type.model_post_init.__qualname__ not in PLAIN_POST_INITS
+
+
+# ---------------------------------------------------------
+# FUNCTION CALLS PYTHON VALIDATORS
+# ---------------------------------------------------------
+def calls_python_validators(schema: Any) -> bool:
+    """
+    Tells whether validating against the core schema runs Python
+    functions other than the ObjectId one, which construct_model
+    runs as well.
+    """
+    if isinstance(schema, list):
+        return any(map(calls_python_validators, schema))
+    if not isinstance(schema, dict):
+        return False
+    if schema.get("type") in FUNCTION_SCHEMA_TYPES and (
+        schema["function"]["function"] != MongoObjectId.validate
+    ):
+        return True
+    return any(
+        calls_python_validators(value)
+        for key, value in schema.items()
+        if key not in NON_VALIDATING_SCHEMA_KEYS
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION PREFERS CONSTRUCTION
+# ---------------------------------------------------------
+@lru_cache(maxsize=None)
+def prefers_construction(model_type: type[BaseModel]) -> bool:
+    """
+    Tells whether construct_model builds instances of the model
+    faster than validating them. pydantic-core validates models of
+    plain types faster than they can be assembled in Python, so
+    construction only pays off when validation calls back into
+    Python (e.g. EmailStr or custom validators), whose cost it
+    skips.
+    """
+    return calls_python_validators(model_type.__pydantic_core_schema__)
+
+
+# ---------------------------------------------------------
+# FUNCTION CONSTRUCT MODEL
+# ---------------------------------------------------------
+def construct_model(model_type: type[BaseModel], document: dict) -> Any:
+    """
+    Builds an instance of the model from a trusted document without
+    validating it. Nested models, enums and ObjectIds are built
+    recursively so the instance looks like a validated one.
+
+    Only use it with documents that were written from validated
+    models: no type checking or coercion other than the described
+    above takes place, and keys unknown to the model are dropped.
+
+    The instance is assembled the same way model_construct does,
+    but with the per-model work (aliases, converters, defaults)
+    precomputed. Models with a custom model_post_init go through
+    model_construct so their hook still runs. For models of plain
+    types validation is faster, see prefers_construction.
+    :param model_type: Model class to be instantiated
+    :param document: Document as stored in the database
+    :return: Instance of the model
+    """
+    values: dict[str, Any] = {}
+    fields_set: set[str] = set()
+    for name, keys, converter, field, default in get_construction_plan(
+        model_type
+    ):
+        for key in keys:
+            if key in document:
+                value = document[key]
+                values[name] = (
+                    converter(value) if converter is not None else value
+                )
+                fields_set.add(name)
+                break
+        else:
+            if default is COPIED_DEFAULT:
+                default = field.get_default(call_default_factory=True)
+            if default is not PydanticUndefined:
+                values[name] = default
+    if has_custom_post_init(model_type):
+        return model_type.model_construct(fields_set, **values)
+    model = object.__new__(model_type)
+    set_attribute: Callable = object.__setattr__
+    set_attribute(model, "__dict__", values)
+    set_attribute(model, "__pydantic_fields_set__", fields_set)
+    set_attribute(
+        model,
+        "__pydantic_extra__",
+        {} if model_type.model_config.get("extra") == "allow" else None,
+    )
+    private: dict[str, Any] = {}
+    for name, attribute in model_type.__private_attributes__.items():
+        default = attribute.get_default()
+        if default is not PydanticUndefined:
+            private[name] = default
+    set_attribute(model, "__pydantic_private__", private or None)
+    return model
+
+
+# =========================================================
+# CLASS VALIDATION SAMPLER
+# =========================================================
+class ValidationSampler:
+    """
+    Decides which trusted documents are validated anyway, as a
+    safety net against data that does not match the model. The
+    count is shared by every call made through the same sampler,
+    so 1-in-N holds across queries and not only within a result.
+    """
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(self):
+        self._counter: itertools.count = itertools.count()
+        self._lock: threading.Lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # METHOD SHOULD VALIDATE
+    # -----------------------------------------------------
+    def should_validate(self, sample_every: Optional[int]) -> bool:
+        """
+        :param sample_every: validate one in every sample_every
+        documents. None or 0 disables the validation.
+        :return: True if the next document must be validated
+        """
+        if not sample_every:
+            return False
+        with self._lock:
+            position: int = next(self._counter)
+        return position % sample_every == 0
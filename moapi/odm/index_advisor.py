@@ -0,0 +1,262 @@
+import threading
+import time
+from typing import Any, Iterable, Mapping, NamedTuple, Optional
+
+from moapi.odm.indexes import INDEX_KEY_KEY
+
+ASCENDING: int = 1
+OPERATOR_PREFIX: str = "$"
+AND_OPERATOR: str = "$and"
+EQUALITY_OPERATOR: str = "$eq"
+IN_OPERATOR: str = "$in"
+DEFAULT_MAX_SHAPES: int = 1000
+
+
+# =========================================================
+# CLASS QUERY SHAPE
+# =========================================================
+class QueryShape(NamedTuple):
+    """
+    Normalized shape of a query: the fields compared by equality,
+    the sort keys and the fields compared by range, with the
+    values left out.
+    """
+
+    equality: tuple[str, ...]
+    sort: tuple[tuple[str, int], ...]
+    range: tuple[str, ...]
+
+
+# =========================================================
+# CLASS INDEX SUGGESTION
+# =========================================================
+class IndexSuggestion(NamedTuple):
+    keys: tuple[tuple[str, int], ...]
+    shape: QueryShape
+    calls: int
+    covered: bool
+
+
+# =========================================================
+# CLASS SHAPE STATS
+# =========================================================
+class ShapeStats:
+    __slots__ = ("calls", "last_seen")
+
+    def __init__(self):
+        self.calls: int = 0
+        self.last_seen: float = 0.0
+
+
+# ---------------------------------------------------------
+# FUNCTION CLASSIFY FILTER
+# ---------------------------------------------------------
+def classify_filter(
+    query_filter: Mapping[str, Any],
+    equality: set[str],
+    in_fields: set[str],
+    range_fields: set[str],
+):
+    for key, value in query_filter.items():
+        if key == AND_OPERATOR:
+            for condition in value:
+                classify_filter(
+                    condition, equality, in_fields, range_fields
+                )
+        elif key.startswith(OPERATOR_PREFIX):
+            # $or, $text, $where... cannot be served by the prefix of
+            # a single compound index
+            continue
+        elif isinstance(value, Mapping) and any(
+            operator.startswith(OPERATOR_PREFIX) for operator in value
+        ):
+            operators: set[str] = set(value)
+            if operators == {EQUALITY_OPERATOR}:
+                equality.add(key)
+            elif operators == {IN_OPERATOR}:
+                in_fields.add(key)
+            else:
+                range_fields.add(key)
+        else:
+            equality.add(key)
+
+
+# ---------------------------------------------------------
+# FUNCTION QUERY SHAPE
+# ---------------------------------------------------------
+def query_shape(mongo_query: Mapping[str, Any]) -> QueryShape:
+    """
+    Returns the shape of a query as produced by MoQL.output_query.
+    $in behaves as an equality for the index unless the query is
+    sorted, in which case it is treated as a range, since it breaks
+    the order of the index entries.
+    :param mongo_query: Dictionary with filter and sort
+    :return: Query shape
+    """
+    equality: set[str] = set()
+    in_fields: set[str] = set()
+    range_fields: set[str] = set()
+    classify_filter(
+        mongo_query.get("filter") or {}, equality, in_fields, range_fields
+    )
+    sort: list[tuple[str, int]] = list(mongo_query.get("sort") or [])
+    if sort:
+        range_fields |= in_fields
+    else:
+        equality |= in_fields
+    range_fields -= equality
+    sort = [
+        (key, direction) for key, direction in sort if key not in equality
+    ]
+    sort_fields: set[str] = {key for key, _ in sort}
+    return QueryShape(
+        equality=tuple(sorted(equality)),
+        sort=tuple(sort),
+        range=tuple(sorted(range_fields - sort_fields)),
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION SUGGESTED KEYS
+# ---------------------------------------------------------
+def suggested_keys(shape: QueryShape) -> tuple[tuple[str, int], ...]:
+    """
+    Builds the compound index for a shape following the
+    equality-sort-range rule: equality fields first, then the sort
+    keys in order and last the range fields.
+    """
+    return (
+        tuple((key, ASCENDING) for key in shape.equality)
+        + shape.sort
+        + tuple((key, ASCENDING) for key in shape.range)
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION IS COVERED
+# ---------------------------------------------------------
+def is_covered(
+    shape: QueryShape, index_keys: tuple[tuple[str, Any], ...]
+) -> bool:
+    """
+    True if the index can serve the shape the same way as the
+    suggested one: a prefix holding the equality fields (in any
+    order), followed by the sort keys (in order, all directions as
+    given or all reversed) and then the range fields (in any order).
+    """
+    sort_start: int = len(shape.equality)
+    range_start: int = sort_start + len(shape.sort)
+    range_end: int = range_start + len(shape.range)
+    equality_keys = index_keys[:sort_start]
+    sort_keys = index_keys[sort_start:range_start]
+    range_keys = index_keys[range_start:range_end]
+    if {key for key, _ in equality_keys} != set(shape.equality):
+        return False
+    if [key for key, _ in sort_keys] != [key for key, _ in shape.sort]:
+        return False
+    # The index can be walked backwards, so the directions have to
+    # be either all as requested or all reversed
+    matches: set[bool] = {
+        direction == expected
+        for (_, direction), (_, expected) in zip(sort_keys, shape.sort)
+    }
+    if len(matches) > 1:
+        return False
+    return {key for key, _ in range_keys} == set(shape.range)
+
+
+# =========================================================
+# CLASS INDEX ADVISOR
+# =========================================================
+class IndexAdvisor:
+    """
+    Records the shapes of the queries run against a collection and
+    proposes the compound indexes that would serve them, flagging
+    the shapes that are not covered by the existing indexes.
+
+    Only a bounded amount of shapes is kept. When the limit is
+    reached, the least used shape is evicted to make room.
+    """
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(self, max_shapes: int = DEFAULT_MAX_SHAPES):
+        self.max_shapes: int = max_shapes
+        self._shapes: dict[QueryShape, ShapeStats] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # METHOD RECORD
+    # -----------------------------------------------------
+    def record(self, mongo_query: Mapping[str, Any]) -> QueryShape:
+        """
+        Records the shape of a query.
+        :param mongo_query: Dictionary with filter and sort as
+        produced by MoQL.output_query
+        :return: Shape of the query
+        """
+        shape: QueryShape = query_shape(mongo_query)
+        with self._lock:
+            stats: Optional[ShapeStats] = self._shapes.get(shape)
+            if stats is None:
+                if len(self._shapes) >= self.max_shapes:
+                    least_used: QueryShape = min(
+                        self._shapes,
+                        key=lambda key: self._shapes[key].calls,
+                    )
+                    del self._shapes[least_used]
+                stats = self._shapes[shape] = ShapeStats()
+            stats.calls += 1
+            stats.last_seen = time.time()
+        return shape
+
+    # -----------------------------------------------------
+    # PROPERTY SHAPES
+    # -----------------------------------------------------
+    @property
+    def shapes(self) -> dict[QueryShape, int]:
+        with self._lock:
+            return {
+                shape: stats.calls for shape, stats in self._shapes.items()
+            }
+
+    # -----------------------------------------------------
+    # METHOD PROPOSE
+    # -----------------------------------------------------
+    def propose(
+        self, existing_indexes: Iterable[Mapping[str, Any]] = ()
+    ) -> list[IndexSuggestion]:
+        """
+        Proposes an index per recorded shape, most used first.
+        Shapes without equality, sort or range fields are skipped.
+        :param existing_indexes: Index descriptions, as returned
+        by list_indexes
+        :return: List of suggestions
+        """
+        existing: list[tuple[tuple[str, Any], ...]] = [
+            tuple(index[INDEX_KEY_KEY].items())
+            for index in existing_indexes
+        ]
+        suggestions: list[IndexSuggestion] = [
+            IndexSuggestion(
+                keys=suggested_keys(shape),
+                shape=shape,
+                calls=calls,
+                covered=any(is_covered(shape, keys) for keys in existing),
+            )
+            for shape, calls in self.shapes.items()
+            if shape.equality or shape.sort or shape.range
+        ]
+        return sorted(
+            suggestions,
+            key=lambda suggestion: suggestion.calls,
+            reverse=True,
+        )
+
+    # -----------------------------------------------------
+    # METHOD CLEAR
+    # -----------------------------------------------------
+    def clear(self):
+        with self._lock:
+            self._shapes.clear()
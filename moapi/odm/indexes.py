@@ -0,0 +1,226 @@
+from typing import Any, Iterable, Mapping, NamedTuple, Optional
+
+from pymongo import TEXT, IndexModel
+from pymongo.collection import Collection
+
+INDEX_NAME_KEY: str = "name"
+INDEX_KEY_KEY: str = "key"
+INDEXES_ATTRIBUTE: str = "indexes"
+COLLATION_KEY: str = "collation"
+# Options that change the behaviour of an index. An existing index
+# whose options differ from the declared ones is not replaced, so the
+# difference is reported as a conflict.
+INDEX_OPTION_KEYS: tuple[str, ...] = (
+    "unique",
+    "sparse",
+    "expireAfterSeconds",
+    "partialFilterExpression",
+    COLLATION_KEY,
+    "hidden",
+)
+INDEX_CONFLICT_ERROR: str = (
+    "Declared indexes differ from the existing ones: {conflicts}"
+)
+
+
+# =========================================================
+# CLASS INDEX CONFLICT ERROR
+# =========================================================
+class IndexConflictError(Exception):
+    pass
+
+
+# =========================================================
+# CLASS INDEX CONFLICT
+# =========================================================
+class IndexConflict(NamedTuple):
+    """
+    Declared index matching an existing index by name or key, but
+    with a different key or different options.
+
+    Example: id_1 declared unique while the existing id_1 is not
+
+    declared: IndexModel(...), existing: {...}, options: ("unique",)
+    """
+
+    declared: IndexModel
+    existing: Mapping[str, Any]
+    # Options that differ, "key" when the key itself differs
+    options: tuple[str, ...]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.declared.document[INDEX_NAME_KEY]} "
+            f"({', '.join(self.options)})"
+        )
+
+
+# ---------------------------------------------------------
+# FUNCTION INDEX KEY
+# ---------------------------------------------------------
+def index_key(index: Mapping[str, Any]) -> tuple[tuple[str, Any], ...]:
+    """
+    Returns the key specification of an index description (as
+    given by IndexModel.document or list_indexes) in a hashable
+    form. The order of the keys is part of the index identity.
+    """
+    return tuple(index[INDEX_KEY_KEY].items())
+
+
+# ---------------------------------------------------------
+# FUNCTION IS TEXT INDEX
+# ---------------------------------------------------------
+def is_text_index(index: Mapping[str, Any]) -> bool:
+    return TEXT in index[INDEX_KEY_KEY].values()
+
+
+# ---------------------------------------------------------
+# FUNCTION INDEX OPTION
+# ---------------------------------------------------------
+def index_option(index: Mapping[str, Any], key: str) -> Any:
+    """
+    Returns an option of an index description, None when it is not
+    set. Disabled flags (e.g. unique=False) are the same as unset.
+    """
+    value: Any = index.get(key)
+    return None if value is False else value
+
+
+# ---------------------------------------------------------
+# FUNCTION DIFFERING OPTIONS
+# ---------------------------------------------------------
+def differing_options(
+    declared: Mapping[str, Any], existing: Mapping[str, Any]
+) -> tuple[str, ...]:
+    """
+    Compares a declared index with the existing index it matches.
+    The server completes collations with the defaults of their
+    locale, so only the declared collation fields are compared.
+    Text indexes are reported with an internal key, so their keys
+    are not compared.
+    :return: Names of the differing options, "key" when the keys
+    differ
+    """
+    differing: list[str] = []
+    same_key: bool = index_key(declared) == index_key(existing)
+    if not same_key and not is_text_index(declared):
+        differing.append(INDEX_KEY_KEY)
+    for key in INDEX_OPTION_KEYS:
+        declared_value: Any = index_option(declared, key)
+        existing_value: Any = index_option(existing, key)
+        if key == COLLATION_KEY and declared_value and existing_value:
+            existing_value = {
+                field: existing_value.get(field)
+                for field in declared_value
+            }
+        if declared_value != existing_value:
+            differing.append(key)
+    return tuple(differing)
+
+
+# ---------------------------------------------------------
+# FUNCTION INDEX CONFLICTS
+# ---------------------------------------------------------
+def index_conflicts(
+    declared: Iterable[IndexModel], existing: Iterable[Mapping[str, Any]]
+) -> list[IndexConflict]:
+    """
+    Returns the declared indexes that exist (see missing_indexes)
+    with a different key or different options.
+    """
+    existing = list(existing)
+    by_name: dict[str, Mapping[str, Any]] = {
+        index[INDEX_NAME_KEY]: index for index in existing
+    }
+    by_key: dict[tuple, Mapping[str, Any]] = {
+        index_key(index): index for index in existing
+    }
+    conflicts: list[IndexConflict] = []
+    for index in declared:
+        document: dict = index.document
+        match: Optional[Mapping[str, Any]] = by_name.get(
+            document[INDEX_NAME_KEY]
+        ) or by_key.get(index_key(document))
+        if match is None:
+            continue
+        options: tuple[str, ...] = differing_options(document, match)
+        if options:
+            conflicts.append(IndexConflict(index, match, options))
+    return conflicts
+
+
+# ---------------------------------------------------------
+# FUNCTION DECLARED INDEXES
+# ---------------------------------------------------------
+def declared_indexes(*owners: Any) -> list[IndexModel]:
+    """
+    Collects the indexes declared as a list of IndexModel in the
+    Meta class of the given owners (services or entities).
+    """
+    indexes: list[IndexModel] = []
+    for owner in owners:
+        meta = getattr(owner, "Meta", None)
+        indexes.extend(getattr(meta, INDEXES_ATTRIBUTE, None) or [])
+    return indexes
+
+
+# ---------------------------------------------------------
+# FUNCTION MISSING INDEXES
+# ---------------------------------------------------------
+def missing_indexes(
+    declared: Iterable[IndexModel], existing: Iterable[Mapping[str, Any]]
+) -> list[IndexModel]:
+    """
+    Returns the declared indexes that do not exist yet. An index
+    exists when an index with the same name or the same key is
+    already present (text indexes are reported by the server with
+    an internal key, so they are only matched by name). Existing
+    indexes whose options differ are reported by index_conflicts.
+    """
+    existing = list(existing)
+    names: set[str] = {index[INDEX_NAME_KEY] for index in existing}
+    keys: set[tuple] = {index_key(index) for index in existing}
+    missing: list[IndexModel] = []
+    for index in declared:
+        document: dict = index.document
+        if (
+            document[INDEX_NAME_KEY] in names
+            or index_key(document) in keys
+        ):
+            continue
+        names.add(document[INDEX_NAME_KEY])
+        keys.add(index_key(document))
+        missing.append(index)
+    return missing
+
+
+# ---------------------------------------------------------
+# FUNCTION ENSURE INDEXES
+# ---------------------------------------------------------
+def ensure_indexes(
+    collection: Collection, indexes: Iterable[IndexModel]
+) -> list[str]:
+    """
+    Creates the given indexes that are missing on the collection,
+    all of them in a single createIndexes command.
+    :param collection: Collection the indexes belong to
+    :param indexes: Declared indexes
+    :return: Names of the created indexes
+    :raises IndexConflictError: If a declared index exists with a
+    different key or different options. Nothing is created then.
+    """
+    indexes = list(indexes)
+    existing: list[Mapping[str, Any]] = list(collection.list_indexes())
+    conflicts: list[IndexConflict] = index_conflicts(indexes, existing)
+    if conflicts:
+        raise IndexConflictError(
+            INDEX_CONFLICT_ERROR.format(
+                conflicts="; ".join(
+                    str(conflict) for conflict in conflicts
+                )
+            )
+        )
+    missing: list[IndexModel] = missing_indexes(indexes, existing)
+    if not missing:
+        return []
+    return collection.create_indexes(missing)
@@ -0,0 +1,548 @@
+import bisect
+import functools
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+
+from pydantic import BaseModel
+
+from moapi.moql.shape import moql_shape
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bounds (in seconds) of the latency buckets. Durations above
+# the last bound fall in an overflow bucket.
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+REPORTED_PERCENTILES: tuple[float, ...] = (0.5, 0.95, 0.99)
+# Marks the end of an instrumented iterator
+END: object = object()
+
+
+# =========================================================
+# CLASS OPERATION EVENT
+# =========================================================
+class OperationEvent(NamedTuple):
+    """
+    Report of a finished EntityService operation. Times are given
+    in seconds. The database time is the part of the duration not
+    spent converting documents (building models, dumping them),
+    so it includes the network round trips and the BSON decoding
+    done by the driver.
+    """
+
+    collection: str
+    operation: str
+    # Normalized MoQL query (see moql.shape.moql_shape), None for
+    # operations that do not take a MoQL query
+    query_shape: Optional[str]
+    duration: float
+    database_time: float
+    conversion_time: float
+    # Documents returned by the operation, None when unknown
+    documents: Optional[int]
+    # Keyword arguments of find (filter, sort, projection...) when
+    # the operation runs a query
+    query: Optional[dict]
+    error: Optional[BaseException]
+
+
+# =========================================================
+# CLASS OPERATION LISTENER
+# =========================================================
+class OperationListener(ABC):
+    """
+    Receives an event for every operation run through the services
+    it is registered on. Listeners are called synchronously on the
+    thread that ran the operation, so they should be cheap.
+    """
+
+    @abstractmethod
+    def on_operation(self, event: OperationEvent):
+        pass
+
+
+# =========================================================
+# CLASS OPERATION RECORDER
+# =========================================================
+class OperationRecorder:
+    """
+    Mutable state of an operation while it runs.
+    """
+
+    __slots__ = (
+        "collection",
+        "operation",
+        "query_shape",
+        "query",
+        "documents",
+        "duration",
+        "conversion_time",
+        "converting",
+        "error",
+    )
+
+    def __init__(self, collection: str, operation: str):
+        self.collection: str = collection
+        self.operation: str = operation
+        self.query_shape: Optional[str] = None
+        self.query: Optional[dict] = None
+        self.documents: Optional[int] = None
+        self.duration: float = 0.0
+        self.conversion_time: float = 0.0
+        self.converting: bool = False
+        self.error: Optional[BaseException] = None
+
+    # -----------------------------------------------------
+    # METHOD EVENT
+    # -----------------------------------------------------
+    def event(self) -> OperationEvent:
+        return OperationEvent(
+            collection=self.collection,
+            operation=self.operation,
+            query_shape=self.query_shape,
+            duration=self.duration,
+            database_time=max(self.duration - self.conversion_time, 0.0),
+            conversion_time=self.conversion_time,
+            documents=self.documents,
+            query=self.query,
+            error=self.error,
+        )
+
+
+CURRENT_OPERATION: ContextVar[Optional[OperationRecorder]] = ContextVar(
+    "moapi_current_operation", default=None
+)
+
+
+# ---------------------------------------------------------
+# FUNCTION CURRENT OPERATION
+# ---------------------------------------------------------
+def current_operation() -> Optional[OperationRecorder]:
+    """
+    Returns the recorder of the instrumented operation running on
+    the current context, if any.
+    """
+    return CURRENT_OPERATION.get()
+
+
+# ---------------------------------------------------------
+# FUNCTION RECORD QUERY
+# ---------------------------------------------------------
+def record_query(query: dict, moql: Optional[str] = None):
+    """
+    Attaches the query run by the current operation (and the shape
+    of the MoQL string it was compiled from) to its event. Does
+    nothing outside of an instrumented operation.
+    :param query: Keyword arguments given to find
+    :param moql: MoQL query string, if any
+    """
+    recorder: Optional[OperationRecorder] = CURRENT_OPERATION.get()
+    if recorder is None:
+        return
+    recorder.query = query
+    if moql is not None:
+        recorder.query_shape = moql_shape(moql)
+
+
+# ---------------------------------------------------------
+# FUNCTION RECORD DOCUMENTS
+# ---------------------------------------------------------
+def record_documents(documents: int):
+    """
+    Sets the amount of documents returned by the current operation,
+    for results the amount cannot be derived from (e.g. pages).
+    """
+    recorder: Optional[OperationRecorder] = CURRENT_OPERATION.get()
+    if recorder is not None:
+        recorder.documents = documents
+
+
+# =========================================================
+# CLASS CONVERSION
+# =========================================================
+class Conversion:
+    """
+    Context manager that adds the time spent in its block to the
+    conversion time of the current operation. Nested blocks are
+    only measured once. Does nothing outside of an instrumented
+    operation.
+    """
+
+    __slots__ = ("recorder", "started")
+
+    def __enter__(self) -> "Conversion":
+        recorder: Optional[OperationRecorder] = CURRENT_OPERATION.get()
+        if recorder is None or recorder.converting:
+            self.recorder = None
+            return self
+        recorder.converting = True
+        self.recorder = recorder
+        self.started: float = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.recorder is not None:
+            self.recorder.conversion_time += perf_counter() - self.started
+            self.recorder.converting = False
+
+
+# ---------------------------------------------------------
+# FUNCTION COUNT DOCUMENTS
+# ---------------------------------------------------------
+def count_documents(result: Any) -> Optional[int]:
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, (Mapping, BaseModel)):
+        return 1
+    return None
+
+
+# =========================================================
+# CLASS INSTRUMENTATION
+# =========================================================
+class Instrumentation:
+    """
+    Set of listeners of a service. With no listeners registered,
+    instrumented operations run without any bookkeeping.
+    """
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(
+        self, listeners: Optional[Iterable[OperationListener]] = None
+    ):
+        # Replaced instead of mutated, so operations can read it
+        # without taking the lock
+        self.listeners: tuple[OperationListener, ...] = tuple(
+            listeners or ()
+        )
+        self._lock: threading.Lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # METHOD ADD LISTENER
+    # -----------------------------------------------------
+    def add_listener(self, listener: OperationListener):
+        with self._lock:
+            self.listeners = self.listeners + (listener,)
+
+    # -----------------------------------------------------
+    # METHOD REMOVE LISTENER
+    # -----------------------------------------------------
+    def remove_listener(self, listener: OperationListener):
+        with self._lock:
+            self.listeners = tuple(
+                registered
+                for registered in self.listeners
+                if registered is not listener
+            )
+
+    # -----------------------------------------------------
+    # METHOD EMIT
+    # -----------------------------------------------------
+    def emit(self, recorder: OperationRecorder):
+        event: OperationEvent = recorder.event()
+        for listener in self.listeners:
+            try:
+                listener.on_operation(event)
+            except Exception:
+                # A failing listener must not break the operation
+                _LOGGER.exception("Operation listener %r failed", listener)
+
+    # -----------------------------------------------------
+    # METHOD RUN
+    # -----------------------------------------------------
+    def run(
+        self,
+        recorder: OperationRecorder,
+        function: Callable,
+        *args,
+        **kwargs,
+    ) -> Any:
+        """
+        Calls function with the recorder set as current operation,
+        adding the elapsed time to its duration.
+        """
+        token = CURRENT_OPERATION.set(recorder)
+        started: float = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except BaseException as error:
+            recorder.error = error
+            raise
+        finally:
+            recorder.duration += perf_counter() - started
+            CURRENT_OPERATION.reset(token)
+
+    # -----------------------------------------------------
+    # METHOD ITERATE
+    # -----------------------------------------------------
+    def iterate(
+        self,
+        recorder: OperationRecorder,
+        iterator: Iterator,
+        item_documents: Optional[Callable[[Any], int]] = None,
+    ) -> Iterator:
+        """
+        Yields the items of a lazy operation. Only the time spent
+        producing the items is measured, not the time the consumer
+        spends between them. The event is emitted once the iterator
+        is exhausted, fails or is closed.
+        :param item_documents: Amount of documents in an item, when
+        items are not single documents (e.g. NDJSON chunks)
+        """
+        iterator = iter(iterator)
+        recorder.documents = 0
+        try:
+            while True:
+                item: Any = self.run(recorder, next, iterator, END)
+                if item is END:
+                    return
+                recorder.documents += (
+                    1 if item_documents is None else item_documents(item)
+                )
+                yield item
+        finally:
+            self.emit(recorder)
+
+
+# ---------------------------------------------------------
+# FUNCTION INSTRUMENTED
+# ---------------------------------------------------------
+def instrumented(
+    operation: str,
+    iterator: bool = False,
+    item_documents: Optional[Callable[[Any], int]] = None,
+) -> Callable:
+    """
+    Decorates a method of EntityService so that it is reported to
+    the listeners of the service. Operations called from within
+    another instrumented operation are part of the outer one and
+    are not reported on their own.
+    :param operation: Name of the operation in the events
+    :param iterator: True when the method returns a lazy iterator,
+    which is measured while it is consumed
+    :param item_documents: Amount of documents in an item of the
+    iterator, one per item when not given
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(service, *args, **kwargs):
+            instrumentation: Instrumentation = service.instrumentation
+            if (
+                not instrumentation.listeners
+                or CURRENT_OPERATION.get() is not None
+            ):
+                return method(service, *args, **kwargs)
+            recorder: OperationRecorder = OperationRecorder(
+                service.collection_name, operation
+            )
+            try:
+                result: Any = instrumentation.run(
+                    recorder, method, service, *args, **kwargs
+                )
+            except BaseException:
+                instrumentation.emit(recorder)
+                raise
+            if iterator:
+                return instrumentation.iterate(
+                    recorder, result, item_documents
+                )
+            if recorder.documents is None:
+                recorder.documents = count_documents(result)
+            instrumentation.emit(recorder)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+# ---------------------------------------------------------
+# FUNCTION BUCKET PERCENTILE
+# ---------------------------------------------------------
+def bucket_percentile(
+    buckets: tuple[float, ...],
+    counts: list[int],
+    fraction: float,
+    maximum: float,
+) -> float:
+    """
+    Estimates a percentile of a bucketed histogram as the upper
+    bound of the bucket it falls in.
+    :param buckets: Upper bounds of the buckets
+    :param counts: Observations per bucket, plus the overflow bucket
+    :param fraction: Percentile as a fraction (0.95 for p95)
+    :param maximum: Largest observation, returned for the overflow
+    bucket and used to cap the bounds
+    """
+    total: int = sum(counts)
+    if not total:
+        return 0.0
+    rank: float = fraction * total
+    seen: int = 0
+    for bound, count in zip(buckets, counts):
+        seen += count
+        if seen >= rank:
+            return min(bound, maximum)
+    return maximum
+
+
+# =========================================================
+# CLASS OPERATION HISTOGRAM
+# =========================================================
+class OperationHistogram:
+    """
+    Latency histogram and totals of one operation of a collection.
+    Percentiles are estimated as the upper bound of the bucket the
+    percentile falls in.
+    """
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets: tuple[float, ...] = buckets
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.calls: int = 0
+        self.errors: int = 0
+        self.documents: int = 0
+        self.duration: float = 0.0
+        self.database_time: float = 0.0
+        self.conversion_time: float = 0.0
+        self.max_duration: float = 0.0
+
+    # -----------------------------------------------------
+    # METHOD OBSERVE
+    # -----------------------------------------------------
+    def observe(self, event: OperationEvent):
+        self.counts[bisect.bisect_left(self.buckets, event.duration)] += 1
+        self.calls += 1
+        self.errors += event.error is not None
+        self.documents += event.documents or 0
+        self.duration += event.duration
+        self.database_time += event.database_time
+        self.conversion_time += event.conversion_time
+        self.max_duration = max(self.max_duration, event.duration)
+
+    # -----------------------------------------------------
+    # METHOD PERCENTILE
+    # -----------------------------------------------------
+    def percentile(self, fraction: float) -> float:
+        """
+        :param fraction: Percentile as a fraction (0.95 for p95)
+        :return: Upper bound of the bucket, or the maximum duration
+        for the overflow bucket
+        """
+        return bucket_percentile(
+            self.buckets, self.counts, fraction, self.max_duration
+        )
+
+    # -----------------------------------------------------
+    # METHOD SNAPSHOT
+    # -----------------------------------------------------
+    def snapshot(self) -> dict[str, Any]:
+        snapshot: dict[str, Any] = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "documents": self.documents,
+            "total_time": self.duration,
+            "mean_time": self.duration / self.calls if self.calls else 0.0,
+            "max_time": self.max_duration,
+            "database_time": self.database_time,
+            "conversion_time": self.conversion_time,
+            "documents_per_second": (
+                self.documents / self.duration if self.duration else 0.0
+            ),
+            "buckets": dict(
+                zip(self.buckets + (float("inf"),), self.counts)
+            ),
+        }
+        for fraction in REPORTED_PERCENTILES:
+            snapshot[f"p{round(fraction * 100)}"] = self.percentile(
+                fraction
+            )
+        return snapshot
+
+
+# =========================================================
+# CLASS HISTOGRAM RECORDER
+# =========================================================
+class HistogramRecorder(OperationListener):
+    """
+    Listener that keeps a latency histogram per collection and
+    operation in memory.
+
+    Example:
+        recorder = HistogramRecorder()
+        service = UserService(..., listeners=[recorder])
+        ...
+        recorder.snapshot()[("users", "get_by_moql")]["p95"]
+    """
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(
+        self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    ):
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        self._histograms: dict[tuple[str, str], OperationHistogram] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # METHOD ON OPERATION
+    # -----------------------------------------------------
+    def on_operation(self, event: OperationEvent):
+        key: tuple[str, str] = (event.collection, event.operation)
+        with self._lock:
+            histogram: Optional[OperationHistogram] = self._histograms.get(
+                key
+            )
+            if histogram is None:
+                histogram = self._histograms[key] = OperationHistogram(
+                    self.buckets
+                )
+            histogram.observe(event)
+
+    # -----------------------------------------------------
+    # METHOD SNAPSHOT
+    # -----------------------------------------------------
+    def snapshot(self) -> dict[tuple[str, str], dict[str, Any]]:
+        """
+        :return: Statistics keyed by (collection, operation)
+        """
+        with self._lock:
+            return {
+                key: histogram.snapshot()
+                for key, histogram in self._histograms.items()
+            }
+
+    # -----------------------------------------------------
+    # METHOD CLEAR
+    # -----------------------------------------------------
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
@@ -0,0 +1,235 @@
+import base64
+import binascii
+from typing import Any, Optional
+
+import bson
+from bson.errors import BSONError
+
+from moapi.moql.errors import PaginationError
+from moapi.odm.types import MONGO_INTERNAL_ID_KEY
+
+ASCENDING: int = 1
+DESCENDING: int = -1
+PATH_SEPARATOR: str = "."
+TOKEN_SORT_KEY: str = "s"
+TOKEN_VALUES_KEY: str = "v"
+INVALID_TOKEN_ERROR: str = "The continuation token is not valid"
+SORT_MISMATCH_ERROR: str = (
+    "The continuation token was issued for a different sort"
+)
+ITEMS_FACET: str = "items"
+TOTAL_FACET: str = "total"
+SKIP_NOT_SUPPORTED_ERROR: str = (
+    "skip cannot be combined with keyset pagination"
+)
+
+
+# ---------------------------------------------------------
+# FUNCTION KEYSET SORT
+# ---------------------------------------------------------
+def keyset_sort(
+    sort: Optional[list[tuple[str, int]]],
+) -> list[tuple[str, int]]:
+    """
+    Returns the sort used for keyset pagination. The _id field is
+    appended as tie-breaker (following the direction of the last
+    key) so that every document has a unique position.
+    """
+    keys: list[tuple[str, int]] = list(sort or [])
+    if all(key != MONGO_INTERNAL_ID_KEY for key, _ in keys):
+        direction: int = keys[-1][1] if keys else ASCENDING
+        keys.append((MONGO_INTERNAL_ID_KEY, direction))
+    return keys
+
+
+# ---------------------------------------------------------
+# FUNCTION GET PATH VALUE
+# ---------------------------------------------------------
+def get_path_value(document: dict, path: str) -> Any:
+    value: Any = document
+    for segment in path.split(PATH_SEPARATOR):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(segment)
+    return value
+
+
+# ---------------------------------------------------------
+# FUNCTION ENCODE TOKEN
+# ---------------------------------------------------------
+def encode_token(sort: list[tuple[str, int]], document: dict) -> str:
+    """
+    Builds an opaque continuation token holding the sort values of
+    the last document of a page. BSON is used so ObjectIds and
+    datetimes survive the round trip.
+    """
+    payload: dict = {
+        TOKEN_SORT_KEY: [[key, direction] for key, direction in sort],
+        TOKEN_VALUES_KEY: [
+            get_path_value(document, key) for key, _ in sort
+        ],
+    }
+    return base64.urlsafe_b64encode(bson.encode(payload)).decode("ascii")
+
+
+# ---------------------------------------------------------
+# FUNCTION DECODE TOKEN
+# ---------------------------------------------------------
+def decode_token(token: str, sort: list[tuple[str, int]]) -> list[Any]:
+    try:
+        payload: dict = bson.decode(base64.urlsafe_b64decode(token))
+        token_sort: list = payload[TOKEN_SORT_KEY]
+        values: list = payload[TOKEN_VALUES_KEY]
+    except (BSONError, binascii.Error, KeyError, TypeError, ValueError):
+        raise PaginationError(INVALID_TOKEN_ERROR)
+    if [tuple(item) for item in token_sort] != list(sort):
+        raise PaginationError(SORT_MISMATCH_ERROR)
+    return values
+
+
+# ---------------------------------------------------------
+# FUNCTION AFTER VALUE
+# ---------------------------------------------------------
+def after_value(key: str, direction: int, value: Any) -> Optional[dict]:
+    """
+    Returns the condition matching the values of key placed after
+    value in the given direction, or None when nothing follows it.
+    Null and missing values sort before any other value, and a
+    range operator never matches them, so they are handled apart.
+    """
+    if value is None:
+        return {key: {"$ne": None}} if direction == ASCENDING else None
+    if direction == ASCENDING:
+        return {key: {"$gt": value}}
+    return {"$or": [{key: {"$lt": value}}, {key: None}]}
+
+
+# ---------------------------------------------------------
+# FUNCTION SEEK PREDICATE
+# ---------------------------------------------------------
+def seek_predicate(sort: list[tuple[str, int]], values: list[Any]) -> dict:
+    """
+    Translates the last seen sort values into a range predicate
+    that matches the documents placed after them, e.g. for
+    sort=-created,+_id:
+    {$or: [{$or: [{created: {$lt: c}}, {created: null}]},
+    {created: c, _id: {$gt: i}}]}
+    """
+    clauses: list[dict] = []
+    for index, (key, direction) in enumerate(sort):
+        condition: Optional[dict] = after_value(
+            key, direction, values[index]
+        )
+        if condition is None:
+            continue
+        clause: dict = {
+            previous_key: values[position]
+            for position, (previous_key, _) in enumerate(sort[:index])
+        }
+        clause.update(condition)
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+# ---------------------------------------------------------
+# FUNCTION MERGE FILTERS
+# ---------------------------------------------------------
+def merge_filters(query_filter: Optional[dict], predicate: dict) -> dict:
+    if not query_filter:
+        return predicate
+    return {"$and": [query_filter, predicate]}
+
+
+# ---------------------------------------------------------
+# FUNCTION ENSURE SORT KEYS ARE PROJECTED
+# ---------------------------------------------------------
+def ensure_sort_keys_projected(
+    projection: Optional[dict], sort: list[tuple[str, int]]
+) -> Optional[dict]:
+    """
+    The sort values of the last document are needed to build the
+    next token, so they can't be left out by the projection.
+    """
+    if not projection:
+        return projection
+    projection = dict(projection)
+    is_inclusion: bool = any(projection.values())
+    for key, _ in sort:
+        if is_inclusion:
+            projection[key] = 1
+        else:
+            projection.pop(key, None)
+    return projection
+
+
+# ---------------------------------------------------------
+# FUNCTION KEYSET QUERY
+# ---------------------------------------------------------
+def keyset_query(
+    mongo_query: dict, page_size: int, token: Optional[str] = None
+) -> dict:
+    """
+    Rewrites a compiled MoQL query (as returned by
+    MoQL.mongo_query) so it fetches the page that follows the given
+    continuation token. One extra document is requested to find
+    out whether there is a next page.
+    """
+    if mongo_query.get("skip"):
+        raise PaginationError(SKIP_NOT_SUPPORTED_ERROR)
+    sort: list[tuple[str, int]] = keyset_sort(mongo_query.get("sort"))
+    query_filter: dict = mongo_query.get("filter") or {}
+    if token:
+        query_filter = merge_filters(
+            query_filter, seek_predicate(sort, decode_token(token, sort))
+        )
+    return {
+        "filter": query_filter,
+        "sort": sort,
+        "limit": page_size + 1,
+        "projection": ensure_sort_keys_projected(
+            mongo_query.get("projection"), sort
+        ),
+    }
+
+
+# ---------------------------------------------------------
+# FUNCTION FACET PIPELINE
+# ---------------------------------------------------------
+def facet_pipeline(
+    mongo_query: dict, max_count: Optional[int] = None
+) -> list[dict]:
+    """
+    Builds an aggregation pipeline that returns, in a single round
+    trip, the requested page of a compiled MoQL query together with
+    the total amount of matching documents. When max_count is given
+    the count stops after max_count + 1 documents, so huge totals do
+    not require a full scan while a total above max_count can still
+    be told apart from one equal to it.
+
+    The filter and the sort go before the $facet stage, since its
+    sub-pipelines cannot use indexes: this way an index can serve
+    both and the page is cut from an already sorted stream.
+    """
+    stages: list[dict] = [{"$match": mongo_query.get("filter") or {}}]
+    if mongo_query.get("sort"):
+        stages.append({"$sort": dict(mongo_query["sort"])})
+    items: list[dict] = []
+    if mongo_query.get("skip"):
+        items.append({"$skip": mongo_query["skip"]})
+    if mongo_query.get("limit"):
+        items.append({"$limit": mongo_query["limit"]})
+    if mongo_query.get("projection"):
+        items.append({"$project": mongo_query["projection"]})
+    total: list[dict] = [{"$count": TOTAL_FACET}]
+    if max_count:
+        total.insert(0, {"$limit": max_count + 1})
+    stages.append({"$facet": {ITEMS_FACET: items, TOTAL_FACET: total}})
+    return stages
+
+
+# ---------------------------------------------------------
+# FUNCTION FACET TOTAL
+# ---------------------------------------------------------
+def facet_total(facet_result: dict) -> int:
+    counts: list[dict] = facet_result.get(TOTAL_FACET) or []
+    return counts[0][TOTAL_FACET] if counts else 0
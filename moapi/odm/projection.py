@@ -0,0 +1,217 @@
+from functools import lru_cache
+from typing import Any, Optional, get_args, get_origin
+
+from pydantic import BaseModel
+
+from moapi.odm.hydration import SEQUENCE_TYPES, UNION_TYPES, field_keys
+from moapi.odm.types import MONGO_INTERNAL_ID_KEY, MONGO_MODEL_ID_KEY
+
+PATH_SEPARATOR: str = "."
+INCLUDE: int = 1
+EXCLUDE: int = 0
+EXTRA_ALLOW: str = "allow"
+
+
+# ---------------------------------------------------------
+# FUNCTION JOIN PATH
+# ---------------------------------------------------------
+def join_path(prefix: str, key: str) -> str:
+    return f"{prefix}{PATH_SEPARATOR}{key}" if prefix else key
+
+
+# ---------------------------------------------------------
+# FUNCTION IS WITHIN
+# ---------------------------------------------------------
+def is_within(path: str, parent: str) -> bool:
+    """
+    True if the path is the parent path itself or one of its
+    descendants (e.g. "a.b" is within "a", but "ab" is not).
+    """
+    return path == parent or path.startswith(parent + PATH_SEPARATOR)
+
+
+# ---------------------------------------------------------
+# FUNCTION COLLAPSE PATHS
+# ---------------------------------------------------------
+def collapse_paths(paths: list[str]) -> list[str]:
+    """
+    Removes duplicated paths and the ones already covered by a
+    parent path, since MongoDB rejects colliding projections.
+    """
+    collapsed: list[str] = []
+    for path in sorted(set(paths)):
+        if not collapsed or not is_within(path, collapsed[-1]):
+            collapsed.append(path)
+    return collapsed
+
+
+# ---------------------------------------------------------
+# FUNCTION NESTED MODEL
+# ---------------------------------------------------------
+def nested_model(annotation: Any) -> Optional[type[BaseModel]]:
+    """
+    Returns the model stored under a field with the given
+    annotation: the model itself, an optional model or a sequence
+    of models. Returns None for anything else, including unions of
+    several models, whose fields cannot be told apart.
+    """
+    if isinstance(annotation, type):
+        return annotation if issubclass(annotation, BaseModel) else None
+    origin = get_origin(annotation)
+    arguments: tuple = get_args(annotation)
+    if origin in UNION_TYPES:
+        members: list[Any] = [
+            argument
+            for argument in arguments
+            if argument is not type(None)  # noqa: E721
+        ]
+        return nested_model(members[0]) if len(members) == 1 else None
+    if origin in SEQUENCE_TYPES and len(arguments) == 1:
+        return nested_model(arguments[0])
+    return None
+
+
+# ---------------------------------------------------------
+# FUNCTION MODEL PATHS
+# ---------------------------------------------------------
+def model_paths(
+    model_type: type[BaseModel],
+    prefix: str = "",
+    seen: tuple[type[BaseModel], ...] = (),
+) -> Optional[list[str]]:
+    """
+    Returns the document paths read by a model. Nested models are
+    expanded into their own paths (arrays of sub-documents use the
+    same dotted notation), and every key a field may be read from
+    (name and aliases) is included. None is returned when the
+    model accepts extra fields, since any path could be read.
+    """
+    if model_type.model_config.get("extra") == EXTRA_ALLOW:
+        return None
+    seen = seen + (model_type,)
+    paths: list[str] = []
+    for name, field in model_type.model_fields.items():
+        keys: tuple[str, ...] = field_keys(name, field)
+        if not prefix and MONGO_INTERNAL_ID_KEY in keys:
+            keys = tuple(key for key in keys if key != MONGO_MODEL_ID_KEY)
+        nested: Optional[type[BaseModel]] = nested_model(field.annotation)
+        for key in keys:
+            path: str = join_path(prefix, key)
+            nested_paths: Optional[list[str]] = (
+                model_paths(nested, path, seen)
+                if nested is not None and nested not in seen
+                else None
+            )
+            paths.extend(nested_paths if nested_paths else [path])
+    return paths
+
+
+# ---------------------------------------------------------
+# FUNCTION INFER PROJECTION
+# ---------------------------------------------------------
+def infer_projection(
+    model_type: type[BaseModel],
+) -> Optional[dict[str, int]]:
+    """
+    Derives the minimal MongoDB projection needed to build the
+    given model. The _id is excluded unless the model reads it.
+    :param model_type: Output model
+    :return: Inclusion projection or None if every field is needed.
+    It is a new dictionary that the caller may alter.
+    """
+    projection: Optional[dict[str, int]] = _cached_projection(model_type)
+    return None if projection is None else dict(projection)
+
+
+# ---------------------------------------------------------
+# FUNCTION CACHED PROJECTION
+# ---------------------------------------------------------
+@lru_cache(maxsize=None)
+def _cached_projection(
+    model_type: type[BaseModel],
+) -> Optional[dict[str, int]]:
+    paths: Optional[list[str]] = model_paths(model_type)
+    if paths is None:
+        return None
+    projection: dict[str, int] = {
+        path: INCLUDE for path in collapse_paths(paths)
+    }
+    if MONGO_INTERNAL_ID_KEY not in projection:
+        projection[MONGO_INTERNAL_ID_KEY] = EXCLUDE
+    return projection
+
+
+# ---------------------------------------------------------
+# FUNCTION MERGE PROJECTIONS
+# ---------------------------------------------------------
+def merge_projections(
+    inferred: Optional[dict[str, Any]], requested: Optional[dict[str, Any]]
+) -> Optional[dict[str, Any]]:
+    """
+    Merges the projection inferred from an output model with the
+    one requested by the caller (e.g. the MoQL fields parameter):
+
+    - Requested inclusions narrow the inferred paths down to the
+      intersection of both.
+    - Requested exclusions remove the inferred paths they cover.
+      Exclusions deeper than an inferred path cannot be combined
+      with an inclusion projection and are ignored.
+    - Projection operators ($slice, $elemMatch...) are kept as
+      requested and replace the inferred paths they collide with.
+    :param inferred: Projection inferred from the output model
+    :param requested: Projection requested by the caller
+    :return: Merged projection
+    """
+    if not requested:
+        return inferred
+    if inferred is None:
+        return requested
+    included: list[str] = [
+        path
+        for path, value in inferred.items()
+        if value == INCLUDE and path != MONGO_INTERNAL_ID_KEY
+    ]
+    inclusions: list[str] = [
+        path
+        for path, value in requested.items()
+        if value == INCLUDE and path != MONGO_INTERNAL_ID_KEY
+    ]
+    exclusions: list[str] = [
+        path for path, value in requested.items() if value == EXCLUDE
+    ]
+    operators: dict[str, Any] = {
+        path: value
+        for path, value in requested.items()
+        if isinstance(value, dict)
+    }
+    if inclusions:
+        included = [
+            path
+            for path in included
+            if any(is_within(path, inclusion) for inclusion in inclusions)
+        ] + [
+            inclusion
+            for inclusion in inclusions
+            if any(is_within(inclusion, path) for path in included)
+        ]
+    included = [
+        path
+        for path in collapse_paths(included)
+        if not any(is_within(path, exclusion) for exclusion in exclusions)
+        and not any(
+            is_within(path, operator) or is_within(operator, path)
+            for operator in operators
+        )
+    ]
+    projection: dict[str, Any] = {path: INCLUDE for path in included}
+    projection.update(operators)
+    id_included: bool = (
+        inferred.get(MONGO_INTERNAL_ID_KEY) == INCLUDE
+        and requested.get(MONGO_INTERNAL_ID_KEY) != EXCLUDE
+    )
+    if not projection:
+        # An empty inclusion would turn into an exclusion projection
+        # and return whole documents
+        id_included = True
+    projection[MONGO_INTERNAL_ID_KEY] = INCLUDE if id_included else EXCLUDE
+    return projection
@@ -0,0 +1,346 @@
+import bisect
+import json
+import math
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Hashable, Iterable, Optional
+
+from moapi.moql.shape import PLACEHOLDER
+from moapi.odm.instrumentation import (
+    DEFAULT_LATENCY_BUCKETS,
+    OperationEvent,
+    OperationListener,
+    bucket_percentile,
+)
+
+DEFAULT_MAX_ENTRIES: int = 1000
+# Share of the entries evicted at once when the registry is full, so
+# the eviction cost is paid once every many new keys
+EVICTION_FRACTION: float = 0.05
+DEFAULT_SORT_KEY: str = "total_time"
+FILTER_KEY: str = "filter"
+SORT_KEY: str = "sort"
+PROJECTION_KEY: str = "projection"
+FINGERPRINT_SEPARATOR: str = "&"
+INVALID_SORT_KEY_ERROR: str = "{sort_by} is not a valid statistic"
+
+
+# =========================================================
+# CLASS STATEMENT STATISTICS
+# =========================================================
+class StatementStatistics:
+    """
+    Counters of one entry of a statistics registry.
+    """
+
+    __slots__ = (
+        "buckets",
+        "counts",
+        "calls",
+        "errors",
+        "rows",
+        "total_time",
+        "min_time",
+        "max_time",
+        "last_seen",
+    )
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets: tuple[float, ...] = buckets
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.calls: int = 0
+        self.errors: int = 0
+        self.rows: int = 0
+        self.total_time: float = 0.0
+        self.min_time: float = math.inf
+        self.max_time: float = 0.0
+        self.last_seen: float = 0.0
+
+    # -----------------------------------------------------
+    # METHOD OBSERVE
+    # -----------------------------------------------------
+    def observe(
+        self, duration: float, rows: Optional[int], error: bool = False
+    ):
+        self.counts[bisect.bisect_left(self.buckets, duration)] += 1
+        self.calls += 1
+        self.errors += error
+        self.rows += rows or 0
+        self.total_time += duration
+        self.min_time = min(self.min_time, duration)
+        self.max_time = max(self.max_time, duration)
+        self.last_seen = time.time()
+
+    # -----------------------------------------------------
+    # METHOD AS DICT
+    # -----------------------------------------------------
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_time": self.total_time,
+            "mean_time": (
+                self.total_time / self.calls if self.calls else 0.0
+            ),
+            "min_time": self.min_time if self.calls else 0.0,
+            "max_time": self.max_time,
+            "p95_time": bucket_percentile(
+                self.buckets, self.counts, 0.95, self.max_time
+            ),
+            "last_seen": self.last_seen,
+        }
+
+
+# =========================================================
+# CLASS STATISTICS REGISTRY
+# =========================================================
+class StatisticsRegistry:
+    """
+    Bounded registry of statistics keyed by a tuple of fields (e.g.
+    collection and query shape).
+
+    When the registry is full, the least called entries are evicted
+    to make room, a few of them at a time (see EVICTION_FRACTION).
+    Frequent keys stay, while one-off keys come and go.
+    """
+
+    # Names of the fields of the keys, used by dump
+    key_names: tuple[str, ...] = ("key",)
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        self.max_entries: int = max_entries
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        self.evicted: int = 0
+        self._entries: dict[Hashable, StatementStatistics] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # METHOD RECORD
+    # -----------------------------------------------------
+    def record(
+        self,
+        key: tuple,
+        duration: float,
+        rows: Optional[int] = None,
+        error: bool = False,
+        **measures,
+    ):
+        """
+        Adds an observation to the entry of the given key.
+        :param key: Tuple with one value per field of key_names
+        :param duration: Duration in seconds
+        :param rows: Documents returned
+        :param error: True if the observation failed
+        :param measures: Additional measures, for entries created by
+        subclasses (see create_entry)
+        """
+        with self._lock:
+            entry: Optional[StatementStatistics] = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    self._evict()
+                entry = self._entries[key] = self.create_entry()
+            entry.observe(duration, rows, error, **measures)
+
+    # -----------------------------------------------------
+    # METHOD CREATE ENTRY
+    # -----------------------------------------------------
+    def create_entry(self) -> StatementStatistics:
+        return StatementStatistics(self.buckets)
+
+    # -----------------------------------------------------
+    # METHOD EVICT
+    # -----------------------------------------------------
+    def _evict(self):
+        amount: int = max(1, int(self.max_entries * EVICTION_FRACTION))
+        least_called: list[Hashable] = sorted(
+            self._entries, key=lambda key: self._entries[key].calls
+        )[:amount]
+        for key in least_called:
+            del self._entries[key]
+        self.evicted += len(least_called)
+
+    # -----------------------------------------------------
+    # METHOD DUMP
+    # -----------------------------------------------------
+    def dump(
+        self, sort_by: str = DEFAULT_SORT_KEY, limit: Optional[int] = None
+    ) -> list[dict[str, Any]]:
+        """
+        Returns the entries as dictionaries holding the fields of
+        the key and the statistics, highest first.
+        :param sort_by: Statistic used to rank the entries (calls,
+        total_time, mean_time, p95_time, rows...)
+        :param limit: Maximum amount of entries returned
+        :return: List of entries
+        """
+        with self._lock:
+            rows: list[dict[str, Any]] = [
+                {**dict(zip(self.key_names, key)), **entry.as_dict()}
+                for key, entry in self._entries.items()
+            ]
+        if rows and sort_by not in rows[0]:
+            raise ValueError(
+                INVALID_SORT_KEY_ERROR.format(sort_by=sort_by)
+            )
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows[:limit] if limit is not None else rows
+
+    # -----------------------------------------------------
+    # METHOD WRITE
+    # -----------------------------------------------------
+    def write(self, path: str, sort_by: str = DEFAULT_SORT_KEY):
+        """
+        Writes the dump as JSON, to be read with the command line
+        (moapi query-stats path).
+        """
+        with open(path, "w") as file:
+            json.dump(self.dump(sort_by=sort_by), file)
+
+    # -----------------------------------------------------
+    # METHOD CLEAR
+    # -----------------------------------------------------
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ---------------------------------------------------------
+# FUNCTION STRIP VALUES
+# ---------------------------------------------------------
+def strip_values(value: Any) -> Any:
+    """
+    Replaces the literal values of a Mongo filter with a
+    placeholder, keeping the field names, the operators and the
+    nesting of logical operators ($and, $or...). Keys are sorted.
+    """
+    if isinstance(value, Mapping):
+        return {key: strip_values(value[key]) for key in sorted(value)}
+    if (
+        isinstance(value, (list, tuple))
+        and value
+        and all(isinstance(item, Mapping) for item in value)
+    ):
+        return [strip_values(item) for item in value]
+    return PLACEHOLDER
+
+
+# ---------------------------------------------------------
+# FUNCTION QUERY FINGERPRINT
+# ---------------------------------------------------------
+def query_fingerprint(query: Mapping[str, Any]) -> str:
+    """
+    Normalizes the arguments of a find (filter, sort, projection)
+    into a string without literal values, for queries that were not
+    written in MoQL. Skip and limit are left out.
+    :param query: Dictionary with filter, sort and projection
+    :return: Fingerprint of the query
+    """
+    parts: list[str] = [
+        f"{FILTER_KEY}="
+        + json.dumps(
+            strip_values(query.get(FILTER_KEY) or {}),
+            separators=(",", ":"),
+        )
+    ]
+    for key in (SORT_KEY, PROJECTION_KEY):
+        if query.get(key):
+            parts.append(
+                f"{key}="
+                + json.dumps(
+                    query[key], separators=(",", ":"), default=str
+                )
+            )
+    return FINGERPRINT_SEPARATOR.join(parts)
+
+
+# =========================================================
+# CLASS QUERY STATISTICS
+# =========================================================
+class QueryStatistics(StatisticsRegistry, OperationListener):
+    """
+    Statistics of the queries run through EntityService, in the
+    spirit of pg_stat_statements: calls, latency, rows and last
+    seen time per collection and query shape. MoQL queries are
+    keyed by their shape (see moql.shape.moql_shape) and other
+    queries by their fingerprint (see query_fingerprint).
+    Operations that do not run a query are ignored.
+
+    Example:
+        statistics = QueryStatistics(max_entries=500)
+        service = UserService(..., listeners=[statistics])
+        ...
+        statistics.dump(sort_by="p95_time", limit=10)
+    """
+
+    key_names: tuple[str, ...] = ("collection", "query_shape")
+
+    # -----------------------------------------------------
+    # METHOD ON OPERATION
+    # -----------------------------------------------------
+    def on_operation(self, event: OperationEvent):
+        shape: Optional[str] = event.query_shape
+        if shape is None:
+            if event.query is None:
+                return
+            shape = query_fingerprint(event.query)
+        self.record(
+            (event.collection, shape),
+            duration=event.duration,
+            rows=event.documents,
+            error=event.error is not None,
+        )
+
+
+# ---------------------------------------------------------
+# FUNCTION FORMAT DUMP
+# ---------------------------------------------------------
+def format_dump(
+    rows: Iterable[dict[str, Any]], columns: Iterable[str]
+) -> list[str]:
+    """
+    Formats dumped rows as aligned text lines, times in
+    milliseconds.
+    """
+    columns = list(columns)
+    cells: list[list[str]] = [columns] + [
+        [format_cell(column, row.get(column)) for column in columns]
+        for row in rows
+    ]
+    widths: list[int] = [
+        max(len(line[index]) for line in cells)
+        for index in range(len(columns))
+    ]
+    return [
+        "  ".join(
+            cell.ljust(width) for cell, width in zip(line, widths)
+        ).rstrip()
+        for line in cells
+    ]
+
+
+# ---------------------------------------------------------
+# FUNCTION FORMAT CELL
+# ---------------------------------------------------------
+def format_cell(column: str, value: Any) -> str:
+    if column == "last_seen" and value:
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(value))
+    if column.endswith("_time") and isinstance(value, (int, float)):
+        return f"{value * 1000:.3f}"
+    return str(value)
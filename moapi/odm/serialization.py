@@ -0,0 +1,94 @@
+from typing import Any, Iterable, Iterator
+
+from pydantic_core import to_json
+
+from moapi.odm.batching import chunked
+from moapi.odm.types import MONGO_INTERNAL_ID_KEY, MONGO_MODEL_ID_KEY
+
+DEFAULT_NDJSON_CHUNK_SIZE: int = 100
+NDJSON_SEPARATOR: bytes = b"\n"
+# Binary values are not valid UTF-8 in general, so they are written
+# as (URL safe) base64, as pydantic does in that mode
+JSON_BYTES_MODE: str = "base64"
+
+
+# ---------------------------------------------------------
+# FUNCTION JSON FALLBACK
+# ---------------------------------------------------------
+def json_fallback(value: Any) -> str:
+    # Values pydantic-core does not know how to serialize (ObjectId,
+    # Decimal128, ...) are written as strings, the same way the
+    # MongoObjectId field serializes an ObjectId
+    return str(value)
+
+
+# ---------------------------------------------------------
+# FUNCTION RENAME INTERNAL ID
+# ---------------------------------------------------------
+def rename_internal_id(document: dict) -> dict:
+    """
+    Renames the _id of a document read from the database to
+    mongo_id, matching the output of the models. The document is
+    modified in place, which is safe for the dictionaries that are
+    decoded by the driver for each read.
+    :param document: Document as read from the database
+    :return: The same document
+    """
+    if MONGO_INTERNAL_ID_KEY in document:
+        document[MONGO_MODEL_ID_KEY] = document.pop(MONGO_INTERNAL_ID_KEY)
+    return document
+
+
+# ---------------------------------------------------------
+# FUNCTION DOCUMENTS TO JSON
+# ---------------------------------------------------------
+def documents_to_json(documents: Iterable[dict]) -> bytes:
+    """
+    Serializes documents as a JSON array in a single call to
+    pydantic-core, without building models.
+    :param documents: Documents as read from the database
+    :return: JSON encoded array
+    """
+    return to_json(
+        [rename_internal_id(document) for document in documents],
+        fallback=json_fallback,
+        bytes_mode=JSON_BYTES_MODE,
+    )
+
+
+# ---------------------------------------------------------
+# FUNCTION DOCUMENTS TO NDJSON
+# ---------------------------------------------------------
+def documents_to_ndjson(
+    documents: Iterable[dict],
+    chunk_size: int = DEFAULT_NDJSON_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Serializes documents as newline delimited JSON. Lines are
+    grouped in chunks so the output can be streamed as the
+    documents arrive without paying a write per document.
+    :param documents: Documents as read from the database
+    :param chunk_size: amount of documents per yielded chunk
+    :return: Generator of NDJSON chunks, each ending in a newline
+    """
+    for chunk in chunked(documents, chunk_size):
+        yield b"".join(
+            to_json(
+                rename_internal_id(document),
+                fallback=json_fallback,
+                bytes_mode=JSON_BYTES_MODE,
+            )
+            + NDJSON_SEPARATOR
+            for document in chunk
+        )
+
+
+# ---------------------------------------------------------
+# FUNCTION NDJSON LINES
+# ---------------------------------------------------------
+def ndjson_lines(chunk: bytes) -> int:
+    """
+    Counts the documents of an NDJSON chunk. JSON escapes the line
+    breaks within strings, so there is one separator per document.
+    """
+    return chunk.count(NDJSON_SEPARATOR)
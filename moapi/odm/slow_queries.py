@@ -0,0 +1,288 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Mapping, NamedTuple, Optional
+
+from pymongo.database import Database
+
+from moapi.odm.instrumentation import OperationEvent, OperationListener
+from moapi.odm.query_statistics import query_fingerprint
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_THRESHOLD: float = 0.5
+DEFAULT_SAMPLE_RATE: float = 1.0
+DEFAULT_MAX_EXPLAINS_PER_MINUTE: int = 10
+DEFAULT_SHAPE_COOLDOWN: float = 300.0
+DEFAULT_MAX_RECORDS: int = 100
+DEFAULT_MAX_PENDING: int = 4
+# Amount of shapes whose last explain time is kept before the
+# expired ones are purged
+MAX_TRACKED_SHAPES: int = 1000
+RATE_LIMIT_WINDOW: float = 60.0
+EXECUTION_STATS_VERBOSITY: str = "executionStats"
+COLLECTION_SCAN_STAGE: str = "COLLSCAN"
+
+
+# =========================================================
+# CLASS EXPLAIN RECORD
+# =========================================================
+class ExplainRecord(NamedTuple):
+    """
+    Execution statistics of a slow query, as reported by explain.
+    """
+
+    collection: str
+    query_shape: Optional[str]
+    query: dict
+    # Duration of the operation that triggered the explain
+    duration: float
+    winning_plan: dict
+    # Stage names of the winning plan, from the root to the leaves
+    stages: tuple[str, ...]
+    collection_scan: bool
+    keys_examined: int
+    documents_examined: int
+    documents_returned: int
+    execution_time_ms: int
+    explained_at: float
+
+
+# ---------------------------------------------------------
+# FUNCTION EXPLAIN COMMAND
+# ---------------------------------------------------------
+def explain_command(collection: str, query: Mapping[str, Any]) -> dict:
+    """
+    Builds the explain command of a find with the arguments of an
+    operation event (filter, sort, projection, skip and limit).
+    """
+    find: dict = {"find": collection, "filter": query.get("filter") or {}}
+    if query.get("sort"):
+        find["sort"] = dict(query["sort"])
+    if query.get("projection"):
+        find["projection"] = query["projection"]
+    if query.get("skip"):
+        find["skip"] = query["skip"]
+    if query.get("limit"):
+        find["limit"] = query["limit"]
+    return {"explain": find, "verbosity": EXECUTION_STATS_VERBOSITY}
+
+
+# ---------------------------------------------------------
+# FUNCTION WINNING PLAN
+# ---------------------------------------------------------
+def winning_plan(explain: Mapping[str, Any]) -> dict:
+    plan: dict = explain.get("queryPlanner", {}).get("winningPlan", {})
+    # Plans run by the slot based engine nest the classic plan
+    return plan.get("queryPlan", plan)
+
+
+# ---------------------------------------------------------
+# FUNCTION PLAN STAGES
+# ---------------------------------------------------------
+def plan_stages(plan: Mapping[str, Any]) -> tuple[str, ...]:
+    """
+    Lists the stages of a plan, walking its input stages depth
+    first.
+    """
+    stages: list[str] = []
+    pending: list[Mapping[str, Any]] = [plan]
+    while pending:
+        stage: Mapping[str, Any] = pending.pop()
+        if "stage" in stage:
+            stages.append(stage["stage"])
+        children: list = list(stage.get("inputStages", []))
+        if "inputStage" in stage:
+            children.append(stage["inputStage"])
+        pending.extend(reversed(children))
+    return tuple(stages)
+
+
+# ---------------------------------------------------------
+# FUNCTION EXPLAIN RECORD
+# ---------------------------------------------------------
+def explain_record(
+    event: OperationEvent, explain: Mapping[str, Any]
+) -> ExplainRecord:
+    plan: dict = winning_plan(explain)
+    stages: tuple[str, ...] = plan_stages(plan)
+    stats: Mapping[str, Any] = explain.get("executionStats", {})
+    return ExplainRecord(
+        collection=event.collection,
+        query_shape=event.query_shape,
+        query=event.query,
+        duration=event.duration,
+        winning_plan=plan,
+        stages=stages,
+        collection_scan=COLLECTION_SCAN_STAGE in stages,
+        keys_examined=stats.get("totalKeysExamined", 0),
+        documents_examined=stats.get("totalDocsExamined", 0),
+        documents_returned=stats.get("nReturned", 0),
+        execution_time_ms=stats.get("executionTimeMillis", 0),
+        explained_at=time.time(),
+    )
+
+
+# =========================================================
+# CLASS SLOW QUERY EXPLAINER
+# =========================================================
+class SlowQueryExplainer(OperationListener):
+    """
+    Listener that explains (with executionStats verbosity) the
+    queries whose database time is above a threshold, so slow
+    queries can be diagnosed without reproducing them by hand.
+
+    Explains run on a background thread and are rate limited:
+    - only a sample_rate fraction of the slow queries is considered,
+    - a query shape is explained at most once per shape_cooldown
+      seconds,
+    - at most max_per_minute explains run per minute,
+    - slow queries are dropped while max_pending explains are
+      waiting to run.
+    The last max_records results are kept in memory.
+
+    Example:
+        explainer = SlowQueryExplainer(parameters.db, threshold=0.2)
+        service = UserService(..., listeners=[explainer])
+        ...
+        explainer.records
+    """
+
+    # -----------------------------------------------------
+    # CONSTRUCTOR
+    # -----------------------------------------------------
+    def __init__(
+        self,
+        database: Database,
+        threshold: float = DEFAULT_SLOW_QUERY_THRESHOLD,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        max_per_minute: int = DEFAULT_MAX_EXPLAINS_PER_MINUTE,
+        shape_cooldown: float = DEFAULT_SHAPE_COOLDOWN,
+        max_records: int = DEFAULT_MAX_RECORDS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ):
+        self.database: Database = database
+        self.threshold: float = threshold
+        self.sample_rate: float = sample_rate
+        self.max_per_minute: int = max_per_minute
+        self.shape_cooldown: float = shape_cooldown
+        self.max_pending: int = max_pending
+        self.failures: int = 0
+        self._records: deque[ExplainRecord] = deque(maxlen=max_records)
+        self._explained_at: dict[tuple, float] = {}
+        self._window: deque[float] = deque()
+        self._pending: int = 0
+        self._random: random.Random = random.Random()
+        self._lock: threading.Lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="moapi-explain"
+        )
+
+    # -----------------------------------------------------
+    # METHOD ON OPERATION
+    # -----------------------------------------------------
+    def on_operation(self, event: OperationEvent):
+        if (
+            event.query is None
+            or event.error is not None
+            or event.database_time < self.threshold
+            or self._random.random() >= self.sample_rate
+            or not self._acquire(event)
+        ):
+            return
+        self._executor.submit(self._run, event)
+
+    # -----------------------------------------------------
+    # METHOD ACQUIRE
+    # -----------------------------------------------------
+    def _acquire(self, event: OperationEvent) -> bool:
+        """
+        Applies the rate limits, reserving a slot for the event
+        when they allow it.
+        """
+        key: tuple = (
+            event.collection,
+            event.query_shape or query_fingerprint(event.query),
+        )
+        now: float = time.monotonic()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return False
+            last: Optional[float] = self._explained_at.get(key)
+            if last is not None and now - last < self.shape_cooldown:
+                return False
+            while (
+                self._window and now - self._window[0] >= RATE_LIMIT_WINDOW
+            ):
+                self._window.popleft()
+            if len(self._window) >= self.max_per_minute:
+                return False
+            self._window.append(now)
+            if len(self._explained_at) >= MAX_TRACKED_SHAPES:
+                self._explained_at = {
+                    shape: explained_at
+                    for shape, explained_at in self._explained_at.items()
+                    if now - explained_at < self.shape_cooldown
+                }
+            self._explained_at[key] = now
+            self._pending += 1
+        return True
+
+    # -----------------------------------------------------
+    # METHOD RUN
+    # -----------------------------------------------------
+    def _run(self, event: OperationEvent):
+        try:
+            self.explain(event)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    # -----------------------------------------------------
+    # METHOD EXPLAIN
+    # -----------------------------------------------------
+    def explain(self, event: OperationEvent) -> Optional[ExplainRecord]:
+        """
+        Runs the explain of the query of an event and stores the
+        result. Failures are logged and counted.
+        """
+        try:
+            record: ExplainRecord = explain_record(
+                event,
+                self.database.command(
+                    explain_command(event.collection, event.query)
+                ),
+            )
+        except Exception:
+            self.failures += 1
+            _LOGGER.exception(
+                "Could not explain slow query on %s", event.collection
+            )
+            return None
+        self._records.append(record)
+        return record
+
+    # -----------------------------------------------------
+    # PROPERTY RECORDS
+    # -----------------------------------------------------
+    @property
+    def records(self) -> list[ExplainRecord]:
+        return list(self._records)
+
+    # -----------------------------------------------------
+    # METHOD WAIT
+    # -----------------------------------------------------
+    def wait(self, timeout: Optional[float] = None):
+        """
+        Waits until the explains submitted so far are done.
+        """
+        self._executor.submit(lambda: None).result(timeout=timeout)
+
+    # -----------------------------------------------------
+    # METHOD CLOSE
+    # -----------------------------------------------------
+    def close(self):
+        self._executor.shutdown(wait=True)
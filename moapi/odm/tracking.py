@@ -0,0 +1,72 @@
+from typing import Any
+
+from moapi.odm.types import MONGO_INTERNAL_ID_KEY
+
+PATH_SEPARATOR: str = "."
+UNSET_VALUE: str = ""
+
+
+# ---------------------------------------------------------
+# FUNCTION JOIN PATH
+# ---------------------------------------------------------
+def join_path(prefix: str, key: str) -> str:
+    return f"{prefix}{PATH_SEPARATOR}{key}" if prefix else key
+
+
+# ---------------------------------------------------------
+# FUNCTION DIFF NESTED
+# ---------------------------------------------------------
+def diff_nested(
+    original: dict,
+    current: dict,
+    prefix: str,
+    set_values: dict[str, Any],
+    unset_paths: dict[str, str],
+):
+    for key, value in current.items():
+        path: str = join_path(prefix, key)
+        if key not in original:
+            set_values[path] = value
+        elif isinstance(value, dict) and isinstance(original[key], dict):
+            diff_nested(
+                original[key], value, path, set_values, unset_paths
+            )
+        elif original[key] != value:
+            set_values[path] = value
+    for key in original:
+        if key not in current:
+            unset_paths[join_path(prefix, key)] = UNSET_VALUE
+
+
+# ---------------------------------------------------------
+# FUNCTION DIFF DOCUMENTS
+# ---------------------------------------------------------
+def diff_documents(
+    original: dict, current: dict
+) -> tuple[dict[str, Any], dict[str, str]]:
+    """
+    Compares the document an entity was loaded from with its
+    current document representation and returns the $set and
+    $unset operands that turn the former into the latter.
+
+    Nested documents are compared key by key, so a change deep
+    inside a sub-document only sets its dotted path. Arrays are
+    compared as a whole. Top-level fields that are not part of
+    the current document (e.g. fields unknown to the model) are
+    never unset, and the _id is ignored.
+    :param original: Document as it was loaded
+    :param current: Current document representation of the entity
+    :return: Tuple with the $set and $unset operands
+    """
+    set_values: dict[str, Any] = {}
+    unset_paths: dict[str, str] = {}
+    for key, value in current.items():
+        if key == MONGO_INTERNAL_ID_KEY:
+            continue
+        if key not in original:
+            set_values[key] = value
+        elif isinstance(value, dict) and isinstance(original[key], dict):
+            diff_nested(original[key], value, key, set_values, unset_paths)
+        elif original[key] != value:
+            set_values[key] = value
+    return set_values, unset_paths
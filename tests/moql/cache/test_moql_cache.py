@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from moapi.moql.cache import (
+    MoQLCache,
+    CompiledMoQL,
+    compile_moql,
+)
+from moapi.moql.casters import cast_as_str
+from moapi.moql.core import MoQL
+
+QUERY: str = "status=ACTIVE&score>=5&sort=-created&limit=10"
+OTHER_QUERY: str = "status=INACTIVE"
+CASTERS: dict = {"str": cast_as_str}
+
+
+class TestMoQLCache:
+    def test_compiled_query_matches_moql(self):
+        expected: dict = MoQL(QUERY).mongo_query
+        actual: dict = MoQLCache().compile(QUERY).mongo_query
+        assert expected == actual
+
+    def test_hit_and_miss_counters(self):
+        cache: MoQLCache = MoQLCache()
+        cache.compile(QUERY)
+        cache.compile(QUERY)
+        cache.compile(OTHER_QUERY)
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_same_instance_is_returned_on_hit(self):
+        cache: MoQLCache = MoQLCache()
+        assert cache.compile(QUERY) is cache.compile(QUERY)
+
+    def test_blacklist_is_part_of_the_key(self):
+        cache: MoQLCache = MoQLCache()
+        cache.compile(QUERY)
+        actual: dict = cache.compile(
+            QUERY, blacklist=("status",)
+        ).mongo_query
+        assert "status" not in actual["filter"]
+
+    def test_casters_are_part_of_the_key(self):
+        cache: MoQLCache = MoQLCache()
+        cache.compile("code=str(10)")
+        actual: dict = cache.compile(
+            "code=str(10)", casters=CASTERS
+        ).mongo_query
+        assert actual["filter"] == {"code": "10"}
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache: MoQLCache = MoQLCache(maxsize=2)
+        cache.compile(QUERY)
+        cache.compile(OTHER_QUERY)
+        cache.compile(QUERY)
+        cache.compile("limit=5")
+        cache.compile(QUERY)
+        cache.compile(OTHER_QUERY)
+        assert len(cache) == 2 and cache.misses == 4
+
+    def test_clear(self):
+        cache: MoQLCache = MoQLCache()
+        cache.compile(QUERY)
+        cache.clear()
+        assert cache.info == {
+            "hits": 0,
+            "misses": 0,
+            "maxsize": cache.maxsize,
+            "currsize": 0,
+        }
+
+    def test_concurrent_compilation(self):
+        cache: MoQLCache = MoQLCache()
+        threads: list[threading.Thread] = [
+            threading.Thread(target=cache.compile, args=(QUERY,))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(cache) == 1 and cache.hits + cache.misses == 8
+
+    def test_module_level_function_uses_given_cache(self):
+        cache: MoQLCache = MoQLCache()
+        compile_moql(QUERY, cache=cache)
+        assert cache.misses == 1
+
+
+class TestCompiledMoQL:
+    def test_is_immutable(self):
+        compiled: CompiledMoQL = MoQLCache().compile(QUERY)
+        with pytest.raises(AttributeError):
+            compiled.moql = OTHER_QUERY
+
+    def test_frozen_query_cannot_be_modified(self):
+        compiled: CompiledMoQL = MoQLCache().compile(QUERY)
+        with pytest.raises(TypeError):
+            compiled.query["filter"]["status"] = "INACTIVE"
+
+    def test_mongo_query_returns_independent_copies(self):
+        compiled: CompiledMoQL = MoQLCache().compile(QUERY)
+        compiled.mongo_query["filter"]["status"] = "INACTIVE"
+        compiled.mongo_query["sort"].append(("score", 1))
+        assert compiled.mongo_query == MoQL(QUERY).mongo_query
+
+    def test_thawed_types_match_moql_output(self):
+        actual: dict = (
+            MoQLCache().compile("status=A,B&sort=-x").mongo_query
+        )
+        assert isinstance(actual["filter"]["status"]["$in"], list) and (
+            actual["sort"] == [("x", -1)]
+        )
@@ -1,6 +1,8 @@
 import datetime
 
-from moapi.moql.date_parser import parse_date
+from dateparser import parse
+
+from moapi.moql.date_parser import parse_date, parse_iso_date
 
 
 class TestParseDate:
@@ -31,3 +33,82 @@ class TestParseDate:
         )
         actual: datetime.datetime = parse_date("2023/11/10 23:30:40")
         assert expected == actual
+
+    def test_date_conversion_with_iso_separator(self):
+        expected: datetime.datetime = datetime.datetime(
+            day=10, month=11, year=2023, hour=23, minute=30
+        )
+        actual: datetime.datetime = parse_date("2023-11-10T23:30")
+        assert expected == actual
+
+    def test_date_conversion_with_utc_designator(self):
+        expected: datetime.datetime = datetime.datetime(
+            day=10,
+            month=11,
+            year=2023,
+            hour=23,
+            minute=30,
+            second=40,
+            tzinfo=datetime.timezone.utc,
+        )
+        actual: datetime.datetime = parse_date("2023-11-10T23:30:40Z")
+        assert expected == actual
+
+    def test_date_conversion_with_offset(self):
+        expected: datetime.datetime = datetime.datetime(
+            day=10,
+            month=11,
+            year=2023,
+            hour=21,
+            minute=30,
+            tzinfo=datetime.timezone.utc,
+        )
+        actual: datetime.datetime = parse_date("2023-11-10T23:30+02:00")
+        assert expected == actual
+
+    def test_invalid_date_is_returned_as_is(self):
+        expected: str = "2023-02-30"
+        actual = parse_date("2023-02-30")
+        assert expected == actual
+
+
+class TestParseIsoDate:
+    def test_fraction_is_truncated_to_microseconds(self):
+        expected: datetime.datetime = datetime.datetime(
+            2023, 11, 10, 23, 30, 40, 123456
+        )
+        actual = parse_iso_date("2023-11-10 23:30:40.123456789")
+        assert expected == actual
+
+    def test_short_fraction(self):
+        expected: datetime.datetime = datetime.datetime(
+            2023, 11, 10, 23, 30, 40, 120000
+        )
+        actual = parse_iso_date("2023-11-10T23:30:40.12")
+        assert expected == actual
+
+    def test_ambiguous_date_is_not_parsed(self):
+        assert parse_iso_date("2023-11") is None
+
+    def test_non_iso_date_is_not_parsed(self):
+        assert parse_iso_date("2023/11/10") is None
+
+    def test_impossible_date_is_not_parsed(self):
+        assert parse_iso_date("2023-02-30") is None
+
+    def test_matches_dateparser_on_iso_dates(self):
+        for value in [
+            "2023-11-10",
+            "2023-11-10 23:30:40",
+            "2023-11-10T23:30:40.5",
+            "2023-11-10T23:30:40+05:30",
+        ]:
+            assert parse_iso_date(value) == parse(value, languages=["en"])
+
+
+class TestParseDateMemo:
+    def test_repeated_literals_are_memoized(self):
+        parse_date.cache_clear()
+        parse_date("2023-11-10")
+        parse_date("2023-11-10")
+        assert parse_date.cache_info().hits == 1
@@ -0,0 +1,128 @@
+from moapi.moql.core import MoQL
+from moapi.moql.lexer import (
+    MoQLToken,
+    split_parameters,
+    tokenize,
+    tokenize_parameter,
+    tokenize_segment,
+)
+from tests.moql.core.shared_constants import (
+    INPUT_HQL_URL_ENCODED,
+    INPUT_HQL_NOT_ENCODED,
+    EXPECTED_PARAMETER_LIST,
+)
+
+
+class TestTokenizeParameter:
+    def test_equals(self):
+        expected: MoQLToken = MoQLToken("key=value", "key", "=", "value")
+        actual: MoQLToken = tokenize_parameter("key=value")
+        assert expected == actual
+
+    def test_two_character_operator_wins(self):
+        expected: MoQLToken = MoQLToken("score>=5", "score", ">=", "5")
+        actual: MoQLToken = tokenize_parameter("score>=5")
+        assert expected == actual
+
+    def test_first_operator_is_used(self):
+        expected: MoQLToken = MoQLToken("a<b>c", "a", "<", "b>c")
+        actual: MoQLToken = tokenize_parameter("a<b>c")
+        assert expected == actual
+
+    def test_not_operator(self):
+        expected: MoQLToken = MoQLToken("!field", "", "!", "field")
+        actual: MoQLToken = tokenize_parameter("!field")
+        assert expected == actual
+
+    def test_without_operator(self):
+        expected: MoQLToken = MoQLToken("field", "", "", "field")
+        actual: MoQLToken = tokenize_parameter("field")
+        assert expected == actual
+
+    def test_repeated_operator(self):
+        expected: MoQLToken = MoQLToken(
+            "tags==CR", "tags", "=", "=CR", True
+        )
+        actual: MoQLToken = tokenize_parameter("tags==CR")
+        assert expected == actual
+
+
+class TestTokenizeSegment:
+    def test_encoded_equals_in_value(self):
+        expected: MoQLToken = MoQLToken("name=a=b", "name", "=", "a=b")
+        actual: MoQLToken = tokenize_segment("name=a%3Db")
+        assert expected == actual
+
+    def test_encoded_operator_is_found(self):
+        expected: MoQLToken = MoQLToken("score>=5", "score", ">=", "5")
+        actual: MoQLToken = tokenize_segment("score%3E%3D5")
+        assert expected == actual
+
+    def test_key_and_value_are_decoded_separately(self):
+        expected: MoQLToken = MoQLToken("my key<a<b", "my key", "<", "a<b")
+        actual: MoQLToken = tokenize_segment("my%20key<a%3Cb")
+        assert expected == actual
+
+    def test_unencoded_repeated_operator(self):
+        actual: MoQLToken = tokenize_segment("tags==C%52")
+        assert actual.repeated_operator
+
+
+class TestTokenize:
+    def test_encoded_and_plain_queries_produce_same_tokens(self):
+        assert tokenize(INPUT_HQL_URL_ENCODED) == tokenize(
+            INPUT_HQL_NOT_ENCODED
+        )
+
+    def test_parameters_are_preserved(self):
+        expected: list[str] = EXPECTED_PARAMETER_LIST
+        actual: list[str] = [
+            token.parameter for token in tokenize(INPUT_HQL_URL_ENCODED)
+        ]
+        assert expected == actual
+
+    def test_empty_parameters_are_skipped(self):
+        expected: list[MoQLToken] = [MoQLToken("a=1", "a", "=", "1")]
+        actual: list[MoQLToken] = tokenize("&a=1&&")
+        assert expected == actual
+
+    def test_encoded_separator_is_kept_in_value(self):
+        expected: MoQLToken = MoQLToken(
+            "name=Tom&Jerry", "name", "=", "Tom&Jerry"
+        )
+        actual: MoQLToken = tokenize("name=Tom%26Jerry&limit=5")[0]
+        assert expected == actual
+
+    def test_split_parameters_decodes_each_segment(self):
+        expected: list[str] = ["a>=1", "b=x&y"]
+        actual: list[str] = split_parameters("a%3E=1&b=x%26y")
+        assert expected == actual
+
+
+class TestMoQLWithEncodedValues:
+    def test_encoded_separator_in_filter_value(self):
+        expected: dict = {"name": "Tom&Jerry"}
+        actual: dict = MoQL("name=Tom%26Jerry&limit=5").mongo_query[
+            "filter"
+        ]
+        assert expected == actual
+
+    def test_encoded_equals_in_value(self):
+        expected: dict = {"name": "a=b"}
+        actual: dict = MoQL("name=a%3Db").mongo_query["filter"]
+        assert expected == actual
+
+    def test_encoded_less_than_in_value(self):
+        expected: dict = {"name": {"$lt": "a<b"}}
+        actual: dict = MoQL("name<a%3Cb").mongo_query["filter"]
+        assert expected == actual
+
+    def test_encoded_exclamation_mark_in_value(self):
+        expected: dict = {"name": {"$ne": "a!=b"}}
+        actual: dict = MoQL("name!=a%21%3Db").mongo_query["filter"]
+        assert expected == actual
+
+    def test_value_with_operator_character(self):
+        expected: dict = {"a": {"$lt": "b>c"}}
+        actual: dict = MoQL("a<b>c").mongo_query["filter"]
+        assert expected == actual
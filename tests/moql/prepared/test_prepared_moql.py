@@ -0,0 +1,224 @@
+import datetime
+import threading
+
+import pytest
+from bson import ObjectId
+
+from moapi.moql.cache import CompiledMoQL
+from moapi.moql.casters import cast_as_object_id
+from moapi.moql.core import MoQL
+from moapi.moql.errors import ListOperatorError, PreparedMoQLError
+from moapi.moql.prepared import PreparedMoQL
+
+TEMPLATE: str = "status={status}&created>={since}&sort=-created&limit=50"
+SINCE: datetime.datetime = datetime.datetime(2024, 1, 1)
+OBJECT_ID_VALUE: str = "6502104e8fb95f068e3a4635"
+
+
+class TestPreparedMoQL:
+    def test_prepare_returns_prepared_moql(self):
+        actual: PreparedMoQL = MoQL.prepare(TEMPLATE)
+        assert isinstance(actual, PreparedMoQL)
+        assert actual.names == frozenset({"status", "since"})
+
+    def test_bind_typed_values(self):
+        expected: dict = {
+            "filter": {"status": "ACTIVE", "created": {"$gte": SINCE}},
+            "sort": [("created", -1)],
+            "skip": 0,
+            "limit": 50,
+            "projection": None,
+        }
+        actual: dict = (
+            MoQL.prepare(TEMPLATE)
+            .bind(status="ACTIVE", since=SINCE)
+            .mongo_query
+        )
+        assert expected == actual
+
+    def test_bound_query_matches_moql(self):
+        expected: dict = MoQL(
+            "status=ACTIVE&created>=2024-01-01&sort=-created&limit=50"
+        ).mongo_query
+        actual: dict = (
+            MoQL.prepare(TEMPLATE)
+            .bind(status="ACTIVE", since="2024-01-01")
+            .mongo_query
+        )
+        assert expected == actual
+
+    def test_bind_returns_compiled_moql(self):
+        actual: CompiledMoQL = MoQL.prepare(TEMPLATE).bind(
+            status="ACTIVE", since=SINCE
+        )
+        assert isinstance(actual, CompiledMoQL)
+        assert actual.moql == TEMPLATE
+
+    def test_string_values_are_cast(self):
+        actual: dict = MoQL.prepare("score>{score}").bind(score="5")
+        assert actual.mongo_query["filter"] == {"score": {"$gt": 5}}
+
+    def test_bound_strings_skip_casters(self):
+        value: str = f"object_id({OBJECT_ID_VALUE})"
+        actual: dict = (
+            MoQL.prepare(
+                "_id={id}", casters={"object_id": cast_as_object_id}
+            )
+            .bind(id=value)
+            .mongo_query
+        )
+        assert actual["filter"] == {"_id": value}
+
+    def test_casters_apply_within_values(self):
+        actual: dict = (
+            MoQL.prepare(
+                "_id=object_id({id})",
+                casters={"object_id": cast_as_object_id},
+            )
+            .bind(id=OBJECT_ID_VALUE)
+            .mongo_query
+        )
+        assert actual["filter"] == {"_id": ObjectId(OBJECT_ID_VALUE)}
+
+    @pytest.mark.parametrize("value", ["a,b", "/^a/i", "null,x"])
+    def test_bound_strings_cannot_add_operators(self, value):
+        actual: dict = MoQL.prepare("name={name}").bind(name=value)
+        assert actual.mongo_query["filter"] == {"name": value}
+
+    def test_list_items_are_literals(self):
+        actual: dict = MoQL.prepare("tag={tags}").bind(tags=["a,b", "/a/"])
+        assert actual.mongo_query["filter"] == {
+            "tag": {"$in": ["a,b", "/a/"]}
+        }
+
+    @pytest.mark.parametrize(
+        "template, value",
+        [
+            ("name={name}", {"$ne": None}),
+            ("name={name}", [{"$gt": ""}]),
+            ("name=str({name})", {"$ne": None}),
+        ],
+    )
+    def test_mappings_are_rejected(self, template, value):
+        with pytest.raises(PreparedMoQLError):
+            MoQL.prepare(template, casters={"str": str}).bind(name=value)
+
+    def test_typed_values_are_not_cast(self):
+        actual: dict = (
+            MoQL.prepare("code={code}").bind(code=10).mongo_query
+        )
+        assert actual["filter"] == {"code": 10}
+
+    def test_values_cannot_add_parameters(self):
+        actual: dict = (
+            MoQL.prepare("status={status}&limit=5")
+            .bind(status="x&limit=1000%26skip=1")
+            .mongo_query
+        )
+        assert actual["filter"] == {"status": "x&limit=1000%26skip=1"}
+        assert (actual["limit"], actual["skip"]) == (5, 0)
+
+    @pytest.mark.parametrize(
+        "operator, values, expected",
+        [
+            ("=", ["a", "1"], {"tag": {"$in": ["a", 1]}}),
+            ("!=", ("a", 2), {"tag": {"$nin": ["a", 2]}}),
+        ],
+    )
+    def test_sequences_become_list_operators(
+        self, operator, values, expected
+    ):
+        actual: dict = (
+            MoQL.prepare(f"tag{operator}{{tags}}").bind(tags=values)
+        ).mongo_query
+        assert expected == actual["filter"]
+
+    def test_sequences_with_invalid_operator(self):
+        with pytest.raises(ListOperatorError):
+            MoQL.prepare("tag>{tags}").bind(tags=["a"])
+
+    def test_filters_on_the_same_field_are_merged(self):
+        actual: dict = (
+            MoQL.prepare("score>{low}&score<10").bind(low=1).mongo_query
+        )
+        assert actual["filter"] == {"score": {"$gt": 1, "$lt": 10}}
+
+    def test_partially_templated_values(self):
+        actual: dict = (
+            MoQL.prepare("name=str({name})", casters={"str": str})
+            .bind(name="10")
+            .mongo_query
+        )
+        assert actual["filter"] == {"name": "10"}
+
+    def test_reserved_parameters_can_be_bound(self):
+        actual: dict = (
+            MoQL.prepare("sort={order}&limit={limit}&skip={skip}")
+            .bind(order=["-created", "name"], limit=20, skip=40)
+            .mongo_query
+        )
+        assert actual["sort"] == [("created", -1), ("name", 1)]
+        assert (actual["limit"], actual["skip"]) == (20, 40)
+
+    def test_blacklisted_parameters_are_ignored(self):
+        prepared: PreparedMoQL = PreparedMoQL(
+            "status={status}&secret={secret}", blacklist=("secret",)
+        )
+        actual: dict = prepared.bind(status="ACTIVE").mongo_query
+        assert prepared.names == frozenset({"status"})
+        assert actual["filter"] == {"status": "ACTIVE"}
+
+    @pytest.mark.parametrize(
+        "template", ["{field}=1", "{flag}", "!{flag}"]
+    )
+    def test_placeholders_outside_values_are_rejected(self, template):
+        with pytest.raises(PreparedMoQLError):
+            MoQL.prepare(template)
+
+    def test_missing_values(self):
+        with pytest.raises(PreparedMoQLError):
+            MoQL.prepare(TEMPLATE).bind(status="ACTIVE")
+
+    def test_unknown_values(self):
+        with pytest.raises(PreparedMoQLError):
+            MoQL.prepare(TEMPLATE).bind(
+                status="ACTIVE", since=SINCE, other=1
+            )
+
+    def test_bindings_do_not_alter_each_other(self):
+        prepared: PreparedMoQL = MoQL.prepare("tag=a,b&status={status}")
+        first: dict = prepared.bind(status="A").mongo_query
+        first["filter"]["tag"]["$in"].append("c")
+        actual: dict = prepared.bind(status="B").mongo_query
+        assert actual["filter"] == {
+            "tag": {"$in": ["a", "b"]},
+            "status": "B",
+        }
+
+    def test_bound_values_are_frozen(self):
+        tags: list[str] = ["a"]
+        bound: CompiledMoQL = MoQL.prepare("tag={tags}").bind(tags=tags)
+        tags.append("b")
+        assert bound.mongo_query["filter"] == {"tag": {"$in": ["a"]}}
+
+    def test_bind_from_several_threads(self):
+        prepared: PreparedMoQL = MoQL.prepare(TEMPLATE)
+        errors: list[int] = []
+
+        def bind(index: int):
+            for _ in range(200):
+                query: dict = prepared.bind(
+                    status=f"S{index}", since=SINCE
+                ).mongo_query
+                if query["filter"]["status"] != f"S{index}":
+                    errors.append(index)
+
+        threads: list[threading.Thread] = [
+            threading.Thread(target=bind, args=(index,))
+            for index in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
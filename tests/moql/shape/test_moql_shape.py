@@ -0,0 +1,33 @@
+from moapi.moql.shape import moql_shape
+
+
+class TestMoQLShape:
+    def test_values_are_replaced(self):
+        expected: str = "a=?&b>?"
+        actual: str = moql_shape("a=x&b>5")
+        assert expected == actual
+
+    def test_queries_with_different_values_share_the_shape(self):
+        expected: str = moql_shape("a=1&b=list(1,2)&limit=10&skip=20")
+        actual: str = moql_shape("a=2&b=list(3)&limit=5&skip=0")
+        assert expected == actual
+
+    def test_parameter_order_is_ignored(self):
+        expected: str = moql_shape("a=1&b<2")
+        actual: str = moql_shape("b<3&a=4")
+        assert expected == actual
+
+    def test_sort_and_fields_are_kept(self):
+        expected: str = "a=?&fields=a,b&sort=-a"
+        actual: str = moql_shape("sort=-a&fields=a,b&a=1")
+        assert expected == actual
+
+    def test_flags_are_kept(self):
+        expected: str = "!deleted&active"
+        actual: str = moql_shape("active&!deleted")
+        assert expected == actual
+
+    def test_text_search_is_replaced(self):
+        expected: str = "$text=?"
+        actual: str = moql_shape("$text=hello")
+        assert expected == actual
@@ -0,0 +1,298 @@
+import asyncio
+from typing import Any, Optional
+
+import mongomock
+from bson import ObjectId
+
+from tests.odm.helpers import (
+    get_connection_parameters,
+    DummyModel,
+    get_dummy_model_data,
+    get_dummy_model,
+    DUMMY_MODEL_ID,
+    generate_list_of_models,
+    DUMMY_MODEL_TITLE_UPDATED,
+)
+from moapi.mocks.connection.async_mongo_mock import (
+    AsyncMongoMockCollection,
+    AsyncMongoMockDatabase,
+)
+from moapi.mocks.connection.mongo_parameters import MongoDBParametersMock
+from moapi.odm.async_entity_service import AsyncEntityService
+from moapi.odm.client_registry import MongoClientRegistry
+
+COLLECTION_NAME: str = "dummies"
+OBJECT_ID_VALUE: str = "6502104e8fb95f068e3a4635"
+MODEL_ID_KEY: str = "id"
+
+
+class AsyncDummyModelService(AsyncEntityService[DummyModel]):
+    def __init__(self):
+        super().__init__(COLLECTION_NAME, get_connection_parameters())
+
+
+class LoopBoundClient:
+    """
+    Fake motor client: like motor, it is bound to the event loop it
+    is first used on and fails when used from another one. Every
+    client reads and writes the same in-memory database.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def check_loop(self):
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif self.loop is not loop:
+            raise RuntimeError("attached to a different loop")
+
+    def __getitem__(self, database_name: str) -> "LoopBoundDatabase":
+        return LoopBoundDatabase(self)
+
+    def close(self):
+        pass
+
+
+class LoopBoundDatabase:
+    def __init__(self, client: LoopBoundClient):
+        self.client = client
+
+    def __getitem__(self, collection_name: str) -> "LoopBoundCollection":
+        return LoopBoundCollection(
+            self.client,
+            AsyncMongoMockDatabase(self.client.database)[collection_name],
+        )
+
+
+class LoopBoundCollection:
+    def __init__(
+        self, client: LoopBoundClient, collection: AsyncMongoMockCollection
+    ):
+        self.client = client
+        self.collection = collection
+
+    def __getattr__(self, name: str) -> Any:
+        self.client.check_loop()
+        return getattr(self.collection, name)
+
+
+class LoopBoundParameters(MongoDBParametersMock):
+    def __init__(self):
+        super().__init__()
+        database = mongomock.MongoClient().db
+        self.registry: MongoClientRegistry = MongoClientRegistry(
+            client_factory=lambda *args, **kwargs: LoopBoundClient(
+                database
+            ),
+            per_event_loop=True,
+        )
+
+    @property
+    def async_db(self) -> LoopBoundDatabase:
+        return self.registry.get(self.connection_with_prefix)[self.db_name]
+
+
+class LoopBoundDummyModelService(AsyncEntityService[DummyModel]):
+    def __init__(self):
+        super().__init__(COLLECTION_NAME, LoopBoundParameters())
+
+
+async def get_populated_service() -> AsyncDummyModelService:
+    service: AsyncDummyModelService = AsyncDummyModelService()
+    await service.add_many_typed(generate_list_of_models())
+    return service
+
+
+async def collect(async_iterator) -> list:
+    return [item async for item in async_iterator]
+
+
+class TestAsyncAddOne:
+    def test_adding_single_model_id(self):
+        expected: str = OBJECT_ID_VALUE
+        actual: str = asyncio.run(
+            AsyncDummyModelService().add_one_typed(get_dummy_model())
+        )
+        assert expected == actual
+
+    def test_adding_single_plain_dictionary_data_as_document(self):
+        async def scenario():
+            service: AsyncDummyModelService = AsyncDummyModelService()
+            await service.add_one(model_data=get_dummy_model_data())
+            return (await service.get({}))[0]
+
+        assert get_dummy_model_data() == asyncio.run(scenario())
+
+
+class TestAsyncEventLoops:
+    def test_service_can_be_used_from_several_event_loops(self):
+        service: LoopBoundDummyModelService = LoopBoundDummyModelService()
+        asyncio.run(service.add_many_typed(generate_list_of_models()))
+        actual: list[dict] = asyncio.run(service.get(query={}))
+        assert len(actual) == 10
+
+
+class TestAsyncAddManyTyped:
+    def test_models_without_mongo_id_get_generated_ids(self):
+        async def scenario():
+            service: AsyncDummyModelService = AsyncDummyModelService()
+            await service.add_many_typed(
+                [
+                    DummyModel(id=f"{DUMMY_MODEL_ID}-{index}", title="t")
+                    for index in range(2)
+                ]
+            )
+            return await service.get({})
+
+        actual: list[dict] = asyncio.run(scenario())
+        assert len(actual) == 2 and all(
+            isinstance(document["_id"], ObjectId) for document in actual
+        )
+
+
+class TestAsyncGet:
+    def test_returns_correct_number_of_docs_based_on_query(self):
+        async def scenario():
+            service = await get_populated_service()
+            return await service.get(query={})
+
+        assert len(asyncio.run(scenario())) == 10
+
+    def test_returns_correct_number_of_docs_based_on_skip_and_limit(self):
+        async def scenario():
+            service = await get_populated_service()
+            return await service.get(query={}, skip=2, limit=5)
+
+        assert len(asyncio.run(scenario())) == 5
+
+    def test_get_typed_returns_models(self):
+        async def scenario():
+            service = await get_populated_service()
+            return await service.get_typed(query={})
+
+        actual: list[DummyModel] = list(asyncio.run(scenario()))
+        assert len(actual) == 10 and all(
+            isinstance(model, DummyModel) for model in actual
+        )
+
+
+class TestAsyncIter:
+    def test_iter_yields_all_documents(self):
+        async def scenario():
+            service = await get_populated_service()
+            return await collect(service.iter(query={}, batch_size=3))
+
+        assert len(asyncio.run(scenario())) == 10
+
+    def test_iter_typed_yields_models(self):
+        async def scenario():
+            service = await get_populated_service()
+            return await collect(service.iter_typed(query={}, limit=4))
+
+        actual: list[DummyModel] = asyncio.run(scenario())
+        assert len(actual) == 4 and all(
+            isinstance(model, DummyModel) for model in actual
+        )
+
+
+class TestAsyncGetOne:
+    def test_typed_get_one(self):
+        async def scenario():
+            service: AsyncDummyModelService = AsyncDummyModelService()
+            await service.add_one_typed(get_dummy_model())
+            return await service.get_one_typed(
+                identifier_key=MODEL_ID_KEY,
+                identifier_value=DUMMY_MODEL_ID,
+            )
+
+        actual: Optional[DummyModel] = asyncio.run(scenario())
+        assert isinstance(actual, DummyModel)
+
+    def test_typed_get_one_when_missing(self):
+        actual: Optional[DummyModel] = asyncio.run(
+            AsyncDummyModelService().get_one_typed(
+                identifier_key=MODEL_ID_KEY,
+                identifier_value=DUMMY_MODEL_ID,
+            )
+        )
+        assert actual is None
+
+
+class TestAsyncUpdateAndDelete:
+    def test_update_one_typed(self):
+        async def scenario():
+            service: AsyncDummyModelService = AsyncDummyModelService()
+            await service.add_one_typed(get_dummy_model())
+            model: DummyModel = await service.get_one_typed(
+                identifier_key=MODEL_ID_KEY,
+                identifier_value=DUMMY_MODEL_ID,
+            )
+            model.title = DUMMY_MODEL_TITLE_UPDATED
+            await service.update_one_typed(model)
+            return (await service.get({}))[0]["title"]
+
+        assert asyncio.run(scenario()) == DUMMY_MODEL_TITLE_UPDATED
+
+    def test_unchanged_tracked_model_reports_the_match(self):
+        async def scenario():
+            service: AsyncDummyModelService = AsyncDummyModelService()
+            await service.add_one_typed(get_dummy_model())
+            model: DummyModel = await service.get_one_typed(
+                identifier_key=MODEL_ID_KEY,
+                identifier_value=DUMMY_MODEL_ID,
+                track=True,
+            )
+            return await service.update_one_typed(model)
+
+        result = asyncio.run(scenario())
+        assert (result.matched_count, result.modified_count) == (1, 0)
+
+    def test_delete_one(self):
+        async def scenario():
+            service: AsyncDummyModelService = AsyncDummyModelService()
+            await service.add_one_typed(get_dummy_model())
+            await service.delete_one({MODEL_ID_KEY: DUMMY_MODEL_ID})
+            return await service.get({})
+
+        assert asyncio.run(scenario()) == []
+
+    def test_push_one(self):
+        new_item: dict = {"id": 1}
+
+        async def scenario():
+            service: AsyncDummyModelService = AsyncDummyModelService()
+            dummy_data: dict = get_dummy_model_data()
+            dummy_data["array"] = []
+            await service.add_one(dummy_data)
+            await service.push_one(
+                match_key=MODEL_ID_KEY,
+                match_key_value=DUMMY_MODEL_ID,
+                match_array="array",
+                new_value=new_item,
+            )
+            return await service.get_by_moql(
+                f"{MODEL_ID_KEY}={DUMMY_MODEL_ID}"
+            )
+
+        assert asyncio.run(scenario())[0]["array"] == [new_item]
+
+
+class TestAsyncGetByMoql:
+    def test_by_moql_with_simple_filter(self):
+        async def scenario():
+            service = await get_populated_service()
+            return await service.get_by_moql(
+                moql="_id=6509f10e4314386ae084b3c1"
+            )
+
+        assert len(asyncio.run(scenario())) == 1
+
+    def test_iter_by_moql(self):
+        async def scenario():
+            service = await get_populated_service()
+            return await collect(service.iter_by_moql("limit=3"))
+
+        assert len(asyncio.run(scenario())) == 3
@@ -0,0 +1,74 @@
+import bson
+
+from moapi.odm.batching import chunked, chunked_by_size, bson_size
+
+
+class TestChunked:
+    def test_last_chunk_holds_remaining_items(self):
+        expected: list[list[int]] = [[0, 1, 2], [3, 4, 5], [6]]
+        actual: list[list[int]] = list(chunked(range(7), 3))
+        assert expected == actual
+
+    def test_empty_iterable(self):
+        assert list(chunked([], 3)) == []
+
+    def test_consumes_generators_lazily(self):
+        consumed: list[int] = []
+
+        def generate():
+            for item in range(10):
+                consumed.append(item)
+                yield item
+
+        next(chunked(generate(), 4))
+        assert consumed == [0, 1, 2, 3]
+
+
+class TestChunkedBySize:
+    def test_bounded_by_count(self):
+        expected: list[list[int]] = [[1, 1], [1, 1], [1]]
+        actual: list[list[int]] = list(
+            chunked_by_size(
+                [1] * 5, max_count=2, max_bytes=100, size_of=int
+            )
+        )
+        assert expected == actual
+
+    def test_bounded_by_bytes(self):
+        expected: list[list[int]] = [[4, 4], [4, 3], [9]]
+        actual: list[list[int]] = list(
+            chunked_by_size(
+                [4, 4, 4, 3, 9], max_count=10, max_bytes=8, size_of=int
+            )
+        )
+        assert expected == actual
+
+    def test_sampled_sizes(self):
+        measured: list[int] = []
+
+        def size_of(item: int) -> int:
+            measured.append(item)
+            return item
+
+        expected: list[list[int]] = [[4, 1], [4, 9], [9]]
+        actual: list[list[int]] = list(
+            chunked_by_size(
+                [4, 1, 4, 9, 9],
+                max_count=10,
+                max_bytes=8,
+                size_of=size_of,
+                sample_interval=2,
+            )
+        )
+        assert expected == actual and measured == [4, 4, 9]
+
+
+class TestBsonSize:
+    def test_document_size(self):
+        assert bson_size({"a": 1}) == len(bson.encode({"a": 1}))
+
+    def test_pipeline_size(self):
+        assert bson_size([{"a": 1}, {"b": 1}]) == 2 * bson_size({"a": 1})
+
+    def test_non_document(self):
+        assert bson_size(None) == 0
@@ -0,0 +1,106 @@
+import pytest
+from pymongo import InsertOne, ReplaceOne, UpdateOne
+
+from moapi.odm.bulk import (
+    BulkWriteSummary,
+    insert_operation,
+    replace_operation,
+    sized_batches,
+    upsert_operation,
+)
+from moapi.odm.batching import bson_size
+
+DOCUMENT: dict = {"_id": "6502104e8fb95f068e3a4635", "id": "a", "n": 1}
+NEW_DOCUMENT: dict = {"_id": None, "id": "b", "n": 2}
+
+
+class TestOperations:
+    def test_insert(self):
+        assert insert_operation(DOCUMENT) == InsertOne(DOCUMENT)
+
+    def test_replace_by_id(self):
+        expected: ReplaceOne = ReplaceOne(
+            {"_id": DOCUMENT["_id"]}, {"id": "a", "n": 1}, upsert=True
+        )
+        assert replace_operation(DOCUMENT) == expected
+
+    def test_upsert_by_id(self):
+        expected: UpdateOne = UpdateOne(
+            {"_id": DOCUMENT["_id"]},
+            {"$set": {"id": "a", "n": 1}},
+            upsert=True,
+        )
+        assert upsert_operation(DOCUMENT) == expected
+
+    def test_upsert_by_other_key_sets_id_on_insert(self):
+        expected: UpdateOne = UpdateOne(
+            {"id": "a"},
+            {
+                "$set": {"id": "a", "n": 1},
+                "$setOnInsert": {"_id": DOCUMENT["_id"]},
+            },
+            upsert=True,
+        )
+        assert upsert_operation(DOCUMENT, identifier_key="id") == expected
+
+    def test_insert_leaves_null_id_out(self):
+        expected: InsertOne = InsertOne({"id": "b", "n": 2})
+        assert insert_operation(NEW_DOCUMENT) == expected
+
+    def test_replace_without_identifier_inserts(self):
+        expected: InsertOne = InsertOne({"id": "b", "n": 2})
+        assert replace_operation(NEW_DOCUMENT) == expected
+
+    def test_replace_without_identifier_nor_upsert(self):
+        with pytest.raises(ValueError):
+            replace_operation(NEW_DOCUMENT, upsert=False)
+
+    @pytest.mark.parametrize("identifier_key", ["_id", "code"])
+    def test_upsert_without_identifier_inserts(self, identifier_key):
+        expected: InsertOne = InsertOne({"id": "b", "n": 2})
+        actual = upsert_operation(
+            NEW_DOCUMENT, identifier_key=identifier_key
+        )
+        assert expected == actual
+
+    def test_sized_batches_use_document_sizes(self):
+        document_size: int = bson_size(DOCUMENT)
+        operations: list[tuple] = [
+            (insert_operation(DOCUMENT), DOCUMENT) for _ in range(5)
+        ]
+        actual: list[int] = [
+            len(batch)
+            for batch in sized_batches(
+                operations, max_count=10, max_bytes=2 * document_size
+            )
+        ]
+        assert actual == [2, 2, 1]
+
+
+class TestBulkWriteSummary:
+    def test_details_are_accumulated_with_offsets(self):
+        summary: BulkWriteSummary = BulkWriteSummary()
+        summary.add_details(
+            {"nInserted": 2, "upserted": [{"index": 1, "_id": "x"}]},
+            offset=0,
+        )
+        summary.add_details(
+            {
+                "nMatched": 1,
+                "nModified": 1,
+                "writeErrors": [{"index": 0, "code": 11000}],
+            },
+            offset=10,
+        )
+        assert (
+            summary.inserted_count,
+            summary.modified_count,
+            summary.upserted_ids,
+            summary.error_for(10)["code"],
+            summary.batches,
+        ) == (2, 1, {1: "x"}, 11000, 2)
+
+    def test_without_errors(self):
+        summary: BulkWriteSummary = BulkWriteSummary()
+        summary.add_details({"nInserted": 1}, offset=0)
+        assert not summary.has_errors and summary.error_for(0) is None
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import threading
+
+import mongomock
+
+from moapi.odm.client_registry import (
+    MongoClientRegistry,
+    get_client,
+    close_clients,
+    options_key,
+)
+
+CONNECTION_STRING: str = "mongodb://mongo.example.com:27017/sample"
+OTHER_CONNECTION_STRING: str = "mongodb://other.example.com:27017/sample"
+
+
+class CountingClientFactory:
+    def __init__(self):
+        self.created: int = 0
+        self.closed: int = 0
+
+    def __call__(self, connection_string: str, **options):
+        self.created += 1
+        client = mongomock.MongoClient()
+        factory = self
+
+        def close():
+            factory.closed += 1
+
+        client.close = close
+        return client
+
+
+def get_registry() -> tuple[MongoClientRegistry, CountingClientFactory]:
+    factory: CountingClientFactory = CountingClientFactory()
+    return MongoClientRegistry(client_factory=factory), factory
+
+
+class TestGetClient:
+    def test_same_client_is_returned_for_same_connection(self):
+        registry, _ = get_registry()
+        first = registry.get(CONNECTION_STRING)
+        second = registry.get(CONNECTION_STRING)
+        assert first is second
+
+    def test_client_is_created_once(self):
+        registry, factory = get_registry()
+        registry.get(CONNECTION_STRING)
+        registry.get(CONNECTION_STRING)
+        assert factory.created == 1
+
+    def test_different_connections_get_different_clients(self):
+        registry, _ = get_registry()
+        first = registry.get(CONNECTION_STRING)
+        second = registry.get(OTHER_CONNECTION_STRING)
+        assert first is not second
+
+    def test_same_options_share_a_client(self):
+        registry, factory = get_registry()
+        listener: object = object()
+        registry.get(CONNECTION_STRING, event_listeners=[listener])
+        registry.get(CONNECTION_STRING, event_listeners=[listener])
+        assert factory.created == 1
+
+    def test_different_options_get_different_clients(self):
+        registry, _ = get_registry()
+        first = registry.get(CONNECTION_STRING)
+        second = registry.get(
+            CONNECTION_STRING, event_listeners=[object()]
+        )
+        assert first is not second
+
+    def test_client_is_created_once_under_concurrency(self):
+        registry, factory = get_registry()
+        threads: list[threading.Thread] = [
+            threading.Thread(
+                target=registry.get, args=(CONNECTION_STRING,)
+            )
+            for _ in range(16)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert factory.created == 1
+
+    def test_module_level_function_uses_given_registry(self):
+        registry, _ = get_registry()
+        client = get_client(CONNECTION_STRING, registry=registry)
+        assert registry.get(CONNECTION_STRING) is client
+
+
+class TestOptionsKey:
+    def test_containers_become_sorted_tuples(self):
+        expected: tuple = (("a", (1, 2)), ("b", (("c", 3),)))
+        actual: tuple = options_key({"b": {"c": 3}, "a": [1, 2]})
+        assert expected == actual
+
+
+class TestCloseClients:
+    def test_close_removes_client(self):
+        registry, factory = get_registry()
+        registry.get(CONNECTION_STRING)
+        assert registry.close(CONNECTION_STRING)
+        assert CONNECTION_STRING not in registry and factory.closed == 1
+
+    def test_close_closes_the_clients_of_every_option(self):
+        registry, factory = get_registry()
+        registry.get(CONNECTION_STRING)
+        registry.get(CONNECTION_STRING, event_listeners=[object()])
+        assert registry.close(CONNECTION_STRING)
+        assert factory.closed == 2 and len(registry) == 0
+
+    def test_close_unknown_connection(self):
+        registry, _ = get_registry()
+        assert not registry.close(CONNECTION_STRING)
+
+    def test_close_all(self):
+        registry, factory = get_registry()
+        registry.get(CONNECTION_STRING)
+        registry.get(OTHER_CONNECTION_STRING)
+        close_clients(registry=registry)
+        assert len(registry) == 0 and factory.closed == 2
+
+    def test_new_client_is_created_after_close(self):
+        registry, factory = get_registry()
+        registry.get(CONNECTION_STRING)
+        registry.close_all()
+        registry.get(CONNECTION_STRING)
+        assert factory.created == 2
+
+
+class TestForkSafety:
+    def test_clients_are_discarded_in_child_process(self):
+        registry, factory = get_registry()
+        registry.get(CONNECTION_STRING)
+        # Simulate running in a forked child
+        registry._pid = os.getpid() + 1
+        registry.get(CONNECTION_STRING)
+        assert factory.created == 2 and factory.closed == 0
+
+
+class TestPerEventLoop:
+    def get_registry(self):
+        factory: CountingClientFactory = CountingClientFactory()
+        return (
+            MongoClientRegistry(
+                client_factory=factory, per_event_loop=True
+            ),
+            factory,
+        )
+
+    def test_same_client_within_a_loop(self):
+        registry, factory = self.get_registry()
+
+        async def get_twice():
+            return registry.get(CONNECTION_STRING), registry.get(
+                CONNECTION_STRING
+            )
+
+        first, second = asyncio.run(get_twice())
+        assert first is second and factory.created == 1
+
+    def test_each_loop_gets_its_own_client(self):
+        registry, factory = self.get_registry()
+
+        async def get():
+            return registry.get(CONNECTION_STRING)
+
+        first = asyncio.run(get())
+        second = asyncio.run(get())
+        assert first is not second and factory.created == 2
+
+    def test_clients_of_closed_loops_are_closed(self):
+        registry, factory = self.get_registry()
+
+        async def get():
+            return registry.get(CONNECTION_STRING)
+
+        asyncio.run(get())
+        asyncio.run(get())
+        assert factory.closed == 1 and len(registry) == 1
+
+    def test_close_closes_the_clients_of_every_loop(self):
+        registry, factory = self.get_registry()
+        registry.get(CONNECTION_STRING)
+
+        async def get():
+            return registry.get(CONNECTION_STRING)
+
+        asyncio.run(get())
+        assert registry.close(CONNECTION_STRING)
+        assert factory.closed == 2 and CONNECTION_STRING not in registry
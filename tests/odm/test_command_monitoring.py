@@ -0,0 +1,167 @@
+from datetime import timedelta
+
+import bson
+import pytest
+from pymongo import monitoring
+
+from moapi.odm.command_monitoring import (
+    CommandStatistics,
+    command_collection,
+    reply_rows,
+)
+
+ADDRESS: tuple = ("localhost", 27017)
+FIND_COMMAND: dict = {"find": "users", "filter": {"a": 1}}
+FIND_REPLY: dict = {
+    "cursor": {"firstBatch": [{"a": 1}, {"a": 1}], "id": 0},
+    "ok": 1,
+}
+
+
+def run_command(
+    statistics: CommandStatistics,
+    command: dict,
+    reply: dict,
+    request_id: int = 1,
+    duration: timedelta = timedelta(milliseconds=5),
+):
+    statistics.started(
+        monitoring.CommandStartedEvent(
+            command, "db", request_id, ADDRESS, request_id
+        )
+    )
+    statistics.succeeded(
+        monitoring.CommandSucceededEvent(
+            duration,
+            reply,
+            next(iter(command)),
+            request_id,
+            ADDRESS,
+            request_id,
+        )
+    )
+
+
+class TestCommandCollection:
+    def test_collection_commands(self):
+        expected: str = "users"
+        actual: str = command_collection("insert", {"insert": "users"})
+        assert expected == actual
+
+    def test_get_more_uses_the_collection_field(self):
+        expected: str = "users"
+        actual: str = command_collection(
+            "getMore", {"getMore": 123, "collection": "users"}
+        )
+        assert expected == actual
+
+    def test_database_commands(self):
+        expected: str = "$cmd"
+        actual: str = command_collection("ping", {"ping": 1})
+        assert expected == actual
+
+
+class TestReplyRows:
+    def test_cursor_batches(self):
+        expected: int = 2
+        actual: int = reply_rows(FIND_REPLY)
+        assert expected == actual
+
+    def test_affected_documents(self):
+        expected: int = 3
+        actual: int = reply_rows({"n": 3, "ok": 1})
+        assert expected == actual
+
+
+class TestCommandStatistics:
+    def test_commands_are_aggregated_per_collection(self):
+        statistics: CommandStatistics = CommandStatistics(
+            measure_bytes=True
+        )
+        run_command(statistics, FIND_COMMAND, FIND_REPLY, request_id=1)
+        run_command(statistics, FIND_COMMAND, FIND_REPLY, request_id=2)
+        entry: dict = statistics.dump()[0]
+        expected: tuple = (
+            "users",
+            "find",
+            2,
+            4,
+            0.01,
+            2 * len(bson.encode(FIND_COMMAND)),
+            2 * len(bson.encode(FIND_REPLY)),
+        )
+        actual: tuple = tuple(
+            entry[key]
+            for key in (
+                "collection",
+                "command",
+                "calls",
+                "rows",
+                "total_time",
+                "bytes_out",
+                "bytes_in",
+            )
+        )
+        assert expected == pytest.approx(actual)
+
+    def test_pool_wait_is_attributed_to_the_next_command(self):
+        statistics: CommandStatistics = CommandStatistics()
+        statistics.connection_check_out_started(
+            monitoring.ConnectionCheckOutStartedEvent(ADDRESS)
+        )
+        statistics.connection_checked_out(
+            monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, 0.2)
+        )
+        run_command(statistics, FIND_COMMAND, FIND_REPLY, request_id=1)
+        run_command(statistics, FIND_COMMAND, FIND_REPLY, request_id=2)
+        entry: dict = statistics.dump()[0]
+        expected: tuple = (0.2, 0.1, 0.2)
+        actual: tuple = (
+            entry["pool_wait_time"],
+            entry["mean_pool_wait_time"],
+            entry["max_pool_wait_time"],
+        )
+        assert expected == pytest.approx(actual)
+
+    def test_failed_commands_are_counted(self):
+        statistics: CommandStatistics = CommandStatistics()
+        statistics.started(
+            monitoring.CommandStartedEvent(
+                {"insert": "users"}, "db", 1, ADDRESS, 1
+            )
+        )
+        statistics.failed(
+            monitoring.CommandFailedEvent(
+                timedelta(milliseconds=1),
+                {"ok": 0},
+                "insert",
+                1,
+                ADDRESS,
+                1,
+            )
+        )
+        expected: tuple = (1, 1)
+        actual: tuple = tuple(
+            statistics.dump()[0][key] for key in ("calls", "errors")
+        )
+        assert expected == actual
+
+    def test_bytes_are_not_measured_by_default(self):
+        statistics: CommandStatistics = CommandStatistics()
+        run_command(statistics, FIND_COMMAND, FIND_REPLY)
+        expected: tuple = (0, 0)
+        actual: tuple = tuple(
+            statistics.dump()[0][key] for key in ("bytes_out", "bytes_in")
+        )
+        assert expected == actual
+
+    def test_checkout_failures_are_counted(self):
+        statistics: CommandStatistics = CommandStatistics()
+        statistics.connection_check_out_failed(
+            monitoring.ConnectionCheckOutFailedEvent(
+                ADDRESS, "timeout", 1.0
+            )
+        )
+        expected: int = 1
+        actual: int = statistics.checkout_failures
+        assert expected == actual
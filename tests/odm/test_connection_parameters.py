@@ -8,6 +8,7 @@ from moapi.mocks.connection.mongo_parameters import (
     MOCKED_DB_NAME,
     MOCKED_REPLICA_SET,
 )
+from moapi.odm.command_monitoring import CommandStatistics
 from moapi.odm.connection import (
     MongoDBParameters,
     MONGO_WITHOUT_REPLICA_SET,
@@ -198,3 +199,18 @@ class TestDBProperty:
         parameters = get_parameter_mock_with_tls_cluster_and_srv()
         actual: str = parameters.db.name
         assert expected == actual
+
+
+class TestEventListeners:
+    def test_no_client_options_by_default(self):
+        expected: dict = {}
+        actual: dict = get_simple_parameter_mock().client_options
+        assert expected == actual
+
+    def test_listeners_are_given_to_the_client(self):
+        statistics: CommandStatistics = CommandStatistics()
+        parameters: MongoDBParameters = get_simple_parameter_mock()
+        parameters.add_event_listener(statistics)
+        expected: dict = {"event_listeners": [statistics]}
+        actual: dict = parameters.client_options
+        assert expected == actual
@@ -1,7 +1,14 @@
-from typing import Optional, Iterable
+import json
+from typing import Any, Optional, Iterable, Iterator
 
-from bson import ObjectId
-from pymongo.results import InsertOneResult
+import bson
+import pytest
+from bson import CodecOptions, ObjectId
+from bson.raw_bson import RawBSONDocument
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.results import BulkWriteResult, InsertOneResult, UpdateResult
 
 from tests.odm.helpers import (
     get_connection_parameters,
@@ -11,12 +18,20 @@ from tests.odm.helpers import (
     DUMMY_MODEL_ID,
     generate_list_of_documents,
     generate_list_of_models,
+    DUMMY_MODEL_TITLE,
     DUMMY_MODEL_TITLE_UPDATED,
 )
 from moapi.models.core.entity import Entity
+from moapi.moql.prepared import PreparedMoQL
 from moapi.odm.entity_service import (
+    DEFAULT_PAGE_SIZE,
     EntityService,
     document_list_to_model_list,
+    document_to_model,
+    model_to_document,
+    model_to_update,
+    prepare_moql,
+    traverse_cursor_and_copy,
 )
 
 COLLECTION_NAME: str = "dummies"
@@ -109,6 +124,19 @@ class TestAddMany:
 
 
 class TestAddManyTyped:
+    def test_models_without_mongo_id_get_generated_ids(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(
+            [
+                DummyModel(id=f"{DUMMY_MODEL_ID}-{index}", title="title")
+                for index in range(2)
+            ]
+        )
+        actual: list[dict] = service.get(query={})
+        assert len(actual) == 2 and all(
+            isinstance(document["_id"], ObjectId) for document in actual
+        )
+
     def test_add_many_typed_with_valid_documents(self):
         service: DummyModelService = DummyModelService()
         service.add_many_typed(generate_list_of_models())
@@ -243,3 +271,826 @@ class TestPushOne:
         response_has_at_least_one = len(updated_data[0]["array"]) == 1
         response_contains_element = updated_data[0]["array"][0] == new_item
         assert response_has_at_least_one and response_contains_element
+
+
+class TestIter:
+    def test_returns_a_generator(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual = service.iter(query={})
+        assert isinstance(actual, Iterator)
+
+    def test_yields_all_documents(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: list[dict] = list(service.iter(query={}, batch_size=3))
+        assert len(actual) == 10
+
+    def test_skip_and_limit(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: list[dict] = list(service.iter(query={}, skip=2, limit=5))
+        assert len(actual) == 5
+
+
+class TestIterTyped:
+    def test_yields_models(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: list[DummyModel] = list(
+            service.iter_typed(query={}, batch_size=4)
+        )
+        assert len(actual) == 10 and all(
+            isinstance(model, DummyModel) for model in actual
+        )
+
+
+class TestIterByMoql:
+    def test_yields_all_documents(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: list[dict] = list(service.iter_by_moql("", batch_size=2))
+        assert len(actual) == 10
+
+    def test_with_simple_filter(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: list[dict] = list(
+            service.iter_by_moql("_id=6509f10e4314386ae084b3c1")
+        )
+        assert len(actual) == 1
+
+
+class TestGetPageByMoql:
+    def test_pages_cover_all_documents_without_overlap(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        titles: list[str] = []
+        token = None
+        while True:
+            page: dict = service.get_page_by_moql(
+                "sort=-title", token=token, page_size=3
+            )
+            titles.extend(item["title"] for item in page["items"])
+            token = page["next_token"]
+            if token is None:
+                break
+        expected: list[str] = sorted(
+            (model.title for model in generate_list_of_models()),
+            reverse=True,
+        )
+        assert expected == titles
+
+    @pytest.mark.parametrize("sort", ["+rank", "-rank"])
+    def test_pages_with_null_sort_values(self, sort):
+        service: DummyModelService = DummyModelService()
+        service.add_many(
+            [
+                (
+                    {"_id": index, "title": "x", "rank": index}
+                    if index % 2
+                    else {"_id": index, "title": "x", "rank": None}
+                )
+                for index in range(6)
+            ]
+            + [{"_id": 6, "title": "x"}]
+        )
+        ids: list[int] = []
+        token = None
+        while True:
+            page: dict = service.get_page_by_moql(
+                f"sort={sort}", token=token, page_size=2
+            )
+            ids.extend(item["_id"] for item in page["items"])
+            token = page["next_token"]
+            if token is None:
+                break
+        assert sorted(ids) == list(range(7)) and len(ids) == 7
+
+    def test_page_size_defaults_to_moql_limit(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        page: dict = service.get_page_by_moql("limit=4")
+        assert len(page["items"]) == 4 and page["next_token"]
+
+    def test_last_page_has_no_token(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        page: dict = service.get_page_by_moql("title=Model-1")
+        assert len(page["items"]) == 1 and page["next_token"] is None
+
+
+class TestGetPageWithTotalByMoql:
+    def test_returns_page_and_total(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: dict = service.get_page_with_total_by_moql(
+            "sort=-title&skip=2&limit=3"
+        )
+        assert [item["title"] for item in actual["items"]] == [
+            "Model-7",
+            "Model-6",
+            "Model-5",
+        ] and actual["total"] == 10
+
+    def test_total_is_capped(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: dict = service.get_page_with_total_by_moql(
+            "limit=2", max_count=5
+        )
+        assert actual["total"] == 5 and actual["total_capped"]
+
+    def test_total_equal_to_max_count_is_not_capped(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: dict = service.get_page_with_total_by_moql(
+            "limit=2", max_count=10
+        )
+        assert actual["total"] == 10 and not actual["total_capped"]
+
+    def test_page_size_defaults_without_limit(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many(
+            [
+                {"title": str(index)}
+                for index in range(DEFAULT_PAGE_SIZE + 1)
+            ]
+        )
+        actual: dict = service.get_page_with_total_by_moql("")
+        assert (len(actual["items"]), actual["total"]) == (
+            DEFAULT_PAGE_SIZE,
+            DEFAULT_PAGE_SIZE + 1,
+        )
+
+    def test_no_results(self):
+        service: DummyModelService = DummyModelService()
+        actual: dict = service.get_page_with_total_by_moql("title=none")
+        assert actual == {"items": [], "total": 0, "total_capped": False}
+
+
+class TestGetManyTyped:
+    def test_results_are_aligned_with_input(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        values: list[str] = [
+            f"{DUMMY_MODEL_ID}-3",
+            "missing",
+            f"{DUMMY_MODEL_ID}-1",
+            f"{DUMMY_MODEL_ID}-3",
+        ]
+        actual: list[Optional[DummyModel]] = service.get_many_typed(
+            MODEL_ID_KEY, values
+        )
+        assert [model.id if model else None for model in actual] == [
+            f"{DUMMY_MODEL_ID}-3",
+            None,
+            f"{DUMMY_MODEL_ID}-1",
+            f"{DUMMY_MODEL_ID}-3",
+        ]
+
+    def test_chunks_run_concurrently(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        values: list[str] = [
+            f"{DUMMY_MODEL_ID}-{index}" for index in range(10)
+        ]
+        actual: list[Optional[DummyModel]] = service.get_many_typed(
+            MODEL_ID_KEY, values, chunk_size=3, max_workers=3
+        )
+        assert [model.id for model in actual] == values
+
+    def test_empty_values(self):
+        assert DummyModelService().get_many_typed(MODEL_ID_KEY, []) == []
+
+
+class Settings(BaseModel):
+    group: str
+    level: int
+
+
+class DummyModelWithSettings(DummyModel):
+    settings: Settings
+
+
+class DummyModelWithSettingsService(EntityService[DummyModelWithSettings]):
+    def __init__(self):
+        super().__init__(COLLECTION_NAME, get_connection_parameters())
+
+
+class DummyModelWithAny(DummyModel):
+    anything: Any = None
+
+
+class DummyModelWithAnyService(EntityService[DummyModelWithAny]):
+    def __init__(self):
+        super().__init__(COLLECTION_NAME, get_connection_parameters())
+
+
+class TestUpdateOneTypedWithTracking:
+    def test_only_changed_fields_are_sent(self):
+        service: DummyModelService = DummyModelService()
+        service.add_one_typed(get_dummy_model())
+        model: DummyModel = service.get_one_typed(
+            identifier_key=MODEL_ID_KEY,
+            identifier_value=DUMMY_MODEL_ID,
+            track=True,
+        )
+        # Concurrent change on a field the model did not modify
+        service.update_one(
+            filter_data={"_id": OBJECT_ID_VALUE},
+            document={"id": "changed-elsewhere"},
+        )
+        model.title = DUMMY_MODEL_TITLE_UPDATED
+        service.update_one_typed(model)
+        actual: dict = service.get({})[0]
+        assert actual["title"] == DUMMY_MODEL_TITLE_UPDATED and (
+            actual["id"] == "changed-elsewhere"
+        )
+
+    def test_reads_are_not_tracked_by_default(self):
+        service: DummyModelService = DummyModelService()
+        service.add_one_typed(get_dummy_model())
+        model: DummyModel = service.get_one_typed(
+            identifier_key=MODEL_ID_KEY, identifier_value=DUMMY_MODEL_ID
+        )
+        assert not model.is_tracked
+
+    def test_unchanged_models_only_report_the_match(self):
+        service: DummyModelService = DummyModelService()
+        service.add_one_typed(get_dummy_model())
+        model: DummyModel = service.get_one_typed(
+            identifier_key=MODEL_ID_KEY,
+            identifier_value=DUMMY_MODEL_ID,
+            track=True,
+        )
+        result: UpdateResult = service.update_one_typed(model)
+        assert (result.matched_count, result.modified_count) == (1, 0)
+        assert service.get({})[0] == get_dummy_model_data()
+
+    def test_in_place_changes_are_sent(self):
+        service: DummyModelWithAnyService = DummyModelWithAnyService()
+        service.add_one_typed(
+            DummyModelWithAny(
+                **get_dummy_model().model_dump(), anything=[1]
+            )
+        )
+        model: DummyModelWithAny = service.get_one_typed(
+            identifier_key=MODEL_ID_KEY,
+            identifier_value=DUMMY_MODEL_ID,
+            track=True,
+        )
+        model.anything.append(9)
+        assert service.update_one_typed(model) is not None
+        assert service.get({})[0]["anything"] == [1, 9]
+
+    def test_tracking_does_not_change_equality(self):
+        model: Entity = Entity(mongo_id=OBJECT_ID, id="x")
+        loaded: Entity = document_to_model(
+            Entity, model_to_document(model), track=True
+        )
+        assert loaded.is_tracked and loaded == model
+
+    def test_untracked_models_set_every_field(self):
+        service: DummyModelService = DummyModelService()
+        service.add_one_typed(get_dummy_model())
+        model: DummyModel = get_dummy_model()
+        model.title = DUMMY_MODEL_TITLE_UPDATED
+        assert model_to_update(model) == {
+            "$set": {
+                "title": DUMMY_MODEL_TITLE_UPDATED,
+                "id": DUMMY_MODEL_ID,
+            }
+        }
+
+    def test_nested_changes_use_dotted_paths(self):
+        service: DummyModelWithSettingsService = (
+            DummyModelWithSettingsService()
+        )
+        service.add_one_typed(
+            DummyModelWithSettings(
+                **get_dummy_model().model_dump(),
+                settings=Settings(group="a", level=1),
+            )
+        )
+        model: DummyModelWithSettings = service.get_one_typed(
+            identifier_key=MODEL_ID_KEY,
+            identifier_value=DUMMY_MODEL_ID,
+            track=True,
+        )
+        model.settings.level = 2
+        assert model_to_update(model) == {"$set": {"settings.level": 2}}
+        service.update_one_typed(model)
+        assert service.get({})[0]["settings"] == {"group": "a", "level": 2}
+
+    def test_model_is_clean_after_update(self):
+        service: DummyModelService = DummyModelService()
+        service.add_one_typed(get_dummy_model())
+        model: DummyModel = service.get_one_typed(
+            identifier_key=MODEL_ID_KEY,
+            identifier_value=DUMMY_MODEL_ID,
+            track=True,
+        )
+        model.title = DUMMY_MODEL_TITLE_UPDATED
+        service.update_one_typed(model)
+        assert model_to_update(model) == {"$set": {"_id": OBJECT_ID_VALUE}}
+
+
+class RecordingCollection:
+    """
+    Stand-in collection that records bulk write batches, since
+    mongomock does not support every write operation.
+    """
+
+    def __init__(self, failing_batches: tuple[int, ...] = ()):
+        self.batches: list[list] = []
+        self.failing_batches: tuple[int, ...] = failing_batches
+
+    def bulk_write(self, batch: list, ordered: bool):
+        self.batches.append(batch)
+        if len(self.batches) - 1 in self.failing_batches:
+            raise BulkWriteError(
+                {
+                    "nUpserted": len(batch) - 1,
+                    "writeErrors": [{"index": 0, "code": 11000}],
+                    "upserted": [],
+                }
+            )
+        return BulkWriteResult(
+            {"nUpserted": len(batch), "upserted": []}, acknowledged=True
+        )
+
+
+class TestBulkWriteTyped:
+    def test_insert_mode(self):
+        service: DummyModelService = DummyModelService()
+        summary = service.bulk_write_typed(
+            generate_list_of_models(), batch_size=3
+        )
+        assert summary.inserted_count == 10 and summary.batches == 4
+        assert len(service.get({})) == 10
+
+    def test_errors_are_reported_with_global_index(self):
+        service: DummyModelService = DummyModelService()
+        models: list[DummyModel] = generate_list_of_models()
+        service.add_one_typed(models[4])
+        summary = service.bulk_write_typed(
+            models, batch_size=3, ordered=False
+        )
+        assert [error["index"] for error in summary.errors] == [4] and (
+            summary.inserted_count == 9
+        )
+
+    def test_ordered_write_stops_at_failing_batch(self):
+        service: DummyModelService = DummyModelService()
+        service.entities = RecordingCollection(failing_batches=(1,))
+        summary = service.bulk_upsert_typed(
+            generate_list_of_models(), batch_size=3, ordered=True
+        )
+        assert len(service.entities.batches) == 2 and (
+            summary.error_for(3) is not None
+        )
+
+    def test_unordered_upsert_runs_every_batch(self):
+        service: DummyModelService = DummyModelService()
+        service.entities = RecordingCollection(failing_batches=(1,))
+        summary = service.bulk_upsert_typed(
+            generate_list_of_models(), batch_size=3
+        )
+        assert len(service.entities.batches) == 4 and (
+            summary.upserted_count == 9
+        )
+
+    def test_models_without_identifier_are_inserted(self):
+        service: DummyModelService = DummyModelService()
+        models: list[DummyModel] = [
+            DummyModel(id=f"new-{index}", title="new")
+            for index in range(3)
+        ]
+        summary = service.bulk_upsert_typed(models)
+        assert summary.inserted_count == 3
+        assert len({document["_id"] for document in service.get({})}) == 3
+
+    def test_upsert_operations_are_built_from_models(self):
+        service: DummyModelService = DummyModelService()
+        service.entities = RecordingCollection()
+        service.bulk_upsert_typed(generate_list_of_models(amount=1))
+        operation = service.entities.batches[0][0]
+        assert isinstance(operation, UpdateOne)
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            DummyModelService().bulk_write_typed([], mode="merge")
+
+
+class TestLazyAddManyTyped:
+    def test_models_are_inserted_in_chunks(self):
+        service: DummyModelService = DummyModelService()
+        result = service.add_many_typed(
+            (model for model in generate_list_of_models()), batch_size=3
+        )
+        assert len(result.inserted_ids) == 10 and (
+            len(service.get({})) == 10
+        )
+
+    def test_generator_is_not_consumed_ahead_of_inserts(self):
+        produced: list[int] = []
+        inserted: list[int] = []
+        service: DummyModelService = DummyModelService()
+        collection = service.entities
+
+        def generate():
+            for model in generate_list_of_models(amount=10):
+                produced.append(1)
+                yield model
+
+        def insert_many(documents: list[dict], ordered: bool):
+            # Never more than the chunk being inserted plus the one
+            # being prepared
+            assert len(produced) - len(inserted) <= 2 * 2
+            result = collection.insert_many(documents, ordered=ordered)
+            inserted.extend(result.inserted_ids)
+            return result
+
+        service.entities = type(
+            "InsertSpy", (), {"insert_many": staticmethod(insert_many)}
+        )()
+        service.add_many_typed(generate(), batch_size=2)
+        assert len(inserted) == 10
+
+    def test_empty_iterable(self):
+        result = DummyModelService().add_many_typed([])
+        assert result.inserted_ids == []
+
+    def test_unordered_insert_continues_after_failing_chunk(self):
+        service: DummyModelService = DummyModelService()
+        models: list[DummyModel] = generate_list_of_models()
+        service.add_one_typed(models[4])
+        with pytest.raises(BulkWriteError) as error:
+            service.add_many_typed(models, batch_size=3, ordered=False)
+        details: dict = error.value.details
+        assert [item["index"] for item in details["writeErrors"]] == [4]
+        assert len(details["insertedIds"]) == 9
+        assert len(service.get({})) == 10
+
+    def test_ordered_insert_stops_at_failing_chunk(self):
+        service: DummyModelService = DummyModelService()
+        models: list[DummyModel] = generate_list_of_models()
+        service.add_one_typed(models[4])
+        with pytest.raises(BulkWriteError) as error:
+            service.add_many_typed(models, batch_size=3, ordered=True)
+        assert error.value.details["insertedIds"] == [
+            str(model.mongo_id) for model in models[:4]
+        ]
+        assert len(service.get({})) == 5
+
+
+class TestTrustedReads:
+    def test_trusted_get_typed_matches_validated(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        expected: list[DummyModel] = list(service.get_typed(query={}))
+        actual: list[DummyModel] = service.get_typed(
+            query={}, trusted=True
+        )
+        assert expected == actual
+
+    def test_trusted_models_are_tracked_on_request(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        untracked: list[DummyModel] = service.get_typed(
+            query={}, trusted=True
+        )
+        tracked: list[DummyModel] = service.get_typed(
+            query={}, trusted=True, track=True
+        )
+        assert not any(model.is_tracked for model in untracked)
+        assert all(model.is_tracked for model in tracked)
+
+    def test_trusted_get_one_typed(self):
+        service: DummyModelService = DummyModelService()
+        service.add_one_typed(get_dummy_model())
+        actual: Optional[DummyModel] = service.get_one_typed(
+            identifier_key=MODEL_ID_KEY,
+            identifier_value=DUMMY_MODEL_ID,
+            trusted=True,
+        )
+        assert isinstance(actual, DummyModel)
+        assert OBJECT_ID == actual.mongo_id
+
+    def test_trusted_in_place_changes_are_sent(self):
+        service: DummyModelWithAnyService = DummyModelWithAnyService()
+        service.add_one_typed(
+            DummyModelWithAny(
+                **get_dummy_model().model_dump(), anything=[1]
+            )
+        )
+        model: DummyModelWithAny = service.get_one_typed(
+            identifier_key=MODEL_ID_KEY,
+            identifier_value=DUMMY_MODEL_ID,
+            trusted=True,
+            track=True,
+        )
+        model.anything.append(9)
+        assert service.update_one_typed(model) is not None
+        assert service.get({})[0]["anything"] == [1, 9]
+
+    def test_trusted_iter_typed(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: list[DummyModel] = list(
+            service.iter_typed(query={}, trusted=True)
+        )
+        assert len(actual) == 10 and all(
+            isinstance(model, DummyModel) for model in actual
+        )
+
+    def test_trusted_get_typed_by_moql(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: list[DummyModel] = service.get_typed_by_moql(
+            "_id=6509f10e4314386ae084b3c1", trusted=True
+        )
+        assert [DUMMY_MODEL_ID + "-1"] == [model.id for model in actual]
+
+    def test_models_of_plain_types_are_validated_anyway(self):
+        # Validating them is faster than building them, see
+        # hydration.prefers_construction
+        service: DummyModelService = DummyModelService()
+        service.add_many(generate_list_of_documents(remove_ids=True))
+        service.add_one({"id": "broken", "title": 1})
+        with pytest.raises(ValidationError):
+            service.get_typed(query={}, trusted=True)
+
+    def test_sampled_validation_detects_invalid_documents(self):
+        service: DummyModelService = DummyModelService()
+        service.add_one({"id": "broken", "title": 1})
+        with pytest.raises(ValidationError):
+            service.get_typed(query={}, trusted=True, sample_every=1)
+
+
+class TestGetTypedByMoql:
+    def test_returns_models(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: list[DummyModel] = service.get_typed_by_moql("limit=3")
+        assert len(actual) == 3 and all(
+            isinstance(model, DummyModel) for model in actual
+        )
+
+
+class TestTraverseCursorAndCopy:
+    def test_documents_are_not_copied(self):
+        expected: list[dict] = generate_list_of_documents()
+        actual: list[dict] = traverse_cursor_and_copy(iter(expected))
+        assert all(
+            document is original
+            for document, original in zip(actual, expected)
+        )
+
+    def test_all_documents_are_returned(self):
+        expected: list[dict] = generate_list_of_documents()
+        actual: list[dict] = traverse_cursor_and_copy(iter(expected))
+        assert expected == actual
+
+
+class RawCursor:
+    """
+    Cursor that encodes the documents of a mongomock cursor as
+    RawBSONDocument, the way the driver does when the collection
+    is configured with that document class.
+    """
+
+    def __init__(self, cursor, codec_options: CodecOptions):
+        self.cursor = cursor
+        self.codec_options: CodecOptions = codec_options
+
+    def skip(self, amount: int):
+        self.cursor.skip(amount)
+        return self
+
+    def limit(self, amount: int):
+        self.cursor.limit(amount)
+        return self
+
+    def batch_size(self, amount: int):
+        self.cursor.batch_size(amount)
+        return self
+
+    def __iter__(self):
+        for document in self.cursor:
+            yield RawBSONDocument(
+                bson.encode(document), codec_options=self.codec_options
+            )
+
+
+class RawCollection:
+    """
+    Stand-in for the collection returned by with_options, since
+    mongomock does not support custom document classes.
+    """
+
+    def __init__(self, collection, codec_options: CodecOptions):
+        self.collection = collection
+        self.codec_options: CodecOptions = codec_options
+
+    def find(self, *args, **kwargs) -> RawCursor:
+        return RawCursor(
+            self.collection.find(*args, **kwargs), self.codec_options
+        )
+
+
+class RawOptionsCollection:
+    def __init__(self, collection):
+        self.collection = collection
+        # mongomock refuses to build codec options with a custom
+        # document class, so the driver defaults are used
+        self.codec_options: CodecOptions = CodecOptions()
+
+    def with_options(self, codec_options: CodecOptions) -> RawCollection:
+        return RawCollection(self.collection, codec_options)
+
+    def __getattr__(self, name: str):
+        return getattr(self.collection, name)
+
+
+def get_raw_service() -> DummyModelService:
+    service: DummyModelService = DummyModelService()
+    service.add_many_typed(generate_list_of_models())
+    service.entities = RawOptionsCollection(service.entities)
+    return service
+
+
+class TestRawReads:
+    def test_raw_entities_use_raw_bson_documents(self):
+        expected: type = RawBSONDocument
+        actual: CodecOptions = get_raw_service().raw_entities.codec_options
+        assert expected is actual.document_class
+
+    def test_get_returns_raw_documents(self):
+        actual: list = get_raw_service().get(query={}, limit=3, raw=True)
+        assert len(actual) == 3 and all(
+            isinstance(document, RawBSONDocument) for document in actual
+        )
+
+    def test_raw_documents_decode_fields_on_access(self):
+        expected: dict = generate_list_of_documents()[0]
+        actual: RawBSONDocument = get_raw_service().get(
+            query={MODEL_ID_KEY: expected[MODEL_ID_KEY]}, raw=True
+        )[0]
+        assert expected["title"] == actual["title"]
+
+    def test_iter_by_moql_yields_raw_documents(self):
+        actual: list = list(
+            get_raw_service().iter_by_moql("limit=2", raw=True)
+        )
+        assert len(actual) == 2 and all(
+            isinstance(document, RawBSONDocument) for document in actual
+        )
+
+    def test_get_by_moql_returns_raw_documents(self):
+        actual: list = get_raw_service().get_by_moql("limit=2", raw=True)
+        assert all(
+            isinstance(document, RawBSONDocument) for document in actual
+        )
+
+    def test_iter_bson_streams_encoded_documents(self):
+        expected: list[dict] = generate_list_of_documents()
+        actual: list[dict] = bson.decode_all(
+            b"".join(get_raw_service().iter_bson(query={}, batch_size=3))
+        )
+        assert expected == actual
+
+    def test_iter_bson_by_moql(self):
+        actual: list[bytes] = list(
+            get_raw_service().iter_bson_by_moql(
+                "_id=6509f10e4314386ae084b3c1"
+            )
+        )
+        assert [DUMMY_MODEL_ID + "-1"] == [
+            bson.decode(chunk)[MODEL_ID_KEY] for chunk in actual
+        ]
+
+
+class TestGetByMoqlJson:
+    def test_matches_models_json(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        expected: list[dict] = [
+            json.loads(model.model_dump_json())
+            for model in service.get_typed_by_moql("limit=3")
+        ]
+        actual: list[dict] = json.loads(
+            service.get_by_moql_json("limit=3")
+        )
+        assert expected == actual
+
+    def test_ndjson_streams_every_document(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        chunks: list[bytes] = list(
+            service.iter_by_moql_ndjson("", batch_size=4, chunk_size=3)
+        )
+        expected: list[dict] = json.loads(service.get_by_moql_json(""))
+        actual: list[dict] = [
+            json.loads(line) for line in b"".join(chunks).splitlines()
+        ]
+        assert len(chunks) == 4 and expected == actual
+
+
+class TitleOutput(BaseModel):
+    title: str
+
+
+class IdentifiedTitleOutput(Entity):
+    title: str
+
+
+class FindSpy:
+    def __init__(self, collection):
+        self.collection = collection
+        self.calls: list[dict] = []
+
+    def find(self, *args, **kwargs):
+        self.calls.append(kwargs)
+        return self.collection.find(*args, **kwargs)
+
+
+class TestGetTypedAs:
+    def test_returns_output_models(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        expected: list[str] = [
+            model.title for model in service.get_typed(query={})
+        ]
+        actual: list[TitleOutput] = service.get_typed_as(
+            TitleOutput, query={}
+        )
+        assert expected == [model.title for model in actual]
+
+    def test_only_fields_of_output_model_are_fetched(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        service.entities = FindSpy(service.entities)
+        service.get_typed_as(TitleOutput, query={}, limit=2)
+        expected: dict = {"title": 1, "_id": 0}
+        actual: dict = service.entities.calls[0]["projection"]
+        assert expected == actual
+
+    def test_trusted_output_models(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        expected: list = service.get_typed_as(
+            IdentifiedTitleOutput, query={}
+        )
+        actual: list = service.get_typed_as(
+            IdentifiedTitleOutput, query={}, trusted=True
+        )
+        assert expected == actual
+
+
+class TestGetByMoqlAs:
+    def test_returns_output_models(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: list[IdentifiedTitleOutput] = service.get_by_moql_as(
+            IdentifiedTitleOutput, "_id=6509f10e4314386ae084b3c1"
+        )
+        assert [DUMMY_MODEL_ID + "-1"] == [model.id for model in actual]
+
+    def test_fields_parameter_is_merged(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        service.entities = FindSpy(service.entities)
+        actual: list[IdentifiedTitleOutput] = service.get_by_moql_as(
+            IdentifiedTitleOutput, "fields=-id"
+        )
+        assert {"title": 1, "_id": 1} == service.entities.calls[0][
+            "projection"
+        ]
+        assert all(model.id is None for model in actual)
+
+
+class TestGetByPreparedMoQL:
+    def test_get_by_moql_with_bound_template(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        prepared: PreparedMoQL = prepare_moql("title={title}")
+        actual: list[dict] = service.get_by_moql(
+            prepared.bind(title=f"{DUMMY_MODEL_TITLE}-3")
+        )
+        assert [document["title"] for document in actual] == [
+            f"{DUMMY_MODEL_TITLE}-3"
+        ]
+
+    def test_bound_template_uses_service_casters(self):
+        service: DummyModelService = DummyModelService()
+        service.add_many_typed(generate_list_of_models())
+        actual: list[DummyModel] = service.get_typed_by_moql(
+            prepare_moql("title=str({title})").bind(
+                title=f"{DUMMY_MODEL_TITLE}-3"
+            )
+        )
+        assert [model.title for model in actual] == [
+            f"{DUMMY_MODEL_TITLE}-3"
+        ]
@@ -0,0 +1,205 @@
+from enum import Enum
+from typing import Optional, Union
+
+from bson import ObjectId
+from pydantic import BaseModel, field_validator
+
+from moapi.models.core.custom_pydantic_fields import MongoObjectId
+from moapi.models.core.entity import Entity
+from moapi.odm.entity_service import (
+    document_to_model,
+    trusted_document_to_model,
+)
+from moapi.odm.hydration import (
+    ValidationSampler,
+    construct_model,
+    get_construction_plan,
+    prefers_construction,
+)
+
+OBJECT_ID_VALUE: str = "6502104e8fb95f068e3a4635"
+OTHER_OBJECT_ID_VALUE: str = "6502104e8fb95f068e3a4636"
+
+
+class Status(Enum):
+    ACTIVE = "active"
+    INACTIVE = "inactive"
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+
+
+class Phone(BaseModel):
+    number: str
+
+
+class Email(BaseModel):
+    address: str
+
+
+class Customer(Entity):
+    name: str
+    address: Address
+    previous_addresses: list[Address] = []
+    billing_address: Optional[Address] = None
+    phones: dict[str, Phone] = {}
+    owner_id: Optional[MongoObjectId] = None
+    contact: Union[Phone, Email, None] = None
+
+
+class Account(Entity):
+    status: Status
+
+
+class Contact(Entity):
+    email: str
+
+    @field_validator("email")
+    @classmethod
+    def lower_email(cls, value: str) -> str:
+        return value.lower()
+
+
+CUSTOMER_DOCUMENT: dict = {
+    "_id": OBJECT_ID_VALUE,
+    "id": "customer-1",
+    "name": "Jane",
+    "address": {"street": "Main St", "city": "San José"},
+    "previous_addresses": [{"street": "Old St", "city": "Heredia"}],
+    "billing_address": None,
+    "phones": {"home": {"number": "555-0100"}},
+    "owner_id": OTHER_OBJECT_ID_VALUE,
+    "contact": {"address": "jane@example.com"},
+}
+
+
+class TestConstructModel:
+    def test_constructed_model_matches_validated_model(self):
+        expected: Customer = document_to_model(Customer, CUSTOMER_DOCUMENT)
+        actual: Customer = trusted_document_to_model(
+            Customer, CUSTOMER_DOCUMENT
+        )
+        assert expected == actual
+
+    def test_internal_id_is_mapped_to_mongo_id(self):
+        expected: ObjectId = ObjectId(OBJECT_ID_VALUE)
+        actual: Customer = construct_model(Customer, CUSTOMER_DOCUMENT)
+        assert expected == actual.mongo_id
+
+    def test_nested_models_are_constructed(self):
+        actual: Customer = construct_model(Customer, CUSTOMER_DOCUMENT)
+        assert isinstance(actual.address, Address)
+        assert isinstance(actual.previous_addresses[0], Address)
+        assert isinstance(actual.phones["home"], Phone)
+        assert isinstance(actual.contact, Email)
+
+    def test_enums_are_constructed(self):
+        expected: Status = Status.ACTIVE
+        actual: Account = construct_model(Account, {"status": "active"})
+        assert expected is actual.status
+
+    def test_missing_fields_take_their_defaults(self):
+        document: dict = {
+            key: value
+            for key, value in CUSTOMER_DOCUMENT.items()
+            if key != "previous_addresses"
+        }
+        expected: list = []
+        actual: Customer = construct_model(Customer, document)
+        assert expected == actual.previous_addresses
+
+    def test_unknown_keys_are_dropped(self):
+        document: dict = {**CUSTOMER_DOCUMENT, "unknown": 1}
+        actual: Customer = construct_model(Customer, document)
+        assert not hasattr(actual, "unknown")
+
+    def test_fields_set_only_holds_document_fields(self):
+        expected: set = {"name", "address"}
+        actual: Customer = construct_model(
+            Customer,
+            {"name": "Jane", "address": CUSTOMER_DOCUMENT["address"]},
+        )
+        assert expected == actual.model_fields_set
+
+    def test_mutable_defaults_are_not_shared(self):
+        first: Customer = construct_model(Customer, CUSTOMER_DOCUMENT)
+        second: Customer = construct_model(Customer, {})
+        third: Customer = construct_model(Customer, {})
+        second.phones["work"] = first.phones["home"]
+        assert {} == third.phones
+
+    def test_document_is_not_mutated(self):
+        document: dict = dict(CUSTOMER_DOCUMENT)
+        construct_model(Customer, document)
+        assert CUSTOMER_DOCUMENT == document
+
+
+class PostInitModel(BaseModel):
+    value: int
+    double: int = 0
+
+    def model_post_init(self, context):
+        self.double = self.value * 2
+
+
+class TestConstructModelWithPostInit:
+    def test_custom_post_init_is_run(self):
+        expected: int = 4
+        actual: PostInitModel = construct_model(
+            PostInitModel, {"value": 2}
+        )
+        assert expected == actual.double
+
+
+class TestGetConstructionPlan:
+    def test_plan_is_cached_per_model_type(self):
+        expected = get_construction_plan(Customer)
+        actual = get_construction_plan(Customer)
+        assert expected is actual
+
+    def test_shared_defaults_are_precomputed(self):
+        expected: dict = {"billing_address": None, "owner_id": None}
+        defaults: dict = {
+            plan.name: plan.default
+            for plan in get_construction_plan(Customer)
+        }
+        actual: dict = {name: defaults[name] for name in expected}
+        assert expected == actual
+
+    def test_mongo_id_reads_internal_id(self):
+        expected: tuple = ("mongo_id", "_id")
+        keys: dict = {
+            plan.name: plan.keys for plan in get_construction_plan(Entity)
+        }
+        actual: tuple = keys["mongo_id"]
+        assert expected == actual
+
+
+class TestPrefersConstruction:
+    def test_models_of_plain_types_are_validated(self):
+        assert not prefers_construction(Customer)
+
+    def test_models_with_python_validators_are_constructed(self):
+        assert prefers_construction(Contact)
+
+    def test_trusted_reads_skip_python_validators(self):
+        expected: str = "Jane@Example.com"
+        actual: Contact = trusted_document_to_model(
+            Contact, {"id": "contact-1", "email": expected}
+        )
+        assert expected == actual.email
+
+
+class TestValidationSampler:
+    def test_no_documents_are_validated_without_sampling(self):
+        sampler: ValidationSampler = ValidationSampler()
+        actual: list = [sampler.should_validate(None) for _ in range(5)]
+        assert not any(actual)
+
+    def test_one_in_every_n_documents_is_validated(self):
+        sampler: ValidationSampler = ValidationSampler()
+        expected: list = [True, False, False, True, False, False]
+        actual: list = [sampler.should_validate(3) for _ in range(6)]
+        assert expected == actual
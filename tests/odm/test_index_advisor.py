@@ -0,0 +1,203 @@
+from typing import Optional
+
+from pymongo import IndexModel
+
+from tests.odm.helpers import (
+    DummyModel,
+    generate_list_of_models,
+    get_connection_parameters,
+)
+from moapi.odm.entity_service import EntityService, moql_to_query
+from moapi.odm.index_advisor import (
+    IndexAdvisor,
+    IndexSuggestion,
+    QueryShape,
+    is_covered,
+    query_shape,
+    suggested_keys,
+)
+
+COLLECTION_NAME: str = "advised"
+
+
+class AdvisedService(EntityService[DummyModel]):
+    class Meta:
+        indexes: list[IndexModel] = [IndexModel([("id", 1), ("title", 1)])]
+
+    def __init__(self, index_advisor: Optional[IndexAdvisor]):
+        super().__init__(
+            COLLECTION_NAME,
+            get_connection_parameters(),
+            index_advisor=index_advisor,
+        )
+
+
+class TestQueryShape:
+    def test_equality_sort_and_range_fields(self):
+        expected: QueryShape = QueryShape(
+            equality=("a", "b"), sort=(("c", -1),), range=("d",)
+        )
+        actual: QueryShape = query_shape(
+            moql_to_query("b=1&a=x&d>3&sort=-c")
+        )
+        assert expected == actual
+
+    def test_values_are_not_part_of_the_shape(self):
+        expected: QueryShape = query_shape(moql_to_query("a=1&b>2"))
+        actual: QueryShape = query_shape(moql_to_query("a=5&b>9"))
+        assert expected == actual
+
+    def test_in_is_an_equality_without_sort(self):
+        expected: tuple = ("a",)
+        actual: QueryShape = query_shape(moql_to_query("a=list(1,2)"))
+        assert expected == actual.equality
+
+    def test_in_is_a_range_with_sort(self):
+        expected: tuple = ("a",)
+        actual: QueryShape = query_shape(
+            moql_to_query("a=list(1,2)&sort=b")
+        )
+        assert expected == actual.range
+
+    def test_negations_and_regular_expressions_are_ranges(self):
+        expected: tuple = ("a", "b")
+        actual: QueryShape = query_shape(moql_to_query("a!=1&b=/x/"))
+        assert expected == actual.range
+
+    def test_sort_on_equality_fields_is_ignored(self):
+        expected: tuple = ()
+        actual: QueryShape = query_shape(moql_to_query("a=1&sort=a"))
+        assert expected == actual.sort
+
+    def test_text_search_is_ignored(self):
+        expected: QueryShape = QueryShape((), (), ())
+        actual: QueryShape = query_shape(moql_to_query("$text=hello"))
+        assert expected == actual
+
+    def test_and_conditions_are_flattened(self):
+        expected: QueryShape = QueryShape(("a",), (), ("b",))
+        actual: QueryShape = query_shape(
+            {"filter": {"$and": [{"a": 1}, {"b": {"$gt": 1}}]}}
+        )
+        assert expected == actual
+
+
+class TestSuggestedKeys:
+    def test_equality_sort_range_order(self):
+        expected: tuple = (("a", 1), ("c", -1), ("d", 1))
+        actual: tuple = suggested_keys(
+            QueryShape(("a",), (("c", -1),), ("d",))
+        )
+        assert expected == actual
+
+
+class TestIsCovered:
+    shape: QueryShape = QueryShape(("a", "b"), (("c", -1),), ("d",))
+
+    def test_equality_fields_in_any_order(self):
+        assert is_covered(
+            self.shape, (("b", 1), ("a", 1), ("c", -1), ("d", 1))
+        )
+
+    def test_reversed_sort_is_covered(self):
+        assert is_covered(
+            self.shape, (("a", 1), ("b", 1), ("c", 1), ("d", -1))
+        )
+
+    def test_longer_indexes_cover_the_shape(self):
+        assert is_covered(
+            self.shape, (("a", 1), ("b", 1), ("c", -1), ("d", 1), ("e", 1))
+        )
+
+    def test_range_before_sort_is_not_covered(self):
+        assert not is_covered(
+            self.shape, (("a", 1), ("b", 1), ("d", 1), ("c", -1))
+        )
+
+    def test_mixed_sort_directions_are_not_covered(self):
+        shape: QueryShape = QueryShape((), (("a", 1), ("b", 1)), ())
+        assert not is_covered(shape, (("a", 1), ("b", -1)))
+
+
+class TestIndexAdvisor:
+    def test_shapes_are_counted(self):
+        advisor: IndexAdvisor = IndexAdvisor()
+        for moql in ("a=1", "a=2", "b>1"):
+            advisor.record(moql_to_query(moql))
+        expected: dict = {
+            QueryShape(("a",), (), ()): 2,
+            QueryShape((), (), ("b",)): 1,
+        }
+        actual: dict = advisor.shapes
+        assert expected == actual
+
+    def test_least_used_shape_is_evicted(self):
+        advisor: IndexAdvisor = IndexAdvisor(max_shapes=2)
+        for moql in ("a=1", "a=2", "b=1", "c=1"):
+            advisor.record(moql_to_query(moql))
+        expected: set = {
+            QueryShape(("a",), (), ()),
+            QueryShape(("c",), (), ()),
+        }
+        actual: set = set(advisor.shapes)
+        assert expected == actual
+
+    def test_suggestions_are_sorted_by_usage_and_flagged(self):
+        advisor: IndexAdvisor = IndexAdvisor()
+        for moql in ("a=1&sort=b", "c>1", "c>2"):
+            advisor.record(moql_to_query(moql))
+        expected: list[IndexSuggestion] = [
+            IndexSuggestion(
+                keys=(("c", 1),),
+                shape=QueryShape((), (), ("c",)),
+                calls=2,
+                covered=False,
+            ),
+            IndexSuggestion(
+                keys=(("a", 1), ("b", 1)),
+                shape=QueryShape(("a",), (("b", 1),), ()),
+                calls=1,
+                covered=True,
+            ),
+        ]
+        actual: list[IndexSuggestion] = advisor.propose(
+            [{"name": "a_1_b_1", "key": {"a": 1, "b": 1}}]
+        )
+        assert expected == actual
+
+    def test_unfiltered_queries_are_not_proposed(self):
+        advisor: IndexAdvisor = IndexAdvisor()
+        advisor.record(moql_to_query(""))
+        assert [] == advisor.propose()
+
+
+class TestServiceIndexAdvisor:
+    def test_moql_queries_are_recorded(self):
+        advisor: IndexAdvisor = IndexAdvisor()
+        service: AdvisedService = AdvisedService(advisor)
+        service.add_many_typed(generate_list_of_models())
+        service.get_by_moql("title=Model-1&sort=-id")
+        list(service.iter_by_moql("id=x"))
+        expected: dict = {
+            QueryShape(("title",), (("id", -1),), ()): 1,
+            QueryShape(("id",), (), ()): 1,
+        }
+        actual: dict = advisor.shapes
+        assert expected == actual
+
+    def test_existing_indexes_are_flagged(self):
+        service: AdvisedService = AdvisedService(IndexAdvisor())
+        service.ensure_indexes()
+        service.get_by_moql("id=x")
+        service.get_by_moql("title=x")
+        expected: dict = {("id",): True, ("title",): False}
+        actual: dict = {
+            suggestion.shape.equality: suggestion.covered
+            for suggestion in service.advise_indexes()
+        }
+        assert expected == actual
+
+    def test_without_advisor(self):
+        service: AdvisedService = AdvisedService(None)
+        service.get_by_moql("id=x")
+        assert [] == service.advise_indexes()
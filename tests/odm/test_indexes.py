@@ -0,0 +1,226 @@
+import pytest
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+from tests.odm.helpers import get_connection_parameters
+from moapi.models.core.entity import Entity
+from moapi.odm.entity_service import EntityService
+from moapi.odm.indexes import (
+    IndexConflictError,
+    declared_indexes,
+    ensure_indexes,
+    index_conflicts,
+    index_key,
+    missing_indexes,
+)
+
+COLLECTION_NAME: str = "indexed"
+
+
+class IndexedModel(Entity):
+    title: str
+    category: str
+    created: int
+
+    class Meta:
+        indexes: list[IndexModel] = [
+            IndexModel([("title", TEXT)]),
+        ]
+
+
+class IndexedService(EntityService[IndexedModel]):
+    class Meta:
+        indexes: list[IndexModel] = [
+            IndexModel([("id", ASCENDING)], unique=True),
+            IndexModel([("category", ASCENDING), ("created", DESCENDING)]),
+            IndexModel([("created", ASCENDING)], expireAfterSeconds=60),
+        ]
+
+    def __init__(self):
+        super().__init__(COLLECTION_NAME, get_connection_parameters())
+
+
+class ConflictingService(IndexedService):
+    def __init__(self):
+        super().__init__()
+        # Same key as the declared id_1, which is unique
+        self.entities.create_index([("id", ASCENDING)])
+
+
+class CreateIndexesSpy:
+    def __init__(self, existing: list[dict]):
+        self.existing: list[dict] = existing
+        self.calls: list[list[IndexModel]] = []
+
+    def list_indexes(self):
+        return iter(self.existing)
+
+    def create_indexes(self, indexes: list[IndexModel]) -> list[str]:
+        self.calls.append(indexes)
+        return [index.document["name"] for index in indexes]
+
+
+class TestIndexKey:
+    def test_key_order_is_kept(self):
+        expected: tuple = (("b", 1), ("a", -1))
+        actual: tuple = index_key({"key": {"b": 1, "a": -1}})
+        assert expected == actual
+
+
+class TestDeclaredIndexes:
+    def test_indexes_of_every_owner_are_collected(self):
+        expected: list[str] = [
+            "id_1",
+            "category_1_created_-1",
+            "created_1",
+            "title_text",
+        ]
+        actual: list[IndexModel] = declared_indexes(
+            IndexedService, Entity, IndexedModel
+        )
+        assert expected == [index.document["name"] for index in actual]
+
+
+class TestMissingIndexes:
+    def test_indexes_matching_by_name_or_key_exist(self):
+        existing: list[dict] = [
+            {"name": "_id_", "key": {"_id": 1}},
+            {"name": "custom", "key": {"id": 1}},
+            {"name": "title_text", "key": {"_fts": "text", "_ftsx": 1}},
+        ]
+        expected: list[str] = ["category_1_created_-1", "created_1"]
+        actual: list[IndexModel] = missing_indexes(
+            IndexedService().get_indexes(), existing
+        )
+        assert expected == [index.document["name"] for index in actual]
+
+    def test_duplicated_declarations_are_created_once(self):
+        declared: list[IndexModel] = [
+            IndexModel([("a", ASCENDING)]),
+            IndexModel([("a", ASCENDING)]),
+        ]
+        expected: int = 1
+        actual: int = len(missing_indexes(declared, []))
+        assert expected == actual
+
+
+class TestIndexConflicts:
+    def test_matching_indexes_do_not_conflict(self):
+        existing: list[dict] = [
+            {"name": "id_1", "key": {"id": 1}, "unique": True},
+            {"name": "title_text", "key": {"_fts": "text", "_ftsx": 1}},
+            {
+                "name": "created_1",
+                "key": {"created": 1},
+                "expireAfterSeconds": 60,
+            },
+        ]
+        expected: list = []
+        actual: list = index_conflicts(
+            IndexedService().get_indexes(), existing
+        )
+        assert expected == actual
+
+    def test_differing_options_are_reported(self):
+        existing: list[dict] = [
+            {"name": "custom", "key": {"id": 1}},
+            {
+                "name": "created_1",
+                "key": {"created": 1},
+                "expireAfterSeconds": 3600,
+            },
+        ]
+        expected: list[tuple] = [
+            ("id_1", ("unique",)),
+            ("created_1", ("expireAfterSeconds",)),
+        ]
+        actual: list[tuple] = [
+            (conflict.declared.document["name"], conflict.options)
+            for conflict in index_conflicts(
+                IndexedService().get_indexes(), existing
+            )
+        ]
+        assert expected == actual
+
+    def test_partial_filter_and_key_are_compared(self):
+        declared: list[IndexModel] = [
+            IndexModel(
+                [("a", ASCENDING)],
+                name="partial",
+                partialFilterExpression={"a": {"$gt": 1}},
+            )
+        ]
+        existing: list[dict] = [{"name": "partial", "key": {"b": 1}}]
+        expected: tuple = ("key", "partialFilterExpression")
+        actual: tuple = index_conflicts(declared, existing)[0].options
+        assert expected == actual
+
+    def test_only_declared_collation_fields_are_compared(self):
+        declared: list[IndexModel] = [
+            IndexModel([("a", ASCENDING)], collation={"locale": "en"})
+        ]
+        existing: list[dict] = [
+            {
+                "name": "a_1",
+                "key": {"a": 1},
+                "collation": {"locale": "en", "strength": 3},
+            }
+        ]
+        assert [] == index_conflicts(declared, existing)
+
+
+class TestEnsureIndexes:
+    def test_missing_indexes_are_created_in_one_batch(self):
+        collection: CreateIndexesSpy = CreateIndexesSpy(
+            [{"name": "_id_", "key": {"_id": 1}}]
+        )
+        ensure_indexes(collection, IndexedService().get_indexes())
+        expected: int = 1
+        actual: int = len(collection.calls)
+        assert expected == actual
+
+    def test_nothing_is_created_when_up_to_date(self):
+        collection: CreateIndexesSpy = CreateIndexesSpy(
+            [{"name": "a_1", "key": {"a": 1}}]
+        )
+        expected: list[str] = []
+        actual: list[str] = ensure_indexes(
+            collection, [IndexModel([("a", ASCENDING)])]
+        )
+        assert expected == actual and not collection.calls
+
+    def test_conflicts_are_raised_before_creating(self):
+        collection: CreateIndexesSpy = CreateIndexesSpy(
+            [{"name": "id_1", "key": {"id": 1}}]
+        )
+        with pytest.raises(IndexConflictError, match="id_1 \\(unique\\)"):
+            ensure_indexes(collection, IndexedService().get_indexes())
+        assert not collection.calls
+
+
+class TestServiceEnsureIndexes:
+    def test_declared_indexes_are_created(self):
+        expected: list[str] = [
+            "id_1",
+            "category_1_created_-1",
+            "created_1",
+            "title_text",
+        ]
+        actual: list[str] = IndexedService().ensure_indexes()
+        assert expected == actual
+
+    def test_second_run_creates_nothing(self):
+        service: IndexedService = IndexedService()
+        service.ensure_indexes()
+        expected: list[str] = []
+        actual: list[str] = service.ensure_indexes()
+        assert expected == actual
+
+    def test_created_indexes_keep_their_options(self):
+        service: IndexedService = IndexedService()
+        service.ensure_indexes()
+        indexes: dict = {
+            index["name"]: index
+            for index in service.entities.list_indexes()
+        }
+        assert indexes["id_1"]["unique"]
+        assert 60 == indexes["created_1"]["expireAfterSeconds"]
@@ -0,0 +1,231 @@
+from typing import Optional
+
+import pytest
+
+from tests.odm.helpers import (
+    DummyModel,
+    generate_list_of_models,
+    get_connection_parameters,
+)
+from moapi.odm.entity_service import EntityService
+from moapi.odm.instrumentation import (
+    HistogramRecorder,
+    OperationEvent,
+    OperationHistogram,
+    OperationListener,
+)
+
+COLLECTION_NAME: str = "instrumented"
+
+
+class EventCollector(OperationListener):
+    def __init__(self):
+        self.events: list[OperationEvent] = []
+
+    def on_operation(self, event: OperationEvent):
+        self.events.append(event)
+
+
+class FailingListener(OperationListener):
+    def on_operation(self, event: OperationEvent):
+        raise RuntimeError("listener failure")
+
+
+class InstrumentedService(EntityService[DummyModel]):
+    def __init__(self, listeners: Optional[list[OperationListener]]):
+        super().__init__(
+            COLLECTION_NAME,
+            get_connection_parameters(),
+            listeners=listeners,
+        )
+
+
+def build_service(
+    collector: EventCollector,
+) -> InstrumentedService:
+    service: InstrumentedService = InstrumentedService(None)
+    service.add_many_typed(generate_list_of_models())
+    service.instrumentation.add_listener(collector)
+    return service
+
+
+def build_event(duration: float) -> OperationEvent:
+    return OperationEvent(
+        collection=COLLECTION_NAME,
+        operation="get",
+        query_shape=None,
+        duration=duration,
+        database_time=duration,
+        conversion_time=0.0,
+        documents=1,
+        query=None,
+        error=None,
+    )
+
+
+class TestServiceInstrumentation:
+    def test_moql_operations_report_shape_and_documents(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = build_service(collector)
+        service.get_by_moql("title=Model-1&sort=-id")
+        event: OperationEvent = collector.events[0]
+        expected: tuple = (
+            COLLECTION_NAME,
+            "get_by_moql",
+            "sort=-id&title=?",
+            1,
+        )
+        actual: tuple = (
+            event.collection,
+            event.operation,
+            event.query_shape,
+            event.documents,
+        )
+        assert expected == actual
+        assert {"title": "Model-1"} == event.query["filter"]
+
+    def test_nested_operations_are_reported_once(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = build_service(collector)
+        service.get_typed_by_moql("title=Model-1")
+        expected: list[tuple] = [("get_typed_by_moql", 1)]
+        actual: list[tuple] = [
+            (event.operation, event.documents)
+            for event in collector.events
+        ]
+        assert expected == actual
+
+    def test_conversion_time_is_reported_separately(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = build_service(collector)
+        service.get_typed({})
+        event: OperationEvent = collector.events[0]
+        assert event.conversion_time > 0
+        assert event.duration == pytest.approx(
+            event.database_time + event.conversion_time
+        )
+
+    def test_untyped_reads_have_no_conversion_time(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = build_service(collector)
+        service.get({})
+        expected: float = 0.0
+        actual: float = collector.events[0].conversion_time
+        assert expected == actual
+
+    def test_iterators_are_reported_once_consumed(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = build_service(collector)
+        models = service.iter_typed({})
+        assert [] == collector.events
+        list(models)
+        expected: list[tuple] = [("iter_typed", 10)]
+        actual: list[tuple] = [
+            (event.operation, event.documents)
+            for event in collector.events
+        ]
+        assert expected == actual
+        assert collector.events[0].conversion_time > 0
+
+    def test_closed_iterators_are_reported(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = build_service(collector)
+        documents = service.iter_by_moql("sort=id")
+        next(documents)
+        documents.close()
+        expected: list[tuple] = [("iter_by_moql", 1, "sort=id")]
+        actual: list[tuple] = [
+            (event.operation, event.documents, event.query_shape)
+            for event in collector.events
+        ]
+        assert expected == actual
+
+    def test_ndjson_chunks_report_their_documents(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = build_service(collector)
+        list(service.iter_by_moql_ndjson("sort=id", chunk_size=4))
+        expected: list[tuple] = [("iter_by_moql_ndjson", 10, "sort=id")]
+        actual: list[tuple] = [
+            (event.operation, event.documents, event.query_shape)
+            for event in collector.events
+        ]
+        assert expected == actual
+
+    def test_operations_called_between_items_are_reported(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = build_service(collector)
+        for _ in service.iter({}, limit=2):
+            service.get_one("id", "x")
+        expected: list[str] = ["get_one", "get_one", "iter"]
+        actual: list[str] = [event.operation for event in collector.events]
+        assert expected == actual
+
+    def test_errors_are_reported(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = build_service(collector)
+        with pytest.raises(ValueError):
+            service.bulk_write_typed([], mode="unknown")
+        assert isinstance(collector.events[0].error, ValueError)
+
+    def test_failing_listeners_do_not_break_operations(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = InstrumentedService(
+            [FailingListener(), collector]
+        )
+        expected: int = 0
+        actual: int = len(service.get({}))
+        assert expected == actual
+        assert 1 == len(collector.events)
+
+    def test_nothing_is_reported_without_listeners(self):
+        collector: EventCollector = EventCollector()
+        service: InstrumentedService = build_service(collector)
+        service.instrumentation.remove_listener(collector)
+        service.get({})
+        assert [] == collector.events
+
+
+class TestOperationHistogram:
+    def test_percentiles_use_bucket_upper_bounds(self):
+        histogram: OperationHistogram = OperationHistogram(
+            (0.01, 0.1, 1.0)
+        )
+        for duration in [0.005] * 90 + [0.05] * 9 + [0.5]:
+            histogram.observe(build_event(duration))
+        expected: tuple = (0.01, 0.01, 0.1)
+        actual: tuple = (
+            histogram.percentile(0.5),
+            histogram.percentile(0.9),
+            histogram.percentile(0.99),
+        )
+        assert expected == actual
+
+    def test_overflow_bucket_reports_the_maximum(self):
+        histogram: OperationHistogram = OperationHistogram((0.01,))
+        histogram.observe(build_event(3.0))
+        expected: float = 3.0
+        actual: float = histogram.percentile(0.95)
+        assert expected == actual
+
+
+class TestHistogramRecorder:
+    def test_operations_are_aggregated_per_collection(self):
+        recorder: HistogramRecorder = HistogramRecorder()
+        service: InstrumentedService = InstrumentedService([recorder])
+        service.add_many_typed(generate_list_of_models())
+        service.get_typed({})
+        service.get_typed({})
+        snapshot: dict = recorder.snapshot()
+        expected: tuple = (2, 20, 0)
+        actual: tuple = tuple(
+            snapshot[(COLLECTION_NAME, "get_typed")][key]
+            for key in ("calls", "documents", "errors")
+        )
+        assert expected == actual
+        assert (COLLECTION_NAME, "add_many_typed") in snapshot
+
+    def test_clear(self):
+        recorder: HistogramRecorder = HistogramRecorder()
+        recorder.on_operation(build_event(0.1))
+        recorder.clear()
+        assert {} == recorder.snapshot()
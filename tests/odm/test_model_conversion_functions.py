@@ -1,18 +1,20 @@
 from typing import Iterable
 
 import pytest
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from tests.odm.helpers import (
     generate_list_of_models,
     generate_list_of_documents,
 )
+from moapi.models.core import entity as entity_module
 from moapi.models.core.entity import Entity
 from moapi.odm.entity_service import (
     handle_mongo_internal_id,
     model_to_document,
     document_to_model,
     document_list_to_model_list,
+    get_list_adapter,
     model_list_to_document_list,
 )
 
@@ -72,6 +74,56 @@ class TestDocumentListToModelList:
         for doc in actual:
             assert isinstance(doc, expected)
 
+    def test_documents_with_internal_id_are_converted(self):
+        documents: list = generate_list_of_documents()
+        expected: list = [
+            document_to_model(model_type=Entity, document=document)
+            for document in documents
+        ]
+        actual: list = document_list_to_model_list(
+            model_type=Entity, documents=iter(documents)
+        )
+        assert expected == actual
+
+    def test_documents_are_not_mutated(self):
+        expected: dict = dict(VAP_DOCUMENT)
+        document_list_to_model_list(
+            model_type=Entity, documents=[VAP_DOCUMENT]
+        )
+        assert expected == VAP_DOCUMENT
+
+    def test_loaded_state_is_only_recorded_on_request(self):
+        untracked: list = document_list_to_model_list(
+            model_type=Entity, documents=[VAP_DOCUMENT]
+        )
+        tracked: list = document_list_to_model_list(
+            model_type=Entity, documents=[VAP_DOCUMENT], track=True
+        )
+        assert not untracked[0].is_tracked and tracked[0].is_tracked
+
+    def test_loaded_state_is_a_snapshot(self):
+        document: dict = dict(VAP_DOCUMENT)
+        actual: list = document_list_to_model_list(
+            model_type=Entity, documents=[document], track=True
+        )
+        assert actual[0].loaded_state is not document
+        assert actual[0].loaded_state == model_to_document(actual[0])
+
+    def test_loaded_state_is_released_with_the_model(self):
+        model: Entity = document_to_model(
+            Entity, dict(VAP_DOCUMENT), track=True
+        )
+        key: int = id(model)
+        del model
+        assert key not in entity_module._LOADED_STATES
+
+    def test_invalid_document_raises_validation_error(self):
+        with pytest.raises(ValidationError):
+            document_list_to_model_list(
+                model_type=Entity,
+                documents=[VAP_DOCUMENT, VAP_DOCUMENT_INVALID],
+            )
+
 
 class TestModelListToDocumentList:
     def test_documents_are_correctly_converted(self):
@@ -80,3 +132,10 @@ class TestModelListToDocumentList:
             models=generate_list_of_models()
         )
         assert expected == actual
+
+
+class TestGetListAdapter:
+    def test_adapter_is_cached_per_model_type(self):
+        expected: TypeAdapter = get_list_adapter(Entity)
+        actual: TypeAdapter = get_list_adapter(Entity)
+        assert expected is actual
@@ -0,0 +1,177 @@
+import pytest
+from bson import ObjectId
+
+from moapi.moql.errors import PaginationError
+from moapi.odm.pagination import (
+    keyset_sort,
+    get_path_value,
+    encode_token,
+    decode_token,
+    seek_predicate,
+    ensure_sort_keys_projected,
+    keyset_query,
+    facet_pipeline,
+    facet_total,
+)
+
+OBJECT_ID: ObjectId = ObjectId("6509f10e4314386ae084b3c1")
+SORT: list[tuple[str, int]] = [("score", -1), ("_id", -1)]
+DOCUMENT: dict = {"_id": OBJECT_ID, "score": 7, "user": {"name": "Ann"}}
+
+
+class TestKeysetSort:
+    def test_id_is_appended_following_last_direction(self):
+        expected: list[tuple[str, int]] = SORT
+        actual: list[tuple[str, int]] = keyset_sort([("score", -1)])
+        assert expected == actual
+
+    def test_id_is_used_when_no_sort(self):
+        expected: list[tuple[str, int]] = [("_id", 1)]
+        actual: list[tuple[str, int]] = keyset_sort(None)
+        assert expected == actual
+
+    def test_id_is_not_duplicated(self):
+        expected: list[tuple[str, int]] = [("_id", -1)]
+        actual: list[tuple[str, int]] = keyset_sort([("_id", -1)])
+        assert expected == actual
+
+
+class TestGetPathValue:
+    def test_nested_path(self):
+        assert get_path_value(DOCUMENT, "user.name") == "Ann"
+
+    def test_missing_path(self):
+        assert get_path_value(DOCUMENT, "user.name.first") is None
+
+
+class TestTokens:
+    def test_round_trip(self):
+        expected: list = [7, OBJECT_ID]
+        actual: list = decode_token(encode_token(SORT, DOCUMENT), SORT)
+        assert expected == actual
+
+    def test_invalid_token(self):
+        with pytest.raises(PaginationError):
+            decode_token("not-a-token", SORT)
+
+    def test_token_for_other_sort(self):
+        token: str = encode_token(SORT, DOCUMENT)
+        with pytest.raises(PaginationError):
+            decode_token(token, [("_id", 1)])
+
+
+class TestSeekPredicate:
+    def test_single_key(self):
+        expected: dict = {"_id": {"$gt": OBJECT_ID}}
+        actual: dict = seek_predicate([("_id", 1)], [OBJECT_ID])
+        assert expected == actual
+
+    def test_compound_keys(self):
+        expected: dict = {
+            "$or": [
+                {"$or": [{"score": {"$lt": 7}}, {"score": None}]},
+                {
+                    "score": 7,
+                    "$or": [{"_id": {"$lt": OBJECT_ID}}, {"_id": None}],
+                },
+            ]
+        }
+        actual: dict = seek_predicate(SORT, [7, OBJECT_ID])
+        assert expected == actual
+
+    def test_ascending_after_null(self):
+        expected: dict = {
+            "$or": [
+                {"rank": {"$ne": None}},
+                {"rank": None, "_id": {"$gt": OBJECT_ID}},
+            ]
+        }
+        actual: dict = seek_predicate(
+            [("rank", 1), ("_id", 1)], [None, OBJECT_ID]
+        )
+        assert expected == actual
+
+    def test_descending_after_null(self):
+        expected: dict = {
+            "rank": None,
+            "$or": [{"_id": {"$lt": OBJECT_ID}}, {"_id": None}],
+        }
+        actual: dict = seek_predicate(
+            [("rank", -1), ("_id", -1)], [None, OBJECT_ID]
+        )
+        assert expected == actual
+
+
+class TestEnsureSortKeysProjected:
+    def test_inclusion_projection(self):
+        expected: dict = {"name": 1, "score": 1, "_id": 1}
+        actual: dict = ensure_sort_keys_projected({"name": 1}, SORT)
+        assert expected == actual
+
+    def test_exclusion_projection(self):
+        expected: dict = {"name": 0}
+        actual: dict = ensure_sort_keys_projected(
+            {"name": 0, "score": 0}, SORT
+        )
+        assert expected == actual
+
+
+class TestKeysetQuery:
+    def test_first_page(self):
+        expected: dict = {
+            "filter": {"status": "A"},
+            "sort": [("_id", 1)],
+            "limit": 11,
+            "projection": None,
+        }
+        actual: dict = keyset_query(
+            {"filter": {"status": "A"}, "sort": None, "skip": 0},
+            page_size=10,
+        )
+        assert expected == actual
+
+    def test_skip_is_not_supported(self):
+        with pytest.raises(PaginationError):
+            keyset_query({"filter": {}, "skip": 5}, page_size=10)
+
+
+class TestFacetPipeline:
+    def test_full_page_pipeline(self):
+        expected: list[dict] = [
+            {"$match": {"status": "A"}},
+            {"$sort": {"score": -1}},
+            {
+                "$facet": {
+                    "items": [
+                        {"$skip": 10},
+                        {"$limit": 5},
+                        {"$project": {"name": 1}},
+                    ],
+                    "total": [{"$limit": 101}, {"$count": "total"}],
+                }
+            },
+        ]
+        actual: list[dict] = facet_pipeline(
+            {
+                "filter": {"status": "A"},
+                "sort": [("score", -1)],
+                "skip": 10,
+                "limit": 5,
+                "projection": {"name": 1},
+            },
+            max_count=100,
+        )
+        assert expected == actual
+
+    def test_empty_query(self):
+        expected: list[dict] = [
+            {"$match": {}},
+            {"$facet": {"items": [], "total": [{"$count": "total"}]}},
+        ]
+        actual: list[dict] = facet_pipeline(
+            {"filter": {}, "sort": None, "skip": 0, "limit": 0}
+        )
+        assert expected == actual
+
+    def test_total_of_empty_result(self):
+        assert facet_total({"items": [], "total": []}) == 0
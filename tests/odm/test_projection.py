@@ -0,0 +1,154 @@
+from typing import Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from moapi.models.core.entity import Entity
+from moapi.odm.projection import (
+    collapse_paths,
+    infer_projection,
+    merge_projections,
+)
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+
+
+class Phone(BaseModel):
+    number: str
+
+
+class Node(BaseModel):
+    name: str
+    children: list["Node"] = []
+
+
+class Summary(BaseModel):
+    title: str
+
+
+class EntitySummary(Entity):
+    title: str
+
+
+class Profile(Entity):
+    title: str
+    address: Optional[Address] = None
+    history: list[Address] = []
+    user_name: str = Field(alias="userName")
+    contact: Union[Address, Phone, None] = None
+
+
+class Tree(BaseModel):
+    root: Node
+
+
+class Open(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    title: str
+
+
+class TestCollapsePaths:
+    def test_children_of_included_paths_are_removed(self):
+        expected: list[str] = ["a", "b.c"]
+        actual: list[str] = collapse_paths(["a.b", "a", "b.c", "a.c.d"])
+        assert expected == actual
+
+    def test_paths_sharing_a_prefix_are_kept(self):
+        expected: list[str] = ["a", "ab"]
+        actual: list[str] = collapse_paths(["ab", "a"])
+        assert expected == actual
+
+
+class TestInferProjection:
+    def test_internal_id_is_excluded_when_not_read(self):
+        expected: dict = {"title": 1, "_id": 0}
+        actual: dict = infer_projection(Summary)
+        assert expected == actual
+
+    def test_mongo_id_is_read_from_internal_id(self):
+        expected: dict = {"_id": 1, "id": 1, "title": 1}
+        actual: dict = infer_projection(EntitySummary)
+        assert expected == actual
+
+    def test_nested_models_and_aliases(self):
+        expected: dict = {
+            "_id": 1,
+            "address.city": 1,
+            "address.street": 1,
+            "contact": 1,
+            "history.city": 1,
+            "history.street": 1,
+            "id": 1,
+            "title": 1,
+            "userName": 1,
+            "user_name": 1,
+        }
+        actual: dict = infer_projection(Profile)
+        assert expected == actual
+
+    def test_recursive_models_stop_at_the_first_repetition(self):
+        expected: dict = {
+            "root.children": 1,
+            "root.name": 1,
+            "_id": 0,
+        }
+        actual: dict = infer_projection(Tree)
+        assert expected == actual
+
+    def test_models_with_extra_fields_are_not_projected(self):
+        assert infer_projection(Open) is None
+
+    def test_cached_projection_is_not_shared(self):
+        expected: dict = {"title": 1, "_id": 0}
+        infer_projection(Summary)["title"] = 0
+        actual: dict = infer_projection(Summary)
+        assert expected == actual
+
+
+class TestMergeProjections:
+    def test_without_requested_projection(self):
+        expected: dict = infer_projection(Profile)
+        actual: dict = merge_projections(infer_projection(Profile), None)
+        assert expected == actual
+
+    def test_without_inferred_projection(self):
+        expected: dict = {"title": 1}
+        actual: dict = merge_projections(None, {"title": 1})
+        assert expected == actual
+
+    def test_inclusions_are_intersected(self):
+        expected: dict = {"address.city": 1, "title": 1, "_id": 1}
+        actual: dict = merge_projections(
+            infer_projection(Profile),
+            {"address.city": 1, "title": 1, "unknown": 1},
+        )
+        assert expected == actual
+
+    def test_exclusions_are_removed(self):
+        expected: dict = {"title": 1, "_id": 0}
+        actual: dict = merge_projections(
+            infer_projection(EntitySummary), {"id": 0, "_id": 0}
+        )
+        assert expected == actual
+
+    def test_operators_replace_colliding_paths(self):
+        expected: dict = {
+            "id": 1,
+            "title": 1,
+            "history": {"$slice": 1},
+            "_id": 1,
+        }
+        actual: dict = merge_projections(
+            {"id": 1, "title": 1, "history.city": 1, "_id": 1},
+            {"history": {"$slice": 1}},
+        )
+        assert expected == actual
+
+    def test_empty_intersection_only_returns_the_id(self):
+        expected: dict = {"_id": 1}
+        actual: dict = merge_projections(
+            infer_projection(Summary), {"unknown": 1}
+        )
+        assert expected == actual
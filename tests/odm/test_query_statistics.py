@@ -0,0 +1,182 @@
+from typing import Optional
+
+import pytest
+
+from tests.odm.helpers import (
+    DummyModel,
+    generate_list_of_models,
+    get_connection_parameters,
+)
+from moapi.moql.prepared import PreparedMoQL
+from moapi.odm.entity_service import EntityService, prepare_moql
+from moapi.odm.query_statistics import (
+    QueryStatistics,
+    StatisticsRegistry,
+    format_dump,
+    query_fingerprint,
+)
+
+COLLECTION_NAME: str = "statistics"
+
+
+class StatisticsService(EntityService[DummyModel]):
+    def __init__(self, statistics: Optional[QueryStatistics]):
+        super().__init__(
+            COLLECTION_NAME,
+            get_connection_parameters(),
+            listeners=[statistics] if statistics is not None else None,
+        )
+
+
+class TestQueryFingerprint:
+    def test_values_are_stripped(self):
+        expected: str = 'filter={"a":"?","b":{"$gt":"?","$lt":"?"}}'
+        actual: str = query_fingerprint(
+            {"filter": {"b": {"$lt": 9, "$gt": 1}, "a": "x"}}
+        )
+        assert expected == actual
+
+    def test_logical_operators_are_kept(self):
+        expected: str = 'filter={"$or":[{"a":"?"},{"b":{"$in":"?"}}]}'
+        actual: str = query_fingerprint(
+            {"filter": {"$or": [{"a": 1}, {"b": {"$in": [1, 2]}}]}}
+        )
+        assert expected == actual
+
+    def test_sort_and_projection_are_kept(self):
+        expected: str = 'filter={}&sort=[["a",-1]]&projection={"a":1}'
+        actual: str = query_fingerprint(
+            {
+                "filter": {},
+                "sort": [("a", -1)],
+                "projection": {"a": 1},
+                "limit": 10,
+            }
+        )
+        assert expected == actual
+
+
+class TestStatisticsRegistry:
+    def test_observations_are_aggregated(self):
+        registry: StatisticsRegistry = StatisticsRegistry()
+        registry.record(("a",), 0.1, rows=2)
+        registry.record(("a",), 0.3, rows=3, error=True)
+        entry: dict = registry.dump()[0]
+        expected: tuple = ("a", 2, 1, 5, 0.4, 0.2, 0.1, 0.3)
+        actual: tuple = tuple(
+            entry[key]
+            for key in (
+                "key",
+                "calls",
+                "errors",
+                "rows",
+                "total_time",
+                "mean_time",
+                "min_time",
+                "max_time",
+            )
+        )
+        assert expected == pytest.approx(actual)
+
+    def test_dump_is_sorted_and_limited(self):
+        registry: StatisticsRegistry = StatisticsRegistry()
+        for key, calls in (("a", 1), ("b", 3), ("c", 2)):
+            for _ in range(calls):
+                registry.record((key,), 0.01)
+        expected: list[str] = ["b", "c"]
+        actual: list[str] = [
+            entry["key"] for entry in registry.dump("calls", limit=2)
+        ]
+        assert expected == actual
+
+    def test_invalid_sort_key(self):
+        registry: StatisticsRegistry = StatisticsRegistry()
+        registry.record(("a",), 0.01)
+        with pytest.raises(ValueError):
+            registry.dump("unknown")
+
+    def test_least_called_entries_are_evicted(self):
+        registry: StatisticsRegistry = StatisticsRegistry(max_entries=3)
+        registry.record(("a",), 0.01)
+        registry.record(("a",), 0.01)
+        registry.record(("b",), 0.01)
+        registry.record(("c",), 0.01)
+        registry.record(("c",), 0.01)
+        registry.record(("d",), 0.01)
+        expected: set[str] = {"a", "c", "d"}
+        actual: set[str] = {entry["key"] for entry in registry.dump()}
+        assert expected == actual
+        assert 1 == registry.evicted
+
+    def test_write(self, tmp_path):
+        registry: StatisticsRegistry = StatisticsRegistry()
+        registry.record(("a",), 0.01)
+        path: str = str(tmp_path / "stats.json")
+        registry.write(path)
+        with open(path) as file:
+            assert '"key": "a"' in file.read()
+
+
+class TestQueryStatistics:
+    def test_moql_queries_are_keyed_by_shape(self):
+        statistics: QueryStatistics = QueryStatistics()
+        service: StatisticsService = StatisticsService(statistics)
+        service.add_many_typed(generate_list_of_models())
+        service.get_by_moql("title=Model-1")
+        service.get_typed_by_moql("title=Model-2")
+        list(service.iter_by_moql("title=Model-3"))
+        expected: list[tuple] = [(COLLECTION_NAME, "title=?", 3, 3)]
+        actual: list[tuple] = [
+            (
+                entry["collection"],
+                entry["query_shape"],
+                entry["calls"],
+                entry["rows"],
+            )
+            for entry in statistics.dump()
+        ]
+        assert expected == actual
+
+    def test_bound_templates_are_keyed_by_template_shape(self):
+        statistics: QueryStatistics = QueryStatistics()
+        service: StatisticsService = StatisticsService(statistics)
+        prepared: PreparedMoQL = prepare_moql("title={title}&limit=5")
+        service.get_by_moql(prepared.bind(title="Model-1"))
+        service.get_by_moql("title=Model-2&limit=5")
+        expected: list[tuple] = [("limit=?&title=?", 2)]
+        actual: list[tuple] = [
+            (entry["query_shape"], entry["calls"])
+            for entry in statistics.dump()
+        ]
+        assert expected == actual
+
+    def test_other_queries_are_keyed_by_fingerprint(self):
+        statistics: QueryStatistics = QueryStatistics()
+        service: StatisticsService = StatisticsService(statistics)
+        service.get({"title": "a"})
+        service.get_one("title", "b")
+        expected: list[tuple] = [('filter={"title":"?"}', 2)]
+        actual: list[tuple] = [
+            (entry["query_shape"], entry["calls"])
+            for entry in statistics.dump()
+        ]
+        assert expected == actual
+
+    def test_writes_are_ignored(self):
+        statistics: QueryStatistics = QueryStatistics()
+        service: StatisticsService = StatisticsService(statistics)
+        service.add_many_typed(generate_list_of_models())
+        assert 0 == len(statistics)
+
+
+class TestFormatDump:
+    def test_columns_are_aligned_and_times_in_milliseconds(self):
+        expected: list[str] = [
+            "calls  mean_time  query_shape",
+            "10     1.500      a=?",
+        ]
+        actual: list[str] = format_dump(
+            [{"calls": 10, "mean_time": 0.0015, "query_shape": "a=?"}],
+            ("calls", "mean_time", "query_shape"),
+        )
+        assert expected == actual
@@ -0,0 +1,91 @@
+import json
+from datetime import datetime
+
+from bson import Binary, ObjectId
+
+from moapi.models.core.custom_pydantic_fields import MongoObjectId
+from moapi.models.core.entity import Entity
+from moapi.odm.entity_service import document_to_model
+from moapi.odm.serialization import (
+    documents_to_json,
+    documents_to_ndjson,
+    rename_internal_id,
+)
+
+OBJECT_ID_VALUE: str = "6502104e8fb95f068e3a4635"
+OWNER_ID_VALUE: str = "6502104e8fb95f068e3a4636"
+CREATED: datetime = datetime(2024, 1, 2, 3, 4, 5, 600000)
+
+
+class Report(Entity):
+    title: str
+    owner_id: MongoObjectId
+    created: datetime
+
+
+def get_document() -> dict:
+    return {
+        "_id": ObjectId(OBJECT_ID_VALUE),
+        "id": "report-1",
+        "title": "Report",
+        "owner_id": ObjectId(OWNER_ID_VALUE),
+        "created": CREATED,
+    }
+
+
+class TestRenameInternalId:
+    def test_internal_id_is_renamed(self):
+        expected: dict = {"mongo_id": OBJECT_ID_VALUE, "id": "1"}
+        actual: dict = rename_internal_id(
+            {"_id": OBJECT_ID_VALUE, "id": "1"}
+        )
+        assert expected == actual
+
+    def test_document_without_internal_id_is_unchanged(self):
+        expected: dict = {"id": "1"}
+        actual: dict = rename_internal_id({"id": "1"})
+        assert expected == actual
+
+
+class TestDocumentsToJson:
+    def test_output_matches_model_json(self):
+        model: Report = document_to_model(Report, get_document())
+        expected: list = [json.loads(model.model_dump_json())]
+        actual: list = json.loads(documents_to_json([get_document()]))
+        assert expected == actual
+
+    def test_empty_result_is_an_empty_array(self):
+        expected: bytes = b"[]"
+        actual: bytes = documents_to_json([])
+        assert expected == actual
+
+    def test_binary_values_are_base64_encoded(self):
+        expected: list = [{"payload": "_wA="}]
+        actual: list = json.loads(
+            documents_to_json([{"payload": Binary(b"\xff\x00")}])
+        )
+        assert expected == actual
+
+
+class TestDocumentsToNdjson:
+    def test_one_line_per_document(self):
+        documents: list = [get_document() for _ in range(5)]
+        expected: list = json.loads(
+            documents_to_json([get_document() for _ in range(5)])
+        )
+        actual: list = [
+            json.loads(line)
+            for line in b"".join(documents_to_ndjson(documents))
+            .decode()
+            .splitlines()
+        ]
+        assert expected == actual
+
+    def test_documents_are_chunked(self):
+        documents: list = [get_document() for _ in range(5)]
+        expected: list[int] = [2, 2, 1]
+        actual: list[int] = [
+            chunk.count(b"\n")
+            for chunk in documents_to_ndjson(documents, chunk_size=2)
+        ]
+        assert expected == actual
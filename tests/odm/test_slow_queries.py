@@ -0,0 +1,231 @@
+from typing import Optional
+
+from tests.odm.helpers import (
+    DummyModel,
+    generate_list_of_models,
+    get_connection_parameters,
+)
+from moapi.odm.entity_service import EntityService
+from moapi.odm.instrumentation import OperationEvent
+from moapi.odm.slow_queries import (
+    ExplainRecord,
+    SlowQueryExplainer,
+    explain_command,
+    plan_stages,
+    winning_plan,
+)
+
+COLLECTION_NAME: str = "slow"
+
+COLLECTION_SCAN_EXPLAIN: dict = {
+    "queryPlanner": {
+        "winningPlan": {
+            "stage": "SORT",
+            "inputStage": {"stage": "COLLSCAN", "direction": "forward"},
+        }
+    },
+    "executionStats": {
+        "nReturned": 1,
+        "executionTimeMillis": 35,
+        "totalKeysExamined": 0,
+        "totalDocsExamined": 10,
+    },
+}
+
+
+class ExplainDatabaseStub:
+    def __init__(self, response: Optional[dict] = None):
+        self.response: Optional[dict] = response
+        self.commands: list[dict] = []
+
+    def command(self, command: dict) -> dict:
+        self.commands.append(command)
+        if self.response is None:
+            raise RuntimeError("explain failed")
+        return self.response
+
+
+class SlowService(EntityService[DummyModel]):
+    def __init__(self, explainer: SlowQueryExplainer):
+        super().__init__(
+            COLLECTION_NAME,
+            get_connection_parameters(),
+            listeners=[explainer],
+        )
+
+
+def build_event(
+    query_shape: str = "a=?", database_time: float = 1.0
+) -> OperationEvent:
+    return OperationEvent(
+        collection=COLLECTION_NAME,
+        operation="get_by_moql",
+        query_shape=query_shape,
+        duration=database_time,
+        database_time=database_time,
+        conversion_time=0.0,
+        documents=1,
+        query={"filter": {"a": 1}},
+        error=None,
+    )
+
+
+class TestExplainCommand:
+    def test_find_arguments_are_forwarded(self):
+        expected: dict = {
+            "explain": {
+                "find": COLLECTION_NAME,
+                "filter": {"a": 1},
+                "sort": {"b": -1, "c": 1},
+                "projection": {"a": 1},
+                "limit": 5,
+            },
+            "verbosity": "executionStats",
+        }
+        actual: dict = explain_command(
+            COLLECTION_NAME,
+            {
+                "filter": {"a": 1},
+                "sort": [("b", -1), ("c", 1)],
+                "projection": {"a": 1},
+                "skip": 0,
+                "limit": 5,
+            },
+        )
+        assert expected == actual
+
+
+class TestPlanStages:
+    def test_stages_are_listed_depth_first(self):
+        plan: dict = {
+            "stage": "FETCH",
+            "inputStage": {
+                "stage": "OR",
+                "inputStages": [
+                    {"stage": "IXSCAN"},
+                    {"stage": "COLLSCAN"},
+                ],
+            },
+        }
+        expected: tuple = ("FETCH", "OR", "IXSCAN", "COLLSCAN")
+        actual: tuple = plan_stages(plan)
+        assert expected == actual
+
+    def test_slot_based_plans_are_unwrapped(self):
+        expected: dict = {"stage": "IXSCAN"}
+        actual: dict = winning_plan(
+            {
+                "queryPlanner": {
+                    "winningPlan": {
+                        "queryPlan": {"stage": "IXSCAN"},
+                        "slotBasedPlan": {},
+                    }
+                }
+            }
+        )
+        assert expected == actual
+
+
+class TestSlowQueryExplainer:
+    def test_slow_moql_queries_are_explained(self):
+        database: ExplainDatabaseStub = ExplainDatabaseStub(
+            COLLECTION_SCAN_EXPLAIN
+        )
+        explainer: SlowQueryExplainer = SlowQueryExplainer(
+            database, threshold=0.0
+        )
+        service: SlowService = SlowService(explainer)
+        service.add_many_typed(generate_list_of_models())
+        service.get_by_moql("title=Model-1&sort=-id")
+        explainer.wait()
+        record: ExplainRecord = explainer.records[0]
+        expected: tuple = (
+            "sort=-id&title=?",
+            ("SORT", "COLLSCAN"),
+            True,
+            0,
+            10,
+            1,
+        )
+        actual: tuple = (
+            record.query_shape,
+            record.stages,
+            record.collection_scan,
+            record.keys_examined,
+            record.documents_examined,
+            record.documents_returned,
+        )
+        assert expected == actual
+        assert {"title": "Model-1"} == database.commands[0]["explain"][
+            "filter"
+        ]
+
+    def test_fast_queries_are_ignored(self):
+        database: ExplainDatabaseStub = ExplainDatabaseStub(
+            COLLECTION_SCAN_EXPLAIN
+        )
+        explainer: SlowQueryExplainer = SlowQueryExplainer(
+            database, threshold=10.0
+        )
+        SlowService(explainer).get_by_moql("title=x")
+        explainer.wait()
+        assert [] == database.commands
+
+    def test_writes_are_ignored(self):
+        database: ExplainDatabaseStub = ExplainDatabaseStub(
+            COLLECTION_SCAN_EXPLAIN
+        )
+        explainer: SlowQueryExplainer = SlowQueryExplainer(
+            database, threshold=0.0
+        )
+        SlowService(explainer).add_many_typed(generate_list_of_models())
+        explainer.wait()
+        assert [] == database.commands
+
+    def test_unsampled_queries_are_ignored(self):
+        database: ExplainDatabaseStub = ExplainDatabaseStub(
+            COLLECTION_SCAN_EXPLAIN
+        )
+        explainer: SlowQueryExplainer = SlowQueryExplainer(
+            database, threshold=0.0, sample_rate=0.0
+        )
+        explainer.on_operation(build_event())
+        explainer.wait()
+        assert [] == database.commands
+
+    def test_shapes_are_explained_once_per_cooldown(self):
+        database: ExplainDatabaseStub = ExplainDatabaseStub(
+            COLLECTION_SCAN_EXPLAIN
+        )
+        explainer: SlowQueryExplainer = SlowQueryExplainer(database)
+        for _ in range(3):
+            explainer.on_operation(build_event("a=?"))
+        explainer.on_operation(build_event("b=?"))
+        explainer.wait()
+        expected: list[str] = ["a=?", "b=?"]
+        actual: list[str] = [
+            record.query_shape for record in explainer.records
+        ]
+        assert expected == actual
+
+    def test_explains_per_minute_are_limited(self):
+        database: ExplainDatabaseStub = ExplainDatabaseStub(
+            COLLECTION_SCAN_EXPLAIN
+        )
+        explainer: SlowQueryExplainer = SlowQueryExplainer(
+            database, max_per_minute=2
+        )
+        for shape in ("a=?", "b=?", "c=?"):
+            explainer.on_operation(build_event(shape))
+        explainer.wait()
+        expected: int = 2
+        actual: int = len(database.commands)
+        assert expected == actual
+
+    def test_failures_are_counted(self):
+        explainer: SlowQueryExplainer = SlowQueryExplainer(
+            ExplainDatabaseStub()
+        )
+        explainer.on_operation(build_event())
+        explainer.wait()
+        assert (1, []) == (explainer.failures, explainer.records)
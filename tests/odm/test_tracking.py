@@ -0,0 +1,64 @@
+from moapi.odm.tracking import diff_documents
+
+ORIGINAL: dict = {
+    "_id": "6502104e8fb95f068e3a4635",
+    "title": "Model",
+    "status": "NEW",
+    "settings": {"group": "a", "limits": {"max": 5, "min": 1}},
+    "tags": ["x", "y"],
+    "unknown": 1,
+}
+
+
+def get_current(**changes) -> dict:
+    current: dict = {
+        key: value for key, value in ORIGINAL.items() if key != "unknown"
+    }
+    current["settings"] = {
+        "group": "a",
+        "limits": {"max": 5, "min": 1},
+    }
+    current.update(changes)
+    return current
+
+
+class TestDiffDocuments:
+    def test_no_changes(self):
+        expected: tuple = ({}, {})
+        actual: tuple = diff_documents(ORIGINAL, get_current())
+        assert expected == actual
+
+    def test_top_level_change(self):
+        expected: tuple = ({"status": "DONE"}, {})
+        actual: tuple = diff_documents(
+            ORIGINAL, get_current(status="DONE")
+        )
+        assert expected == actual
+
+    def test_nested_change_uses_dotted_path(self):
+        expected: tuple = ({"settings.limits.max": 10}, {})
+        actual: tuple = diff_documents(
+            ORIGINAL,
+            get_current(
+                settings={"group": "a", "limits": {"max": 10, "min": 1}}
+            ),
+        )
+        assert expected == actual
+
+    def test_removed_nested_key_is_unset(self):
+        expected: tuple = ({}, {"settings.limits.min": ""})
+        actual: tuple = diff_documents(
+            ORIGINAL,
+            get_current(settings={"group": "a", "limits": {"max": 5}}),
+        )
+        assert expected == actual
+
+    def test_arrays_are_set_as_a_whole(self):
+        expected: tuple = ({"tags": ["x"]}, {})
+        actual: tuple = diff_documents(ORIGINAL, get_current(tags=["x"]))
+        assert expected == actual
+
+    def test_id_is_ignored(self):
+        expected: tuple = ({}, {})
+        actual: tuple = diff_documents(ORIGINAL, get_current(_id="other"))
+        assert expected == actual
@@ -0,0 +1,89 @@
+from typer.testing import CliRunner, Result
+
+from moapi.cli import app
+from moapi.odm.command_monitoring import CommandStatistics
+from moapi.odm.query_statistics import QueryStatistics
+
+SERVICE_REFERENCE: str = "tests.odm.test_indexes:IndexedService"
+
+runner: CliRunner = CliRunner()
+
+
+class TestEnsureIndexesCommand:
+    def test_created_indexes_are_reported(self):
+        expected: str = (
+            "indexed: id_1, category_1_created_-1, created_1, title_text"
+        )
+        result: Result = runner.invoke(
+            app, ["ensure-indexes", SERVICE_REFERENCE]
+        )
+        assert result.exit_code == 0
+        assert expected == result.output.strip()
+
+    def test_conflicts_are_reported(self):
+        result: Result = runner.invoke(
+            app,
+            [
+                "ensure-indexes",
+                "tests.odm.test_indexes:ConflictingService",
+            ],
+        )
+        assert result.exit_code == 1
+        assert "id_1 (unique)" in result.output
+
+    def test_invalid_reference_is_rejected(self):
+        result: Result = runner.invoke(
+            app, ["ensure-indexes", "tests.odm.test_indexes"]
+        )
+        assert result.exit_code != 0
+
+    def test_references_must_be_services(self):
+        result: Result = runner.invoke(
+            app, ["ensure-indexes", "tests.odm.test_indexes:IndexedModel"]
+        )
+        assert result.exit_code != 0
+
+
+class TestQueryStatsCommand:
+    def test_dump_is_printed_sorted(self, tmp_path):
+        registry: QueryStatistics = QueryStatistics()
+        registry.record(("users", "a=?"), 0.001)
+        registry.record(("users", "b=?"), 0.002)
+        registry.record(("users", "b=?"), 0.002)
+        path: str = str(tmp_path / "stats.json")
+        registry.write(path)
+        result: Result = runner.invoke(
+            app,
+            ["query-stats", path, "--sort-by", "calls", "--limit", "1"],
+        )
+        lines: list[str] = result.output.strip().splitlines()
+        assert result.exit_code == 0
+        assert 2 == len(lines)
+        assert lines[1].endswith("users       b=?")
+
+    def test_invalid_sort_key_is_rejected(self, tmp_path):
+        registry: QueryStatistics = QueryStatistics()
+        registry.record(("users", "a=?"), 0.001)
+        path: str = str(tmp_path / "stats.json")
+        registry.write(path)
+        result: Result = runner.invoke(
+            app, ["query-stats", path, "--sort-by", "unknown"]
+        )
+        assert result.exit_code != 0
+
+    def test_command_statistics_are_shown(self, tmp_path):
+        registry: CommandStatistics = CommandStatistics()
+        registry.record(
+            ("users", "find"), 0.001, rows=2, bytes_out=10, bytes_in=20
+        )
+        path: str = str(tmp_path / "stats.json")
+        registry.write(path)
+        result: Result = runner.invoke(app, ["query-stats", path])
+        header: list[str] = result.output.splitlines()[0].split()
+        assert result.exit_code == 0
+        assert ["bytes_out", "bytes_in", "command"] == [
+            column
+            for column in header
+            if column
+            in ("bytes_out", "bytes_in", "command", "query_shape")
+        ]